@@ -6,13 +6,17 @@ FullCourtVision — Advanced Analysis (Phase 2)
 - Feature importance analysis
 
 Outputs saved to analysis_output/
+
+    python advanced_analysis.py             # load the detailed stat lines whole
+    python advanced_analysis.py --chunked   # stream them per player in bounded memory
 """
 
 import os
-import re
+import sys
 import sqlite3
 import json
 import warnings
+from functools import partial
 
 import pandas as pd
 import numpy as np
@@ -22,11 +26,15 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 from scipy import stats as scipy_stats
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis"))
+from data_loader import CHUNK_ROWS, aggregate_by_player, build_grade_dim
+from evaluation import evaluate_models
+
 warnings.filterwarnings("ignore")
 
 # --- Config ---
@@ -37,16 +45,6 @@ DB_PATHS = [
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Season ordering for temporal analysis
-SEASON_ORDER = {
-    "Summer 2020/21": 0, "Winter 2021": 1,
-    "Summer 2021/22": 2, "Winter 2022": 3,
-    "Summer 2022/23": 4, "Winter 2023": 5,
-    "Summer 2023/24": 6, "Winter 2024": 7,
-    "Summer 2024/25": 8, "Winter 2025": 9,
-    "Summer 2025/26": 10,
-}
-
 def get_db_path():
     for p in DB_PATHS:
         if os.path.exists(p):
@@ -54,54 +52,60 @@ def get_db_path():
     raise FileNotFoundError(f"playhq.db not found in: {DB_PATHS}")
 
 
-def extract_age_group(grade_name):
-    """Extract age group (e.g., 'U14') from grade name like 'Boys U14 BF'."""
-    m = re.search(r'U(\d+)', grade_name)
-    return f"U{m.group(1)}" if m else None
+DETAILED_QUERY = """
+SELECT
+    p.id as player_id,
+    p.first_name || ' ' || p.last_name as player_name,
+    ps.grade_id,
+    g.name as grade_name,
+    s.name as season_name,
+    ps.games_played,
+    ps.total_points,
+    ps.one_point as free_throws,
+    ps.two_point as two_pt_made,
+    ps.three_point as three_pt_made,
+    ps.total_fouls,
+    ps.team_name
+FROM player_stats ps
+JOIN players p ON p.id = ps.player_id
+JOIN grades g ON g.id = ps.grade_id
+JOIN seasons s ON s.id = g.season_id
+WHERE ps.games_played > 0
+"""
 
 
-def extract_gender(grade_name):
-    """Extract gender from grade name."""
-    if grade_name.startswith("Boys"):
-        return "Boys"
-    elif grade_name.startswith("Girls"):
-        return "Girls"
-    return "Unknown"
+def _detailed_grade_dim(conn):
+    # Age group, gender and chronological season order per grade, joined by id
+    return build_grade_dim(
+        pd.read_sql_query("SELECT id, season_id, name FROM grades", conn),
+        pd.read_sql_query("SELECT id, name, start_date FROM seasons", conn),
+    )[["grade_id", "age_group", "gender", "season_order"]]
+
+
+def _add_detailed_columns(df, grade_dim):
+    df["ppg"] = df["total_points"] / df["games_played"]
+    df["fpg"] = df["total_fouls"] / df["games_played"]
+    return df.merge(grade_dim, on="grade_id", how="left")
 
 
 def load_detailed_data(db_path):
     """Load per-grade player stats with season and grade info."""
     conn = sqlite3.connect(db_path)
-    query = """
-    SELECT
-        p.id as player_id,
-        p.first_name || ' ' || p.last_name as player_name,
-        ps.grade_id,
-        g.name as grade_name,
-        s.name as season_name,
-        ps.games_played,
-        ps.total_points,
-        ps.one_point as free_throws,
-        ps.two_point as two_pt_made,
-        ps.three_point as three_pt_made,
-        ps.total_fouls,
-        ps.team_name
-    FROM player_stats ps
-    JOIN players p ON p.id = ps.player_id
-    JOIN grades g ON g.id = ps.grade_id
-    JOIN seasons s ON s.id = g.season_id
-    WHERE ps.games_played > 0
-    """
-    df = pd.read_sql_query(query, conn)
+    df = pd.read_sql_query(DETAILED_QUERY, conn)
+    grade_dim = _detailed_grade_dim(conn)
     conn.close()
+    return _add_detailed_columns(df, grade_dim)
 
-    df["ppg"] = df["total_points"] / df["games_played"]
-    df["fpg"] = df["total_fouls"] / df["games_played"]
-    df["age_group"] = df["grade_name"].apply(extract_age_group)
-    df["gender"] = df["grade_name"].apply(extract_gender)
-    df["season_order"] = df["season_name"].map(SEASON_ORDER)
-    
-    return df
+
+def iter_detailed_data(db_path, chunksize=CHUNK_ROWS):
+    """Yield load_detailed_data() rows in chunks of at most chunksize, ordered by player_id."""
+    conn = sqlite3.connect(db_path)
+    try:
+        grade_dim = _detailed_grade_dim(conn)
+        for chunk in pd.read_sql_query(DETAILED_QUERY + "ORDER BY ps.player_id", conn, chunksize=chunksize):
+            yield _add_detailed_columns(chunk, grade_dim)
+    finally:
+        conn.close()
 
 
 def load_aggregated_data(db_path):
@@ -173,17 +177,23 @@ def random_forest_comparison(df):
     rf_r2 = r2_score(y_test, rf_pred)
     rf_mae = mean_absolute_error(y_test, rf_pred)
 
-    # Cross-validation
-    lr_cv = cross_val_score(LinearRegression(), X, y, cv=5, scoring="r2")
-    rf_cv = cross_val_score(RandomForestRegressor(n_estimators=200, max_depth=15,
-                            min_samples_leaf=5, random_state=42, n_jobs=-1),
-                            X, y, cv=5, scoring="r2")
+    # Cross-validation: both models' folds run in parallel across processes (analysis/evaluation.py)
+    # and are cached, so a rerun on unchanged data does not refit them
+    cv = evaluate_models(
+        {"ppg": (X, y)},
+        {"linear_regression": partial(LinearRegression),
+         "random_forest": partial(RandomForestRegressor, n_estimators=200, max_depth=15,
+                                  min_samples_leaf=5, random_state=42, n_jobs=1)},
+        leaderboard_path=os.path.join(OUTPUT_DIR, "model_leaderboard.json"),
+    ).set_index("model")
+    lr_cv_mean, lr_cv_std = cv.loc["linear_regression", ["r2_mean", "r2_std"]]
+    rf_cv_mean, rf_cv_std = cv.loc["random_forest", ["r2_mean", "r2_std"]]
 
     print(f"\nDataset: {len(reg_df):,} players (5+ games)")
     print(f"\n{'Model':<25} {'Test R²':>10} {'Test MAE':>10} {'CV R² (mean±std)':>22}")
     print("-" * 70)
-    print(f"{'Linear Regression':<25} {lr_r2:>10.4f} {lr_mae:>10.4f} {lr_cv.mean():>10.4f} ± {lr_cv.std():.4f}")
-    print(f"{'Random Forest':<25} {rf_r2:>10.4f} {rf_mae:>10.4f} {rf_cv.mean():>10.4f} ± {rf_cv.std():.4f}")
+    print(f"{'Linear Regression':<25} {lr_r2:>10.4f} {lr_mae:>10.4f} {lr_cv_mean:>10.4f} ± {lr_cv_std:.4f}")
+    print(f"{'Random Forest':<25} {rf_r2:>10.4f} {rf_mae:>10.4f} {rf_cv_mean:>10.4f} ± {rf_cv_std:.4f}")
 
     # Feature importance
     importances = pd.Series(rf.feature_importances_, index=features).sort_values(ascending=False)
@@ -195,9 +205,9 @@ def random_forest_comparison(df):
     results = {
         "n_players": len(reg_df),
         "linear_regression": {"test_r2": round(lr_r2, 4), "test_mae": round(lr_mae, 4),
-                              "cv_r2_mean": round(lr_cv.mean(), 4), "cv_r2_std": round(lr_cv.std(), 4)},
+                              "cv_r2_mean": round(lr_cv_mean, 4), "cv_r2_std": round(lr_cv_std, 4)},
         "random_forest": {"test_r2": round(rf_r2, 4), "test_mae": round(rf_mae, 4),
-                          "cv_r2_mean": round(rf_cv.mean(), 4), "cv_r2_std": round(rf_cv.std(), 4)},
+                          "cv_r2_mean": round(rf_cv_mean, 4), "cv_r2_std": round(rf_cv_std, 4)},
         "feature_importance": {k: round(v, 4) for k, v in importances.items()}
     }
     with open(os.path.join(OUTPUT_DIR, "model_comparison.json"), "w") as f:
@@ -247,12 +257,16 @@ def random_forest_comparison(df):
 # =============================================================================
 # 2. PLAYER DEVELOPMENT TRACKING
 # =============================================================================
-def player_development_tracking(df_detailed):
-    """Track how players develop across seasons."""
-    print("\n" + "=" * 70)
-    print("PLAYER DEVELOPMENT TRACKING — Cross-Season Analysis")
-    print("=" * 70)
+DEVELOPMENT_COLUMNS = ["player_id", "player_name", "first_season", "last_season", "first_ppg", "last_ppg",
+                       "ppg_change", "ppg_change_pct", "n_seasons", "total_games"]
 
+
+def development_table(df_detailed):
+    """First-to-last season PPG change for every player with 3+ seasons.
+
+    Only combines each player's own rows, so it can run per chunk through
+    aggregate_by_player().
+    """
     # Aggregate per player per season (combine grading + regular season within same season)
     season_agg = df_detailed.groupby(["player_id", "player_name", "season_name", "age_group", "gender"]).agg({
         "games_played": "sum",
@@ -270,7 +284,6 @@ def player_development_tracking(df_detailed):
     # Find players with 3+ seasons
     player_seasons = season_agg.groupby("player_id")["season_name"].nunique()
     multi_season = player_seasons[player_seasons >= 3].index
-    print(f"\nPlayers with 3+ seasons: {len(multi_season):,}")
 
     multi_df = season_agg[season_agg["player_id"].isin(multi_season)].sort_values(["player_id", "season_order"])
 
@@ -297,8 +310,17 @@ def player_development_tracking(df_detailed):
             "total_games": int(group["games_played"].sum())
         })
 
-    dev_df = pd.DataFrame(developments)
-    dev_df = dev_df[dev_df["total_games"] >= 10]  # meaningful sample
+    return pd.DataFrame(developments, columns=DEVELOPMENT_COLUMNS)
+
+
+def player_development_tracking(dev_all):
+    """Track how players develop across seasons, from development_table() output."""
+    print("\n" + "=" * 70)
+    print("PLAYER DEVELOPMENT TRACKING — Cross-Season Analysis")
+    print("=" * 70)
+
+    print(f"\nPlayers with 3+ seasons: {len(dev_all):,}")
+    dev_df = dev_all[dev_all["total_games"] >= 10]  # meaningful sample
 
     print(f"Players with 10+ career games across 3+ seasons: {len(dev_df):,}")
     print(f"\nPPG Change Distribution:")
@@ -355,13 +377,12 @@ def player_development_tracking(df_detailed):
 # =============================================================================
 # 3. AGE GROUP PERCENTILE RANKINGS
 # =============================================================================
-def age_group_percentiles(df_detailed):
-    """Calculate percentile rankings within each age group."""
-    print("\n" + "=" * 70)
-    print("AGE GROUP PERCENTILE RANKINGS")
-    print("=" * 70)
+def age_group_totals(df_detailed):
+    """Per player, age group and gender totals across all seasons at that age group.
 
-    # Aggregate per player per age group (across all seasons at that age group)
+    Only combines each player's own rows, so it can run per chunk through
+    aggregate_by_player().
+    """
     age_agg = df_detailed.groupby(["player_id", "player_name", "age_group", "gender"]).agg({
         "games_played": "sum",
         "total_points": "sum",
@@ -373,6 +394,14 @@ def age_group_percentiles(df_detailed):
 
     age_agg["ppg"] = age_agg["total_points"] / age_agg["games_played"]
     age_agg["fpg"] = age_agg["total_fouls"] / age_agg["games_played"]
+    return age_agg
+
+
+def age_group_percentiles(age_agg):
+    """Calculate percentile rankings within each age group, from age_group_totals() output."""
+    print("\n" + "=" * 70)
+    print("AGE GROUP PERCENTILE RANKINGS")
+    print("=" * 70)
 
     # Filter to 3+ games for meaningful percentiles
     age_agg = age_agg[age_agg["games_played"] >= 3]
@@ -447,19 +476,28 @@ def age_group_percentiles(df_detailed):
 # =============================================================================
 # MAIN
 # =============================================================================
-def main():
+def main(chunked=False):
+    """Run all analyses. chunked streams the detailed stat lines per player
+    instead of loading them whole (same outputs, bounded memory)."""
     db_path = get_db_path()
     print(f"Using database: {db_path}")
 
     # Load data
     df_agg = load_aggregated_data(db_path)
-    df_detailed = load_detailed_data(db_path)
-    print(f"Loaded {len(df_agg):,} players (aggregated), {len(df_detailed):,} stat lines (detailed)")
+    if chunked:
+        dev_all = aggregate_by_player(development_table, iter_detailed_data(db_path))
+        age_totals = aggregate_by_player(age_group_totals, iter_detailed_data(db_path))
+        print(f"Loaded {len(df_agg):,} players (aggregated), detailed stat lines streamed in chunks of {CHUNK_ROWS:,}")
+    else:
+        df_detailed = load_detailed_data(db_path)
+        dev_all = development_table(df_detailed)
+        age_totals = age_group_totals(df_detailed)
+        print(f"Loaded {len(df_agg):,} players (aggregated), {len(df_detailed):,} stat lines (detailed)")
 
     # Run analyses
     model_results = random_forest_comparison(df_agg)
-    dev_df = player_development_tracking(df_detailed)
-    age_agg, benchmarks = age_group_percentiles(df_detailed)
+    dev_df = player_development_tracking(dev_all)
+    age_agg, benchmarks = age_group_percentiles(age_totals)
     # Summary
     print("\n" + "=" * 70)
     print("ANALYSIS COMPLETE — Summary")
@@ -475,4 +513,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(chunked="--chunked" in sys.argv)
@@ -9,6 +9,10 @@ Main modules:
 - predictions: Game outcome and scoring trend prediction models  
 - player_analysis: Individual player career and performance analysis
 - team_analysis: Team performance, standings, and patterns
+- ratings: Margin-aware Elo team ratings per grade
+- simulation: Monte Carlo ladder projections
+- evaluation: Parallel, cached cross-validation leaderboard
+- backtest: Walk-forward backtest of the game predictor
 - data_loader: Data access and preprocessing utilities
 
 Quick start:
@@ -28,8 +32,17 @@ from .clustering import (
 from .predictions import (
     scoring_trend_regression,
     train_game_predictor,
+    compare_predictor_models,
+    cheapest_model,
+    PREDICTOR_MODELS,
     predict_matchup,
-    build_game_features
+    predict_fixtures,
+    build_game_features,
+    game_feature_columns,
+    game_features,
+    team_features,
+    load_game_predictor,
+    GamePredictor
 )
 
 from .player_analysis import (
@@ -48,15 +61,70 @@ from .team_analysis import (
 
 from .data_loader import (
     load_player_stats,
+    get_player_stats,
+    clear_player_stats_cache,
+    data_version,
+    build_grade_dim,
+    load_grade_dim,
+    apply_schema,
+    memory_report,
+    SCHEMA,
     load_games,
+    load_table,
     load_teams,
     load_players,
     load_organisations,
     aggregate_player_career,
     query,
+    query_chunks,
+    iter_batches,
+    iter_player_stats,
+    iter_complete_groups,
+    aggregate_by_player,
+    CHUNK_ROWS,
     DB_PATH
 )
 
+from .team_state import (
+    TeamStateEngine,
+    update_team_state,
+    point_in_time_features
+)
+
+from .ratings import (
+    EloRatings,
+    compute_ratings,
+    update_ratings,
+    load_game_ratings,
+    rating_features,
+    RATING_FEATURES
+)
+
+from .simulation import (
+    simulate_season,
+    simulate_ladder,
+    current_ladders
+)
+
+from .evaluation import (
+    evaluate_models,
+    game_feature_sets,
+    MODELS
+)
+
+from .backtest import (
+    walk_forward,
+    backtest_metrics
+)
+
+from .artifacts import (
+    get_or_compute,
+    latest_artifact,
+    load_artifact,
+    save_artifact,
+    ARTIFACT_DIR
+)
+
 # Package metadata
 __version__ = "1.0.0"
 __author__ = "FullCourtVision"
@@ -67,12 +135,26 @@ __all__ = [
     # Clustering
     'cluster_players', 'get_player_archetype', 'archetype_summary', 'ARCHETYPE_NAMES',
     # Predictions  
-    'scoring_trend_regression', 'train_game_predictor', 'predict_matchup', 'build_game_features',
+    'scoring_trend_regression', 'train_game_predictor', 'compare_predictor_models', 'cheapest_model', 'PREDICTOR_MODELS', 'predict_matchup', 'predict_fixtures', 'build_game_features', 'game_feature_columns',
+    'game_features', 'team_features', 'load_game_predictor', 'GamePredictor',
     # Player Analysis
     'get_player_profile', 'scoring_trend', 'consistency_metrics', 'percentile_rank',
     # Team Analysis  
     'team_record', 'home_away_split', 'grade_standings', 'team_scoring_patterns',
     # Data Loading
-    'load_player_stats', 'load_games', 'load_teams', 'load_players', 'load_organisations',
-    'aggregate_player_career', 'query', 'DB_PATH'
+    'load_player_stats', 'get_player_stats', 'clear_player_stats_cache', 'data_version', 'build_grade_dim', 'load_grade_dim', 'apply_schema', 'memory_report', 'SCHEMA', 'load_games', 'load_table', 'load_teams', 'load_players', 'load_organisations',
+    'aggregate_player_career', 'query', 'query_chunks', 'iter_batches', 'iter_player_stats', 'iter_complete_groups',
+    'aggregate_by_player', 'CHUNK_ROWS', 'DB_PATH',
+    # Team State
+    'TeamStateEngine', 'update_team_state', 'point_in_time_features',
+    # Ratings
+    'EloRatings', 'compute_ratings', 'update_ratings', 'load_game_ratings', 'rating_features', 'RATING_FEATURES',
+    # Simulation
+    'simulate_season', 'simulate_ladder', 'current_ladders',
+    # Evaluation
+    'evaluate_models', 'game_feature_sets', 'MODELS',
+    # Backtest
+    'walk_forward', 'backtest_metrics',
+    # Artifacts
+    'get_or_compute', 'latest_artifact', 'load_artifact', 'save_artifact', 'ARTIFACT_DIR'
 ]
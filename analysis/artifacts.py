@@ -0,0 +1,198 @@
+"""
+FullCourtVision — Artifact Store
+Disk-backed cache for computed results (cluster assignments, fitted scalers
+and KMeans models, trained predictors) shared across processes, restarts and
+replicas that mount the same directory.
+
+An artifact is a dict of named parts saved under
+ARTIFACT_DIR/<name>/<key>/, where key hashes the data version, the source of
+the code that computes it and its parameters. numpy arrays are stored as .npy
+and DataFrames as Arrow IPC files, both memory-mapped on load; anything else
+(fitted estimators) goes through joblib, which memory-maps the arrays inside.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# FCV_ARTIFACT_DIR points replicas at a shared volume
+ARTIFACT_DIR = os.environ.get("FCV_ARTIFACT_DIR", os.path.join(_BASE_DIR, "data", "artifacts"))
+# Versions kept per artifact name; older ones are pruned after each save
+ARTIFACT_KEEP = 3
+
+_META = "artifact.json"
+
+
+def code_hash(*objs: Any) -> str:
+    """Hash of the source code of functions, classes or modules (repr() where source is unavailable).
+
+    Args:
+        *objs: Code the artifact depends on
+
+    Returns:
+        str: 16-hex-digit hash that changes when any of the code changes
+    """
+    digest = hashlib.sha256()
+    for obj in objs:
+        try:
+            text = inspect.getsource(obj)
+        except (OSError, TypeError):
+            text = repr(obj)
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def artifact_key(data_version: str, code: str, params: Optional[Dict] = None) -> str:
+    """Directory key for an artifact built from data_version by code with params."""
+    body = json.dumps({"data_version": data_version, "code": code, "params": params or {}},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+
+
+def _save_part(path: str, value: Any) -> str:
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        np.save(path + ".npy", value)
+        return "npy"
+    if isinstance(value, pd.DataFrame):
+        # Uncompressed so the columns can be memory-mapped back
+        feather.write_feather(value, path + ".arrow", compression="uncompressed")
+        return "arrow"
+    joblib.dump(value, path + ".joblib")
+    return "joblib"
+
+
+def _load_part(path: str, kind: str, mmap: bool) -> Any:
+    mode = "r" if mmap else None
+    if kind == "npy":
+        return np.load(path + ".npy", mmap_mode=mode)
+    if kind == "arrow":
+        return feather.read_table(path + ".arrow", memory_map=mmap).to_pandas()
+    return joblib.load(path + ".joblib", mmap_mode=mode)
+
+
+def load_artifact(name: str, key: str, mmap: bool = True, root: str = ARTIFACT_DIR) -> Optional[Dict[str, Any]]:
+    """Load a saved artifact's parts, or None if it is not on disk.
+
+    Args:
+        name (str): Artifact name, e.g. 'archetypes'
+        key (str): Key from artifact_key()
+        mmap (bool): Memory-map arrays (read-only) instead of reading them into memory
+        root (str): Store directory
+
+    Returns:
+        Optional[Dict[str, Any]]: Part name -> value
+    """
+    directory = os.path.join(root, name, key)
+    try:
+        with open(os.path.join(directory, _META), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        return {part: _load_part(os.path.join(directory, part), kind, mmap) for part, kind in meta["parts"].items()}
+    except (OSError, ValueError, EOFError):
+        return None  # pruned or damaged while reading; the caller recomputes
+
+
+def latest_artifact(name: str, mmap: bool = True, root: str = ARTIFACT_DIR) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(key, parts) of the most recently written version of name that loads, or None.
+
+    For state that is updated incrementally rather than recomputed per key.
+    """
+    base = os.path.join(root, name)
+    if not os.path.isdir(base):
+        return None
+    versions = sorted((d for d in os.listdir(base) if not d.startswith(".")),
+                      key=lambda d: os.path.getmtime(os.path.join(base, d)), reverse=True)
+    for key in versions:
+        parts = load_artifact(name, key, mmap, root)
+        if parts is not None:
+            return key, parts
+    return None
+
+
+def save_artifact(name: str, key: str, parts: Dict[str, Any], root: str = ARTIFACT_DIR,
+                  keep: int = ARTIFACT_KEEP) -> str:
+    """Write an artifact's parts atomically and prune old versions of name.
+
+    The parts are written to a temporary directory that is renamed into place,
+    so concurrent readers and writers (other processes or replicas) only ever
+    see complete artifacts; if another writer got there first, its copy wins.
+
+    Args:
+        name (str): Artifact name
+        key (str): Key from artifact_key()
+        parts (Dict[str, Any]): Part name -> ndarray, DataFrame or picklable object
+        root (str): Store directory
+        keep (int): Versions of name to keep
+
+    Returns:
+        str: Directory holding the artifact
+    """
+    directory = os.path.join(root, name, key)
+    tmp = os.path.join(root, name, f".{key}.{uuid.uuid4().hex}.tmp")
+    os.makedirs(tmp)
+    try:
+        kinds = {part: _save_part(os.path.join(tmp, part), value) for part, value in parts.items()}
+        with open(os.path.join(tmp, _META), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "key": key, "parts": kinds, "created": time.time()}, f)
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    prune(name, keep, root)
+    return directory
+
+
+def prune(name: str, keep: int = ARTIFACT_KEEP, root: str = ARTIFACT_DIR) -> int:
+    """Delete all but the keep most recently written versions of name. Returns how many were removed."""
+    base = os.path.join(root, name)
+    if not os.path.isdir(base):
+        return 0
+    versions = sorted((d for d in os.listdir(base) if not d.startswith(".")),
+                      key=lambda d: os.path.getmtime(os.path.join(base, d)), reverse=True)
+    for d in versions[keep:]:
+        shutil.rmtree(os.path.join(base, d), ignore_errors=True)
+    return len(versions[keep:])
+
+
+def get_or_compute(name: str, compute: Callable[[], Dict[str, Any]], data_version: str,
+                   code: Iterable[Any] = (), params: Optional[Dict] = None, mmap: bool = True,
+                   root: str = ARTIFACT_DIR) -> Dict[str, Any]:
+    """Load an artifact if this data version, code and params already produced one, else compute and save it.
+
+    Args:
+        name (str): Artifact name
+        compute (Callable): Returns the artifact's parts as a dict
+        data_version (str): Version of the input data (data_loader.data_version())
+        code (Iterable): Functions/modules whose source the result depends on (compute itself is always included)
+        params (Optional[Dict]): Parameters the result depends on (JSON-serialisable)
+        mmap (bool): Memory-map arrays on load
+        root (str): Store directory
+
+    Returns:
+        Dict[str, Any]: The artifact's parts (memory-mapped arrays are read-only)
+    """
+    key = artifact_key(data_version, code_hash(compute, *code), params)
+    parts = load_artifact(name, key, mmap, root)
+    if parts is None:
+        parts = compute()
+        try:
+            save_artifact(name, key, parts, root)
+        except OSError:
+            pass  # read-only or full store: serve the fresh result uncached
+    return parts
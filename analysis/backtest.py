@@ -0,0 +1,147 @@
+"""
+FullCourtVision — Walk-Forward Backtest
+Replays completed games in date order the way the Game Predictor would have
+met them: every retrain_every weeks the outcome model is refitted on the games
+played so far and scores the games of the following weeks, so no result is
+predicted by a model that saw it or anything after it.
+
+Features come from the incremental team state (team_state.py) and the Elo
+tables (ratings.py), both built in one pass over the games as of each kickoff,
+so a step only refits the classifier on rows already in memory. Brier score,
+log-loss and accuracy are reported per week, grade and round.
+"""
+
+import time
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_games, DB_PATH
+from predictions import build_game_features, game_feature_columns, PREDICTOR_MODELS, PREDICTOR_MODEL
+
+# Weeks between refits
+RETRAIN_EVERY = 4
+# Weeks of results before the first prediction
+WARMUP_WEEKS = 8
+# Probabilities are clipped to [EPS, 1 - EPS] for the log-loss
+EPS = 1e-15
+
+PREDICTION_COLUMNS = ['game_id', 'date', 'week', 'step', 'grade_id', 'grade_name', 'round_id', 'round_name',
+                      'train_games', 'home_win_prob', 'home_win']
+
+
+def walk_forward(db_path: str = DB_PATH, model: str = PREDICTOR_MODEL, retrain_every: int = RETRAIN_EVERY,
+                 warmup_weeks: int = WARMUP_WEEKS, ratings: bool = True,
+                 max_train_games: Optional[int] = None) -> pd.DataFrame:
+    """Walk-forward predictions for every completed game after the warm-up.
+
+    Weeks run Monday to Sunday. Before each block of retrain_every weeks the
+    PREDICTOR_MODELS classifier is fitted on every earlier game (or the latest
+    max_train_games) and predicts the block. Only games where both teams have
+    MIN_TEAM_GAMES results before kickoff are used, as in training.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        model (str): PREDICTOR_MODELS entry
+        retrain_every (int): Weeks between refits
+        warmup_weeks (int): Weeks of games used only for training before the first prediction
+        ratings (bool): Include pre-game Elo ratings in the features
+        max_train_games (Optional[int]): Train on a sliding window of this many
+                                         latest games instead of all earlier games
+
+    Returns:
+        pd.DataFrame: PREDICTION_COLUMNS, one row per predicted game in date order;
+        home_win_prob is 0-1, home_win the result (draws count as not a home win)
+    """
+    features = build_game_features(db_path, point_in_time=True, ratings=ratings)
+    games = load_games(db_path)
+    games = games.assign(game_id=games['id'].astype(str)).drop_duplicates('game_id').set_index('game_id')
+    context = games.loc[features.index, ['date', 'grade_id', 'grade_name', 'round_id', 'round_name']]
+    dated = context['date'].notna().to_numpy()
+    features, context = features[dated], context[dated]
+
+    # Monday-based week number of every game, in kickoff order
+    days = (context['date'].to_numpy(dtype='datetime64[D]') - np.datetime64('1970-01-05')).astype(np.int64)
+    order = np.argsort(days, kind='stable')
+    week = days[order] // 7
+    X = features[game_feature_columns(point_in_time=True, ratings=ratings)].to_numpy(dtype=float)[order]
+    y = features['home_win'].to_numpy(dtype=int)[order]
+
+    make_classifier = PREDICTOR_MODELS[model][0]
+    first_week = week[0] if len(week) else 0
+    step_of = (week - first_week - warmup_weeks) // retrain_every
+    bounds = np.searchsorted(step_of, np.arange(0, step_of.max() + 2 if len(step_of) else 0))
+
+    probs = np.full(len(y), np.nan)
+    train_games = np.zeros(len(y), dtype=int)
+    for step in range(len(bounds) - 1):
+        start, end = bounds[step], bounds[step + 1]
+        if start == end:
+            continue
+        lo = 0 if max_train_games is None else max(0, start - max_train_games)
+        if len(np.unique(y[lo:start])) < 2:
+            continue
+        clf = make_classifier().fit(X[lo:start], y[lo:start])
+        probs[start:end] = clf.predict_proba(X[start:end])[:, list(clf.classes_).index(1)]
+        train_games[start:end] = start - lo
+
+    predicted = ~np.isnan(probs)
+    rows = order[predicted]
+    out = context.iloc[rows].reset_index()
+    out['week'] = (np.datetime64('1970-01-05') + (week[predicted] * 7).astype('timedelta64[D]')).astype('datetime64[ns]')
+    out['step'] = step_of[predicted]
+    out['train_games'] = train_games[predicted]
+    out['home_win_prob'] = probs[predicted]
+    out['home_win'] = y[predicted]
+    return out[PREDICTION_COLUMNS]
+
+
+def backtest_metrics(predictions: pd.DataFrame, by: Union[str, Sequence[str], None] = None) -> pd.DataFrame:
+    """Brier score, log-loss and accuracy of walk_forward() predictions, overall or per group.
+
+    Args:
+        predictions (pd.DataFrame): walk_forward() output
+        by (Union[str, Sequence[str], None]): Columns to group by, e.g. 'week',
+                                              'grade_id' or ['grade_id', 'round_name']
+
+    Returns:
+        pd.DataFrame: games, accuracy, brier, log_loss and mean home_win_prob
+        (calibration check against home_win_rate) per group, or one row overall
+    """
+    p = predictions['home_win_prob'].to_numpy(dtype=float)
+    y = predictions['home_win'].to_numpy(dtype=float)
+    clipped = np.clip(p, EPS, 1 - EPS)
+    scored = pd.DataFrame({
+        'correct': ((p >= 0.5) == (y == 1)).astype(float),
+        'brier': (p - y) ** 2,
+        'log_loss': -(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)),
+        'home_win_prob': p,
+        'home_win_rate': y,
+    }, index=predictions.index)
+    if by is None:
+        grouped = scored.groupby(np.zeros(len(scored), dtype=int))
+    else:
+        keys = [by] if isinstance(by, str) else list(by)
+        grouped = scored.groupby([predictions[k] for k in keys], observed=True, sort=True)
+    metrics = grouped.mean().rename(columns={'correct': 'accuracy'})
+    metrics.insert(0, 'games', grouped.size())
+    metrics = metrics.round(4)
+    return metrics.reset_index(drop=by is None)
+
+
+if __name__ == "__main__":
+    import sys
+
+    models = [m for m in PREDICTOR_MODELS if m in sys.argv[1:]] or [PREDICTOR_MODEL]
+    for name in models:
+        start = time.perf_counter()
+        predictions = walk_forward(model=name)
+        elapsed = time.perf_counter() - start
+        overall = backtest_metrics(predictions).iloc[0]
+        print(f"{name}: {len(predictions):,} games over {predictions['step'].nunique()} refits in {elapsed:.1f}s — "
+              f"accuracy {overall['accuracy']:.3f}, Brier {overall['brier']:.4f}, log-loss {overall['log_loss']:.4f}")
+    by_week = backtest_metrics(predictions, 'week')
+    print(by_week.tail(8).to_string(index=False))
+    by_grade = backtest_metrics(predictions, ['grade_name'])
+    print(by_grade.sort_values('games', ascending=False).head(8).to_string(index=False))
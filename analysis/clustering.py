@@ -8,7 +8,8 @@ import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from typing import Dict, Union, Optional
-from data_loader import load_player_stats, DB_PATH
+from data_loader import load_player_stats, data_version, DB_PATH
+from artifacts import get_or_compute
 
 
 ARCHETYPE_NAMES = {
@@ -28,6 +29,10 @@ def cluster_players(min_games: int = 5, n_clusters: int = 5, db_path: str = DB_P
     Applies K-means clustering to player statistics (PPG, shot types, fouls) to
     identify distinct playing styles. Automatically assigns meaningful archetype
     names based on cluster characteristics.
+
+    The result is saved in the artifact store (artifacts.py) with the fitted
+    scaler and KMeans model, so later calls with the same data and parameters,
+    in any process, load it instead of refitting.
     
     Args:
         min_games (int): Minimum games played to include player in analysis
@@ -44,10 +49,15 @@ def cluster_players(min_games: int = 5, n_clusters: int = 5, db_path: str = DB_P
             - archetype: Named archetype (Sharpshooter, Inside Scorer, etc.)
             - player_name: Full name (first + last)
     """
-    stats = load_player_stats()
+    artifact = get_or_compute(
+        "player_clusters", lambda: _fit_clusters(load_player_stats(db_path), min_games, n_clusters),
+        data_version(db_path), code=[_fit_clusters], params={"min_games": min_games, "n_clusters": n_clusters})
+    return artifact["players"]
+
 
+def _fit_clusters(stats: pd.DataFrame, min_games: int, n_clusters: int) -> Dict[str, object]:
     # Aggregate per player
-    agg = stats.groupby(['player_id', 'first_name', 'last_name']).agg({
+    agg = stats.groupby(['player_id', 'first_name', 'last_name'], observed=True).agg({
         'games_played': 'sum', 'total_points': 'sum',
         'one_point': 'sum', 'two_point': 'sum', 'three_point': 'sum',
         'total_fouls': 'sum',
@@ -60,7 +70,7 @@ def cluster_players(min_games: int = 5, n_clusters: int = 5, db_path: str = DB_P
     agg['fg2_pg'] = agg['two_point'] / gp
     agg['fg3_pg'] = agg['three_point'] / gp
     agg['fpg'] = agg['total_fouls'] / gp
-    agg['player_name'] = agg['first_name'] + ' ' + agg['last_name']
+    agg['player_name'] = agg['first_name'].str.cat(agg['last_name'], sep=' ')
 
     X = agg[FEATURE_COLS].fillna(0).values
     scaler = StandardScaler()
@@ -99,7 +109,7 @@ def cluster_players(min_games: int = 5, n_clusters: int = 5, db_path: str = DB_P
         assigned[c] = "Balanced"
 
     agg['archetype'] = agg['cluster'].map(assigned)
-    return agg
+    return {'players': agg, 'scaler': scaler, 'kmeans': kmeans, 'centroids': kmeans.cluster_centers_}
 
 
 def get_player_archetype(player_id: str, clustered_df: Optional[pd.DataFrame] = None,
@@ -1,23 +1,102 @@
 """
 FullCourtVision — Data Loader
 Dual-source: SQLite (local) with parquet fallback (Streamlit Cloud).
+Parquet files exported before the surrogate keys get their *_key columns
+derived on read (surrogate_keys.derive_keys()).
 """
 
 import os
 import re
 import sqlite3
+import sys
+import threading
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from db_pool import get_pool
+from data_manifest import source_version
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(_BASE_DIR, "data", "playhq.db")
 PARQUET_DIR = os.path.join(_BASE_DIR, "data", "parquet")
 
-
-def _use_sqlite() -> bool:
+if _BASE_DIR not in sys.path:
+    sys.path.append(_BASE_DIR)
+
+import surrogate_keys
+
+
+# Column dtypes applied by apply_schema() to every loaded frame; unlisted columns keep
+# their inferred dtype. Keys and labels repeat across rows, so as categoricals each
+# distinct string is stored once; unique primary keys ('id') are left as strings.
+SCHEMA: Dict[str, str] = {
+    # Integer surrogate keys (surrogate_keys.py)
+    'player_key': 'int32', 'grade_key': 'int32', 'season_key': 'int32', 'team_key': 'int32',
+    'home_team_key': 'int32', 'away_team_key': 'int32',
+    # UUID foreign keys
+    'player_id': 'category', 'grade_id': 'category', 'season_id': 'category',
+    'team_id': 'category', 'home_team_id': 'category', 'away_team_id': 'category',
+    'organisation_id': 'category', 'competition_id': 'category', 'round_id': 'category',
+    # Names and labels
+    'first_name': 'category', 'last_name': 'category', 'team_name': 'category',
+    'grade_name': 'category', 'season_name': 'category', 'org_name': 'category',
+    'home_team_name': 'category', 'away_team_name': 'category', 'round_name': 'category',
+    'venue': 'category', 'court': 'category', 'status': 'category', 'type': 'category',
+    'age_group': 'category', 'gender': 'category',
+    # Per-line counters and scores
+    'games_played': 'int16', 'total_points': 'int16', 'one_point': 'int16',
+    'two_point': 'int16', 'three_point': 'int16', 'total_fouls': 'int16',
+    'ranking': 'int16', 'home_score': 'int16', 'away_score': 'int16', 'number': 'int16',
+    # Dates
+    'date': 'datetime64[ns]', 'season_start': 'datetime64[ns]', 'start_date': 'datetime64[ns]',
+    'end_date': 'datetime64[ns]', 'provisional_date': 'datetime64[ns]',
+}
+
+# Default rows per chunk for the streaming loaders (query_chunks, iter_batches, iter_player_stats)
+CHUNK_ROWS = 100_000
+
+# db_path -> (data version, enriched player_stats frame, row positions per player_id)
+_player_stats_cache: Dict[str, Tuple[str, pd.DataFrame, Dict[str, np.ndarray]]] = {}
+_player_stats_lock = threading.Lock()
+
+
+def _use_sqlite(db_path: str = DB_PATH) -> bool:
     """Check if SQLite DB is available."""
-    return os.path.isfile(DB_PATH)
+    return os.path.isfile(db_path)
+
+
+def data_version(db_path: str = DB_PATH) -> str:
+    """Version of the source data from its data_version.json manifest (see data_manifest.py).
+
+    Stays the same until a writer stamps different content, so caches keyed on
+    it survive file rewrites that leave the data unchanged.
+    """
+    return source_version(db_path if _use_sqlite(db_path) else PARQUET_DIR)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast df's columns to their SCHEMA dtypes in place and return it.
+
+    Integer columns holding NULLs (unplayed games' scores) become float32 so
+    missing values stay NaN.
+    """
+    for col in df.columns.intersection(list(SCHEMA)):
+        dtype = SCHEMA[col]
+        if df[col].dtype == dtype:
+            continue
+        if dtype.startswith('datetime'):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        elif dtype.startswith('int'):
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype('float32' if values.isna().any() else dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
 
 
 def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
@@ -26,23 +105,72 @@ def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
 
 
 def query(sql: str, params=None, db_path: str = DB_PATH) -> pd.DataFrame:
-    """Execute a SQL query and return a DataFrame (SQLite only)."""
-    conn = get_connection(db_path)
-    return pd.read_sql_query(sql, conn, params=params or [])
+    """Execute a SQL query on a pooled read-only connection and return a DataFrame (SQLite only)."""
+    with get_pool(db_path).connection() as conn:
+        return pd.read_sql_query(sql, conn, params=params or [])
+
+
+def query_chunks(sql: str, params=None, chunksize: int = CHUNK_ROWS, db_path: str = DB_PATH) -> Iterator[pd.DataFrame]:
+    """Like query(), but yield the result in DataFrames of at most chunksize rows (SQLite only).
+
+    The pooled connection stays checked out until the generator is exhausted or closed.
+    """
+    with get_pool(db_path).connection() as conn:
+        yield from pd.read_sql_query(sql, conn, params=params or [], chunksize=chunksize)
 
 
 def _load_parquet(table: str) -> pd.DataFrame:
-    """Load a table from parquet."""
+    """Load a table from parquet, deriving any surrogate key columns the file lacks."""
     path = os.path.join(PARQUET_DIR, f"{table}.parquet")
     if not os.path.isfile(path):
         raise FileNotFoundError(f"Parquet file not found: {path}")
-    return pd.read_parquet(path)
+    return surrogate_keys.derive_keys(table, pd.read_parquet(path), _entity_ids)
 
 
-def load_table(table: str) -> pd.DataFrame:
-    """Load a raw table from SQLite or parquet fallback."""
+def _entity_ids(table: str) -> pd.DataFrame:
+    """An entity table's id column, and its own key column if the file has one."""
+    path = os.path.join(PARQUET_DIR, f"{table}.parquet")
+    if not os.path.isfile(path):
+        return pd.DataFrame({"id": pd.Series(dtype=object)})
+    own_key = surrogate_keys.KEY_COLUMNS[table][0][0]
+    stored = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=[c for c in ("id", own_key) if c in stored])
+
+
+def _iter_parquet(table: str, columns: Optional[List[str]] = None, batch_size: int = CHUNK_ROWS) -> Iterator[pa.RecordBatch]:
+    path = os.path.join(PARQUET_DIR, f"{table}.parquet")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Parquet file not found: {path}")
+    yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+
+
+def iter_batches(table: str, columns: Optional[List[str]] = None, batch_size: int = CHUNK_ROWS) -> Iterator[pa.RecordBatch]:
+    """Stream a raw table as Arrow record batches without loading it whole.
+
+    Args:
+        table (str): Table name
+        columns (Optional[List[str]]): Columns to read (all if None)
+        batch_size (int): Maximum rows per batch
+
+    Yields:
+        pa.RecordBatch: Batches in storage order (SQLite rowid order or parquet row order)
+    """
     if _use_sqlite():
-        return query(f"SELECT * FROM [{table}]")
+        cols = ", ".join(f"[{c}]" for c in columns) if columns else "*"
+        for chunk in query_chunks(f"SELECT {cols} FROM [{table}]", chunksize=batch_size):
+            yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+    else:
+        yield from _iter_parquet(table, columns, batch_size)
+
+
+def load_table(table: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Load a raw table from SQLite or parquet fallback, typed by SCHEMA."""
+    return apply_schema(_read_table(table, db_path))
+
+
+def _read_table(table: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    if _use_sqlite(db_path):
+        return query(f"SELECT * FROM [{table}]", db_path=db_path)
     return _load_parquet(table)
 
 
@@ -51,54 +179,288 @@ def load_players() -> pd.DataFrame:
     return load_table("players")
 
 
-def load_player_stats() -> pd.DataFrame:
+def load_player_stats(db_path: str = DB_PATH) -> pd.DataFrame:
     """Load player statistics with enriched per-game metrics and contextual data.
     
     Loads raw player statistics and joins with grades, seasons, and player info
     to create a comprehensive dataset. Automatically calculates per-game metrics
     and extracts age group classifications.
+
+    The frame is built once per process and data version and shared by every
+    caller, so treat it as read-only (filter or .copy() before adding columns).
+    Use get_player_stats() for a single player's rows. Columns are typed by
+    SCHEMA: IDs and names are categoricals, so group on them with
+    observed=True.
+
+    Args:
+        db_path (str): Path to the SQLite database file
     
     Returns:
         pd.DataFrame: Enriched player statistics including:
             - Raw stats: games_played, total_points, one_point, two_point, three_point, total_fouls
             - Derived metrics: ppg, fpg, ft_pg, fg2_pg, fg3_pg (all per-game)
             - Context: grade_name, season_name, season_start, first_name, last_name
-            - Classification: age_group (extracted from grade_name, e.g., 'U14', 'Senior')
+            - Classification: age_group ('U14', 'Senior' if none) and gender, from the grade dimension
     """
-    if _use_sqlite():
-        df = query("""
-            SELECT ps.*, g.name as grade_name, s.name as season_name, s.start_date as season_start,
-                   p.first_name, p.last_name
-            FROM player_stats ps
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN seasons s ON g.season_id = s.id
-            JOIN players p ON ps.player_id = p.id
-        """)
+    return _player_stats_entry(db_path)[1]
+
+
+def get_player_stats(player_id: str, db_path: str = DB_PATH) -> pd.DataFrame:
+    """One player's rows of load_player_stats(), looked up by index rather than reloaded.
+
+    Args:
+        player_id (str): Unique identifier for the player
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        pd.DataFrame: The player's stat lines (an independent copy; empty if unknown)
+    """
+    _, df, positions = _player_stats_entry(db_path)
+    rows = positions.get(player_id)
+    if rows is None:
+        return df.iloc[0:0].copy()
+    return df.take(rows)
+
+
+def clear_player_stats_cache() -> None:
+    """Drop the cached player_stats frames (they also rebuild on their own when the data changes)."""
+    with _player_stats_lock:
+        _player_stats_cache.clear()
+
+
+def _player_stats_entry(db_path: str) -> Tuple[str, pd.DataFrame, Dict[str, np.ndarray]]:
+    version = data_version(db_path)
+    key = os.path.abspath(db_path)
+    with _player_stats_lock:
+        entry = _player_stats_cache.get(key)
+        if entry is None or entry[0] != version:
+            df = apply_schema(_build_player_stats(db_path))
+            positions = df.groupby('player_id', observed=True, sort=False).indices
+            entry = _player_stats_cache[key] = (version, df, positions)
+        return entry
+
+
+_PLAYER_STATS_SQL = """
+    SELECT ps.*, g.name as grade_name, s.name as season_name, s.start_date as season_start,
+           p.first_name, p.last_name
+    FROM player_stats ps
+    JOIN grades g ON g.grade_key = ps.grade_key
+    JOIN seasons s ON s.season_key = g.season_key
+    JOIN players p ON p.player_key = ps.player_key
+"""
+
+
+def _build_player_stats(db_path: str) -> pd.DataFrame:
+    if _use_sqlite(db_path):
+        df = query(_PLAYER_STATS_SQL, db_path=db_path)
     else:
-        ps = _load_parquet("player_stats")
-        g = _load_parquet("grades")[["id", "name", "season_id"]].rename(columns={"id": "grade_id", "name": "grade_name"})
-        s = _load_parquet("seasons")[["id", "name", "start_date"]].rename(columns={"id": "season_id", "name": "season_name", "start_date": "season_start"})
-        p = _load_parquet("players")[["id", "first_name", "last_name"]].rename(columns={"id": "player_id"})
-        df = ps.merge(g, on="grade_id", how="left")
-        df = df.merge(s, on="season_id", how="left")
-        df = df.merge(p, on="player_id", how="left")
+        df = _join_player_stats(_load_parquet("player_stats"), _player_stats_lookups())
+    return _add_player_stats_columns(df, load_grade_dim(db_path))
+
+
+def _player_stats_lookups() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    g = _load_parquet("grades")[["grade_key", "name", "season_key"]].rename(columns={"name": "grade_name"})
+    s = _load_parquet("seasons")[["season_key", "name", "start_date"]].rename(columns={"name": "season_name", "start_date": "season_start"})
+    p = _load_parquet("players")[["player_key", "first_name", "last_name"]]
+    return g, s, p
+
+
+def _join_player_stats(ps: pd.DataFrame, lookups: Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]) -> pd.DataFrame:
+    g, s, p = lookups
+    df = ps.merge(g, on="grade_key", how="left")
+    df = df.merge(s, on="season_key", how="left")
+    return df.merge(p, on="player_key", how="left")
 
+
+def _add_player_stats_columns(df: pd.DataFrame, grade_dim: pd.DataFrame) -> pd.DataFrame:
     gp = df['games_played'].clip(lower=1)
     df['ppg'] = (df['total_points'] / gp).round(2)
     df['fpg'] = (df['total_fouls'] / gp).round(2)
     df['ft_pg'] = (df['one_point'] / gp).round(2)
     df['fg2_pg'] = (df['two_point'] / gp).round(2)
     df['fg3_pg'] = (df['three_point'] / gp).round(2)
-    df['age_group'] = df['grade_name'].apply(extract_age_group)
 
+    df = df.merge(grade_dim[['grade_key', 'age_group', 'gender']], on='grade_key', how='left')
+    df['age_group'] = df['age_group'].fillna('Senior')
     return df
 
 
-def load_games() -> pd.DataFrame:
+def iter_player_stats(chunksize: int = CHUNK_ROWS, db_path: str = DB_PATH) -> Iterator[pd.DataFrame]:
+    """Stream the rows of load_player_stats() in chunks, ordered by player_id.
+
+    Peak memory is one chunk plus the grade/season/player lookups rather than
+    the whole table. Pass the chunks to aggregate_by_player() to run
+    per-player aggregations without building the full frame.
+
+    Args:
+        chunksize (int): Maximum rows per chunk
+        db_path (str): Path to the SQLite database file
+
+    Yields:
+        pd.DataFrame: Chunks with the same columns and dtypes as load_player_stats()
+    """
+    grade_dim = load_grade_dim(db_path)
+    if _use_sqlite(db_path):
+        chunks = query_chunks(_PLAYER_STATS_SQL + " ORDER BY ps.player_id", chunksize=chunksize, db_path=db_path)
+    else:
+        # player_stats.parquet is written sorted by player_id (export_data.SORT_KEYS)
+        lookups = _player_stats_lookups()
+        entity_ids = lru_cache(maxsize=None)(_entity_ids)
+        chunks = (_join_player_stats(surrogate_keys.derive_keys("player_stats", batch.to_pandas(), entity_ids), lookups)
+                  for batch in _iter_parquet("player_stats", batch_size=chunksize))
+    for chunk in chunks:
+        yield apply_schema(_add_player_stats_columns(chunk, grade_dim))
+
+
+def iter_complete_groups(chunks: Iterable[pd.DataFrame], key: str = 'player_id') -> Iterator[pd.DataFrame]:
+    """Re-cut chunks sorted on key so that every yielded frame holds whole groups.
+
+    The rows of each chunk's last key are held back and prepended to the next
+    chunk, so no group is split across frames and memory stays at about one
+    chunk.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Frames sorted on key, e.g. from iter_player_stats()
+        key (str): Grouping column
+
+    Yields:
+        pd.DataFrame: Consecutive blocks of complete groups
+
+    Raises:
+        ValueError: If the chunks are not sorted on key
+    """
+    carry = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        keys = chunk[key].to_numpy()
+        if (keys[1:] < keys[:-1]).any():
+            raise ValueError(f"Chunks are not sorted on {key!r}")
+        tail = keys == keys[-1]
+        carry = chunk[tail]
+        if not tail.all():
+            yield chunk[~tail]
+    if carry is not None:
+        yield carry
+
+
+def aggregate_by_player(func: Callable[[pd.DataFrame], pd.DataFrame], chunks: Iterable[pd.DataFrame],
+                        key: str = 'player_id') -> pd.DataFrame:
+    """Run a per-player aggregation over streamed chunks.
+
+    func is applied to each block of whole players from iter_complete_groups()
+    and the results are concatenated. For an aggregation that only combines a
+    player's own rows and returns them sorted by key (a groupby on key, such as
+    aggregate_player_career), this gives the same rows in the same order as
+    func on the whole frame.
+
+    Args:
+        func (Callable): Aggregation taking and returning a DataFrame
+        chunks (Iterable[pd.DataFrame]): Frames sorted on key, e.g. from iter_player_stats()
+        key (str): Player column the chunks are sorted on
+
+    Returns:
+        pd.DataFrame: Concatenated results (empty if there were no rows)
+    """
+    parts = [func(block) for block in iter_complete_groups(chunks, key)]
+    if not parts:
+        return pd.DataFrame()
+    # Empty results from blocks with no qualifying players would upcast the dtypes
+    filled = [part for part in parts if len(part)] or parts[:1]
+    return pd.concat(filled, ignore_index=True)
+
+
+# Grade-name patterns for build_grade_dim()
+_AGE_PATTERN = r'(?i)\b(?:U|Under\s*)(\d{1,2})'
+_TIER_LETTER_PATTERN = r'(?:^|U\d{1,2}|[Bb]oys|[Gg]irls|[Mm]en|[Ww]omen)\s*([A-J])(?:\d{1,2}|[A-Z])?\b'
+_TIER_NUMBER_PATTERN = r'(?i)\b(?:division|section|div|boys|girls)\s*0*(\d+)'
+
+
+def build_grade_dim(grades: pd.DataFrame, seasons: pd.DataFrame) -> pd.DataFrame:
+    """Derive per-grade attributes from grade and season names with vectorized string ops.
+
+    Args:
+        grades (pd.DataFrame): grades table (id, season_id, name; grade_key and
+            season_key are carried through when present)
+        seasons (pd.DataFrame): seasons table (id, name, start_date)
+
+    Returns:
+        pd.DataFrame: One row per grade including:
+            - grade_key, season_key (if given), grade_id, season_id
+            - age_group: Zero-padded age group ('U08', 'U14'); None when the name has none
+            - gender: 'Boys', 'Girls', 'Mixed', 'Men', 'Women' or 'Unknown'
+            - division_tier: 1 for A grades, 2 for B, ... or the Division/Section number; None if absent
+            - season_order: Chronological index of the season name (0 = earliest)
+    """
+    names = grades['name'].fillna('')
+    ages = names.str.extract(_AGE_PATTERN, expand=False)
+    age_group = ('U' + ages.str.zfill(2)).where(ages.notna(), None)
+
+    lowered = names.str.lower()
+    boys = lowered.str.contains(r'\bboys\b')
+    girls = lowered.str.contains(r'\bgirls\b')
+    gender = np.select(
+        [(boys & girls) | lowered.str.contains(r'\bmixed\b'), boys, girls,
+         lowered.str.contains(r'\bwomen\b'), lowered.str.contains(r'\bmen\b')],
+        ['Mixed', 'Boys', 'Girls', 'Women', 'Men'], default='Unknown')
+
+    letter = names.str.extract(_TIER_LETTER_PATTERN, expand=False)
+    number = names.str.extract(_TIER_NUMBER_PATTERN, expand=False)
+    tier = (letter.str.encode('ascii').str[0] - ord('A') + 1).fillna(pd.to_numeric(number))
+
+    # All seasons sharing a name (e.g. every 'Winter 2024' competition) share an order
+    first_start = pd.to_datetime(seasons['start_date'], errors='coerce').groupby(seasons['name']).min()
+    name_order = first_start.rank(method='dense') - 1
+    season_order = seasons.set_index('id')['name'].map(name_order)
+
+    dim = pd.DataFrame({
+        'grade_id': grades['id'].values,
+        'season_id': grades['season_id'].values,
+        'age_group': age_group.values,
+        'gender': gender,
+        'division_tier': tier.astype('Int64').values,
+        'season_order': grades['season_id'].map(season_order).astype('Int64').values,
+    })
+    for col in ('season_key', 'grade_key'):
+        if col in grades:
+            dim.insert(0, col, grades[col].values)
+    return dim
+
+
+def load_grade_dim(db_path: str = DB_PATH) -> pd.DataFrame:
+    """Load the grade dimension written by build_aggregates.py, deriving it if absent.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        pd.DataFrame: See build_grade_dim()
+    """
+    if _use_sqlite(db_path):
+        if not query("SELECT 1 FROM sqlite_master WHERE name = 'grade_dim'", db_path=db_path).empty:
+            dim = query("SELECT * FROM grade_dim", db_path=db_path)
+            return dim.astype({"division_tier": "Int64", "season_order": "Int64"})
+        grades = query("SELECT id, season_id, name, grade_key, season_key FROM grades", db_path=db_path)
+        seasons = query("SELECT id, name, start_date FROM seasons", db_path=db_path)
+    else:
+        if os.path.isfile(os.path.join(PARQUET_DIR, "grade_dim.parquet")):
+            dim = _load_parquet("grade_dim")
+            return dim.astype({"division_tier": "Int64", "season_order": "Int64"})
+        grades = _load_parquet("grades")
+        seasons = _load_parquet("seasons")
+    return build_grade_dim(grades, seasons)
+
+
+def load_games(db_path: str = DB_PATH) -> pd.DataFrame:
     """Load game data with team names and calculated game metrics.
     
     Loads raw game records and enriches with team names, grade/season context,
     and derived metrics like point margins and total scores.
+
+    Args:
+        db_path (str): Path to the SQLite database file
     
     Returns:
         pd.DataFrame: Enriched game data including:
@@ -107,48 +469,56 @@ def load_games() -> pd.DataFrame:
             - Context: grade_name, season_name
             - Derived metrics: margin (home - away), total_score (home + away)
             - Parsed date: Converted to datetime format
+        IDs and names are categoricals and scores int16 (see SCHEMA).
     """
-    if _use_sqlite():
+    return apply_schema(_build_games(db_path))
+
+
+def _build_games(db_path: str = DB_PATH) -> pd.DataFrame:
+    if _use_sqlite(db_path):
         df = query("""
-            SELECT g.*, ht.name as home_team_name, at.name as away_team_name,
-                   gr.name as grade_name, s.name as season_name
+            SELECT g.*, ht.name as home_team_name, awt.name as away_team_name,
+                   gr.season_id, gr.season_key, gr.name as grade_name, s.name as season_name
             FROM games g
-            JOIN teams ht ON g.home_team_id = ht.id
-            JOIN teams at ON g.away_team_id = at.id
-            JOIN grades gr ON g.grade_id = gr.id
-            JOIN seasons s ON gr.season_id = s.id
-        """)
+            JOIN teams ht ON ht.team_key = g.home_team_key
+            JOIN teams awt ON awt.team_key = g.away_team_key
+            JOIN grades gr ON gr.grade_key = g.grade_key
+            JOIN seasons s ON s.season_key = gr.season_key
+        """, db_path=db_path)
     else:
         g = _load_parquet("games")
-        t = _load_parquet("teams")[["id", "name"]]
-        gr = _load_parquet("grades")[["id", "name", "season_id"]].rename(columns={"name": "grade_name"})
-        s = _load_parquet("seasons")[["id", "name"]].rename(columns={"name": "season_name"})
-        df = g.merge(t.rename(columns={"id": "home_team_id", "name": "home_team_name"}), on="home_team_id", how="left")
-        df = df.merge(t.rename(columns={"id": "away_team_id", "name": "away_team_name"}), on="away_team_id", how="left")
-        df = df.merge(gr.rename(columns={"id": "grade_id"}), on="grade_id", how="left")
-        df = df.merge(s.rename(columns={"id": "season_id"}), on="season_id", how="left")
-
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+        t = _load_parquet("teams")[["team_key", "name"]]
+        gr = _load_parquet("grades")[["grade_key", "name", "season_id", "season_key"]].rename(columns={"name": "grade_name"})
+        s = _load_parquet("seasons")[["season_key", "name"]].rename(columns={"name": "season_name"})
+        df = g.merge(t.rename(columns={"team_key": "home_team_key", "name": "home_team_name"}), on="home_team_key", how="left")
+        df = df.merge(t.rename(columns={"team_key": "away_team_key", "name": "away_team_name"}), on="away_team_key", how="left")
+        df = df.merge(gr, on="grade_key", how="left")
+        df = df.merge(s, on="season_key", how="left")
+
     df['margin'] = df['home_score'] - df['away_score']
     df['total_score'] = df['home_score'] + df['away_score']
     return df
 
 
-def load_teams() -> pd.DataFrame:
-    """Load all teams."""
-    if _use_sqlite():
+def load_teams(db_path: str = DB_PATH) -> pd.DataFrame:
+    """Load all teams with organisation and season names, typed by SCHEMA."""
+    return apply_schema(_build_teams(db_path))
+
+
+def _build_teams(db_path: str = DB_PATH) -> pd.DataFrame:
+    if _use_sqlite(db_path):
         return query("""
             SELECT t.*, o.name as org_name, s.name as season_name
             FROM teams t
             JOIN organisations o ON t.organisation_id = o.id
-            JOIN seasons s ON t.season_id = s.id
-        """)
+            JOIN seasons s ON s.season_key = t.season_key
+        """, db_path=db_path)
     else:
         t = _load_parquet("teams")
         o = _load_parquet("organisations")[["id", "name"]].rename(columns={"id": "organisation_id", "name": "org_name"})
-        s = _load_parquet("seasons")[["id", "name"]].rename(columns={"id": "season_id", "name": "season_name"})
+        s = _load_parquet("seasons")[["season_key", "name"]].rename(columns={"name": "season_name"})
         df = t.merge(o, on="organisation_id", how="left")
-        df = df.merge(s, on="season_id", how="left")
+        df = df.merge(s, on="season_key", how="left")
         return df
 
 
@@ -174,7 +544,7 @@ def aggregate_player_career(stats_df: pd.DataFrame) -> pd.DataFrame:
             - Breadth metrics: num_grades, num_seasons (diversity of experience)
             - Identity: player_id, first_name, last_name, player_name
     """
-    career = stats_df.groupby(['player_id', 'first_name', 'last_name']).agg({
+    career = stats_df.groupby(['player_id', 'first_name', 'last_name'], observed=True).agg({
         'games_played': 'sum',
         'total_points': 'sum',
         'one_point': 'sum',
@@ -189,15 +559,46 @@ def aggregate_player_career(stats_df: pd.DataFrame) -> pd.DataFrame:
     career['ppg'] = (career['total_points'] / gp).round(2)
     career['fpg'] = (career['total_fouls'] / gp).round(2)
     career['fg3_pg'] = (career['three_point'] / gp).round(2)
-    career['player_name'] = career['first_name'] + ' ' + career['last_name']
+    career['player_name'] = career['first_name'].str.cat(career['last_name'], sep=' ')
 
     return career
 
 
+def memory_report(db_path: str = DB_PATH) -> pd.DataFrame:
+    """Resident memory of each loaded frame before and after SCHEMA typing.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        pd.DataFrame: One row per frame with rows, untyped_mb, typed_mb and
+            reduction (untyped / typed), plus a TOTAL row
+    """
+    builders = {
+        'player_stats': lambda: _build_player_stats(db_path),
+        'games': lambda: _build_games(db_path),
+        'teams': lambda: _build_teams(db_path),
+        'players': lambda: _read_table('players', db_path),
+        'organisations': lambda: _read_table('organisations', db_path),
+    }
+    rows = []
+    for name, build in builders.items():
+        df = build()
+        untyped = df.memory_usage(deep=True).sum()
+        typed = apply_schema(df).memory_usage(deep=True).sum()
+        rows.append({'table': name, 'rows': len(df), 'untyped_mb': untyped / 2**20, 'typed_mb': typed / 2**20})
+    report = pd.DataFrame(rows)
+    total = report[['rows', 'untyped_mb', 'typed_mb']].sum()
+    report.loc[len(report)] = {'table': 'TOTAL', **total}
+    report['rows'] = report['rows'].astype(int)
+    report['reduction'] = (report['untyped_mb'] / report['typed_mb']).round(1)
+    return report.round({'untyped_mb': 1, 'typed_mb': 1})
+
+
 def extract_age_group(grade_name: str) -> str:
-    """Extract age group (e.g., 'U14') from grade name."""
-    m = re.search(r'(U\d{2})', str(grade_name))
-    return m.group(1) if m else 'Senior'
+    """Extract age group (e.g., 'U14') from a single grade name; frames should join load_grade_dim()."""
+    m = re.search(_AGE_PATTERN, str(grade_name))
+    return f"U{int(m.group(1)):02d}" if m else 'Senior'
 
 
 if __name__ == "__main__":
@@ -208,3 +609,4 @@ if __name__ == "__main__":
     print(f"Loaded {len(games):,} games")
     career = aggregate_player_career(stats)
     print(f"Aggregated {len(career):,} player careers")
+    print(memory_report().to_string(index=False))
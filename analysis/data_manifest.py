@@ -0,0 +1,175 @@
+"""
+FullCourtVision — Data Version Manifest
+data_version.json stamps a data source with a row count and content hash per
+table plus an overall version. Writers rewrite it after changing the data:
+the scraper (dataVersionManifest(), called from closeDb() in
+scraper/playhq-db.js) and build_aggregates.py for playhq.db, export_data.py
+for data/parquet. Readers key their caches on
+source_version() and keep them until the version changes.
+
+Table hashes are SHA-256 over the rows in rowid order, one compact JSON array
+per line (integral floats written as integers, blobs as hex), so the Python
+and JavaScript writers agree on unchanged data.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+MANIFEST_NAME = "data_version.json"
+
+# Not read by any page; would change the version on every scrape run
+EXCLUDED_TABLES = {"scrape_log"}
+# FTS5 keeps its index in shadow tables; their source rows are hashed instead
+_FTS_SHADOW_SUFFIXES = ("_data", "_idx", "_content", "_docsize", "_config")
+
+_read_cache: Dict[str, tuple] = {}
+_read_lock = threading.Lock()
+
+
+def manifest_path(source: str) -> str:
+    """Manifest location for a source: next to a database file, inside a parquet directory."""
+    if os.path.isdir(source):
+        return os.path.join(source, MANIFEST_NAME)
+    return os.path.join(os.path.dirname(os.path.abspath(source)), MANIFEST_NAME)
+
+
+def _canonical(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def hash_rows(rows) -> tuple:
+    """(row count, hex SHA-256) of an iterable of row tuples in the manifest encoding."""
+    digest = hashlib.sha256()
+    count = 0
+    for row in rows:
+        line = json.dumps([_canonical(v) for v in row], ensure_ascii=False, separators=(",", ":"))
+        digest.update(line.encode("utf-8") + b"\n")
+        count += 1
+    return count, digest.hexdigest()
+
+
+def hashed_tables(conn: sqlite3.Connection) -> list:
+    """Tables of conn that go into the manifest (user tables, minus internal, virtual and FTS shadow tables)."""
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' "
+                        "AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall()
+    virtual = {name for name, sql in rows if (sql or "").upper().startswith("CREATE VIRTUAL")}
+    shadow = {v + s for v in virtual for s in _FTS_SHADOW_SUFFIXES}
+    return [name for name, _ in rows
+            if name not in virtual and name not in shadow and name not in EXCLUDED_TABLES]
+
+
+def table_digests(conn: sqlite3.Connection, tables=None) -> Dict[str, dict]:
+    """{table: {'rows': n, 'hash': sha256}} for tables (default: hashed_tables(conn))."""
+    return {table: dict(zip(("rows", "hash"), hash_rows(conn.execute(f"SELECT * FROM [{table}] ORDER BY rowid"))))
+            for table in (tables if tables is not None else hashed_tables(conn))}
+
+
+def build_manifest(tables: Dict[str, dict], writer: str) -> dict:
+    """Manifest for per-table digests; version is a hash over all of them."""
+    body = json.dumps({t: {"hash": d["hash"], "rows": d["rows"]} for t, d in sorted(tables.items())},
+                      separators=(",", ":"))
+    return {
+        "version": hashlib.sha256(body.encode("utf-8")).hexdigest()[:16],
+        "written_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "writer": writer,
+        "tables": dict(sorted(tables.items())),
+    }
+
+
+def write_manifest(source: str, manifest: dict) -> str:
+    """Atomically write manifest for source and return its path."""
+    path = manifest_path(source)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def stamp_sqlite(db_path: str, writer: str) -> dict:
+    """Hash every table of db_path and write its manifest. Returns the manifest."""
+    conn = sqlite3.connect(db_path)
+    try:
+        manifest = build_manifest(table_digests(conn), writer)
+    finally:
+        conn.close()
+    write_manifest(db_path, manifest)
+    return manifest
+
+
+def read_manifest(source: str) -> Optional[dict]:
+    """The source's manifest, or None if it is missing or unreadable. Re-parsed only when the file changes."""
+    path = manifest_path(source)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _read_lock:
+        cached = _read_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    with _read_lock:
+        _read_cache[path] = (stamp, manifest)
+    return manifest
+
+
+def source_fingerprint(source: str) -> tuple:
+    """Sizes and mtimes of the source's data files; changes whenever a file is rewritten."""
+    if os.path.isdir(source):
+        files = sorted(os.path.join(source, f) for f in os.listdir(source) if f.endswith(".parquet"))
+    else:
+        # Pooled readers open the database immutable and never see an uncheckpointed WAL
+        files = [source]
+    fingerprint = []
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append((os.path.basename(path), st.st_size, st.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def source_version(source: str) -> str:
+    """Cache key for a source's data: the manifest version while it is current.
+
+    A missing manifest, or data files written after it (a writer that does not
+    stamp), falls back to the file fingerprint, so caches still never serve
+    data older than the files.
+    """
+    fingerprint = source_fingerprint(source)
+    manifest = read_manifest(source)
+    if manifest and manifest.get("version"):
+        try:
+            stamped = os.stat(manifest_path(source)).st_mtime_ns
+        except OSError:
+            stamped = None
+        if stamped is not None and all(mtime <= stamped for _, _, mtime in fingerprint):
+            return manifest["version"]
+    return "files:" + hashlib.sha256(repr(fingerprint).encode("utf-8")).hexdigest()[:16]
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "playhq.db")
+    m = stamp_sqlite(target, "data_manifest.py")
+    print(f"{manifest_path(target)}: version {m['version']}")
+    for table, d in m["tables"].items():
+        print(f"  {table:<24} {d['rows']:>10,}  {d['hash'][:12]}")
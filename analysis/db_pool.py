@@ -0,0 +1,202 @@
+"""
+FullCourtVision — SQLite Connection Pool
+Read-only pooled connections to playhq.db shared by db.q() and data_loader.query().
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+# Applied to every connection at open. Negative cache_size is in KiB.
+DEFAULT_PRAGMAS = {
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+    "query_only": 1,
+}
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+def _read_only_uri(db_path: str, immutable: bool) -> str:
+    """Build a SQLite URI that opens db_path read-only (and optionally immutable)."""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+class ConnectionPool:
+    """Bounded pool of read-only SQLite connections.
+
+    Each worker thread checks out its own connection for the duration of a
+    query, so concurrent Streamlit reruns never share a cursor. Nested
+    checkouts on the same thread reuse the connection already held.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        max_size (int): Maximum number of open connections
+        timeout (float): Seconds to wait for a free connection before raising TimeoutError
+        immutable (bool): Open with immutable=1 (skips file locking; the file must not
+                          change while the pool is open — call close() after a rebuild)
+        pragmas (Optional[Dict]): PRAGMA overrides merged over DEFAULT_PRAGMAS
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 30.0,
+                 immutable: bool = True, pragmas: Optional[Dict[str, Union[int, str]]] = None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.immutable = immutable
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._size = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(_read_only_uri(self.db_path, self.immutable),
+                               uri=True, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        waited = False
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._size < self.max_size
+                if can_open:
+                    self._size += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                    raise
+            else:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No SQLite connection free after {self.timeout}s "
+                        f"(pool size {self.max_size})") from None
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if waited:
+                self._waits += 1
+                self._total_wait += elapsed
+                self._max_wait = max(self._max_wait, elapsed)
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+            if closed:
+                self._size -= 1
+        if closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the current thread."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Pool size and wait-time metrics.
+
+        Returns:
+            Dict[str, Union[int, float]]: Pool metrics including:
+                - max_size: Configured connection limit
+                - size: Connections currently open
+                - idle / in_use: Open connections free vs checked out
+                - peak_in_use: Highest concurrent checkouts seen
+                - checkouts: Total checkouts served
+                - waits: Checkouts that had to wait for a free connection
+                - avg_wait_ms / max_wait_ms: Wait time for those checkouts
+        """
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': self._size - self._in_use,
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'avg_wait_ms': round(self._total_wait / max(self._waits, 1) * 1000, 3),
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+            }
+
+    def close(self) -> None:
+        """Close the pool: idle connections now, checked-out ones when returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._size -= 1
+
+
+def get_pool(db_path: str, **kwargs) -> ConnectionPool:
+    """Get the process-wide pool for db_path, creating it on first use.
+
+    Keyword arguments are passed to ConnectionPool and only apply when the
+    pool is first created.
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, **kwargs)
+        return pool
+
+
+def close_all() -> None:
+    """Close and forget every pool (e.g. after the database file is rebuilt)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
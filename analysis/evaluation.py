@@ -0,0 +1,253 @@
+"""
+FullCourtVision — Evaluation Harness
+Cross-validated comparison of models over a model x feature-set x fold grid,
+spread across a process pool. Each feature set's X/y is saved once to the
+artifact store and memory-mapped read-only by every worker, each fold's
+scores are cached under a hash of the data, model and fold so a rerun only
+fits what changed, and the results are written as one leaderboard JSON.
+
+Folds are the ones cross_val_score(cv=n_folds) uses (stratified for
+classifiers, in row order), so the scores match it.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.base import is_classifier
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.metrics import accuracy_score, log_loss, mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import check_cv
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from data_loader import DB_PATH
+from artifacts import artifact_key, code_hash, load_artifact, save_artifact, ARTIFACT_DIR
+
+
+def _logistic_regression():
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+
+
+# Model name -> estimator factory. Factories must pickle (functools.partial of a
+# class, or a module-level function) so pool workers can build them; models run
+# single-threaded because the pool already uses every core.
+MODELS: Dict[str, Callable] = {
+    'random_forest': partial(RandomForestClassifier, n_estimators=100, random_state=42, n_jobs=1),
+    'logistic_regression': _logistic_regression,
+    'random_forest_regressor': partial(RandomForestRegressor, n_estimators=100, random_state=42, n_jobs=1),
+    'linear_regression': partial(LinearRegression),
+}
+
+N_FOLDS = 5
+# Leaderboard ranking metric per task
+PRIMARY_METRIC = {'classification': 'accuracy', 'regression': 'r2'}
+# Per-fold score files, under the artifact store
+FOLD_CACHE = "evaluation_folds"
+LEADERBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "leaderboard.json")
+
+
+def _data_hash(X: np.ndarray, y: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    for a in (X, y):
+        digest.update(str((a.shape, a.dtype.str)).encode("utf-8"))
+        digest.update(np.ascontiguousarray(a).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _store_feature_set(name: str, X, y, root: str) -> Tuple[str, np.ndarray, np.ndarray]:
+    """Save a feature set to the artifact store unless it is there already; returns (key, X, y)."""
+    X = np.ascontiguousarray(np.asarray(X, dtype=float))
+    y = np.ascontiguousarray(np.asarray(y))
+    key = _data_hash(X, y)
+    if load_artifact(f"evaluation_{name}", key, mmap=True, root=root) is None:
+        save_artifact(f"evaluation_{name}", key, {'X': X, 'y': y}, root)
+    return key, X, y
+
+
+def _model_signature(model) -> str:
+    """Stable description of an unfitted estimator: its class and every (nested) parameter."""
+    params = sorted((k, repr(v)) for k, v in model.get_params(deep=True).items())
+    return f"{type(model).__module__}.{type(model).__name__}{params}"
+
+
+def _score(model, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
+    if is_classifier(model):
+        scores = {'accuracy': accuracy_score(y_test, model.predict(X_test))}
+        if hasattr(model, 'predict_proba'):
+            scores['log_loss'] = log_loss(y_test, model.predict_proba(X_test), labels=model.classes_)
+        return scores
+    pred = model.predict(X_test)
+    return {'r2': r2_score(y_test, pred), 'mae': mean_absolute_error(y_test, pred),
+            'rmse': float(np.sqrt(mean_squared_error(y_test, pred)))}
+
+
+def _fit_fold(task: tuple) -> Dict[str, object]:
+    """Fit and score one model on one fold; top level so a process pool can run it."""
+    set_name, data_key, model_name, factory, fold, n_folds, cache_path, root = task
+    parts = load_artifact(f"evaluation_{set_name}", data_key, mmap=True, root=root)
+    X, y = parts['X'], parts['y']
+    model = factory()
+    splits = list(check_cv(n_folds, y, classifier=is_classifier(model)).split(X, y))
+    train, test = splits[fold]
+
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = _score(model, X[test], y[test])
+    predict_seconds = time.perf_counter() - start
+
+    result = {'feature_set': set_name, 'model': model_name, 'fold': fold,
+              'task': 'classification' if is_classifier(model) else 'regression',
+              'train_rows': len(train), 'test_rows': len(test),
+              'fit_seconds': round(fit_seconds, 4), 'predict_seconds': round(predict_seconds, 4)}
+    result.update({k: round(float(v), 5) for k, v in scores.items()})
+    tmp = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # read-only store: the fold is refitted next time
+    return result
+
+
+def evaluate_models(feature_sets: Dict[str, Tuple[Union[np.ndarray, pd.DataFrame], np.ndarray]],
+                    models: Union[Sequence[str], Dict[str, Callable], None] = None, n_folds: int = N_FOLDS,
+                    workers: Optional[int] = None, leaderboard_path: Optional[str] = LEADERBOARD_PATH,
+                    root: str = ARTIFACT_DIR) -> pd.DataFrame:
+    """Cross-validate every model on every feature set, in parallel, and rank them.
+
+    Every (feature set, model, fold) fit is a separate task. Tasks whose
+    scores are cached (same data, model definition, fold and code) are not
+    refitted; the rest run across a pool of worker processes that
+    memory-map the feature matrices instead of receiving a copy each.
+
+    Args:
+        feature_sets (Dict[str, Tuple]): Feature set name -> (X, y)
+        models (Union[Sequence[str], Dict[str, Callable], None]): Names in MODELS, or
+            name -> picklable estimator factory; None for every MODELS entry that
+            fits each set's task (classifiers for integer y, regressors otherwise)
+        n_folds (int): Cross-validation folds
+        workers (Optional[int]): Worker processes; None for os.cpu_count(), 1 to fit in this process
+        leaderboard_path (Optional[str]): Where to write the leaderboard JSON (None to skip)
+        root (str): Artifact store directory (feature sets and fold cache)
+
+    Returns:
+        pd.DataFrame: One row per (feature set, model): task, rows, features,
+        mean and std of each metric across folds, total fit seconds and how many
+        folds came from the cache, best first within each task
+    """
+    if models is None:
+        models = dict(MODELS)
+    elif not isinstance(models, dict):
+        models = {name: MODELS[name] for name in models}
+    cache_dir = os.path.join(root, FOLD_CACHE)
+    os.makedirs(cache_dir, exist_ok=True)
+    code = code_hash(_fit_fold, _score)
+
+    results: List[Dict[str, object]] = []
+    tasks: List[tuple] = []
+    shapes: Dict[str, Tuple[int, int]] = {}
+    for set_name, (X, y) in feature_sets.items():
+        data_key, X, y = _store_feature_set(set_name, X, y, root)
+        shapes[set_name] = X.shape
+        classification = np.issubdtype(y.dtype, np.integer) or y.dtype == bool
+        for model_name, factory in models.items():
+            model = factory()
+            if is_classifier(model) != classification:
+                continue
+            signature = _model_signature(model)
+            for fold in range(n_folds):
+                key = artifact_key(data_key, code, {'model': signature, 'fold': fold, 'n_folds': n_folds})
+                cache_path = os.path.join(cache_dir, f"{key}.json")
+                try:
+                    with open(cache_path, encoding="utf-8") as f:
+                        cached = json.load(f)
+                    results.append({**cached, 'feature_set': set_name, 'model': model_name, 'cached': True})
+                    continue
+                except (OSError, ValueError):
+                    pass
+                tasks.append((set_name, data_key, model_name, factory, fold, n_folds, cache_path, root))
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            fitted = list(pool.map(_fit_fold, tasks))
+    else:
+        fitted = [_fit_fold(task) for task in tasks]
+    results += [{**r, 'cached': False} for r in fitted]
+
+    leaderboard = _leaderboard(pd.DataFrame(results), shapes)
+    if leaderboard_path:
+        os.makedirs(os.path.dirname(leaderboard_path) or ".", exist_ok=True)
+        with open(leaderboard_path, "w", encoding="utf-8") as f:
+            json.dump({'generated': time.strftime("%Y-%m-%dT%H:%M:%S"), 'n_folds': n_folds,
+                       'fits': len(tasks), 'cached_folds': len(results) - len(tasks),
+                       'leaderboard': json.loads(leaderboard.to_json(orient='records'))}, f, indent=2)
+    return leaderboard
+
+
+def _leaderboard(folds: pd.DataFrame, shapes: Dict[str, Tuple[int, int]]) -> pd.DataFrame:
+    if folds.empty:
+        return pd.DataFrame(columns=['feature_set', 'model', 'task'])
+    metrics = [m for m in ('accuracy', 'log_loss', 'r2', 'mae', 'rmse') if m in folds.columns]
+    grouped = folds.groupby(['feature_set', 'model', 'task'], sort=False)
+    # Population std across folds, as cross_val_score(...).std() reports it
+    mean = grouped[metrics].mean().add_suffix('_mean')
+    std = grouped[metrics].std(ddof=0).add_suffix('_std')
+    board = pd.concat([mean, std], axis=1)[[f'{m}_{s}' for m in metrics for s in ('mean', 'std')]].round(4)
+    board['folds'] = grouped.size()
+    board['fit_seconds'] = grouped['fit_seconds'].sum().round(2)
+    board['cached_folds'] = grouped['cached'].sum()
+    board = board.reset_index()
+    board.insert(3, 'rows', board['feature_set'].map(lambda s: shapes[s][0]))
+    board.insert(4, 'features', board['feature_set'].map(lambda s: shapes[s][1]))
+    board = board.dropna(axis=1, how='all')
+    # Best first: higher accuracy / R² within each task
+    board['_rank'] = [-row[f"{PRIMARY_METRIC[row['task']]}_mean"] for _, row in board.iterrows()]
+    return board.sort_values(['task', '_rank']).drop(columns='_rank').reset_index(drop=True)
+
+
+def game_feature_sets(db_path: str = DB_PATH, target: str = 'home_win') -> Dict[str, Tuple[pd.DataFrame, np.ndarray]]:
+    """The Game Predictor's feature variants as evaluate_models() feature sets.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        target (str): 'home_win' (classification) or 'margin' (regression)
+
+    Returns:
+        Dict[str, Tuple[pd.DataFrame, np.ndarray]]: 'team', 'team_elo',
+        'point_in_time' and 'point_in_time_elo' -> (X, y)
+    """
+    from predictions import build_game_features, game_feature_columns
+
+    sets = {}
+    for name, point_in_time, ratings in (('team', False, False), ('team_elo', False, True),
+                                          ('point_in_time', True, False), ('point_in_time_elo', True, True)):
+        df = build_game_features(db_path, point_in_time, ratings)
+        y = df[target].to_numpy(dtype=int if target == 'home_win' else float)
+        sets[name] = (df[game_feature_columns(point_in_time, ratings)], y)
+    return sets
+
+
+if __name__ == "__main__":
+    import sys
+
+    workers = 1 if "--serial" in sys.argv else None
+    sets = game_feature_sets()
+    for attempt in ("cold", "cached"):
+        start = time.perf_counter()
+        board = evaluate_models(sets, ['random_forest', 'logistic_regression'], workers=workers)
+        print(f"{attempt}: {time.perf_counter() - start:.1f}s")
+    print(board.to_string(index=False))
+    print(f"Leaderboard: {LEADERBOARD_PATH}")
@@ -6,7 +6,7 @@ Per-player career stats, PPG trends, shooting percentages, consistency metrics.
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Union
-from data_loader import load_player_stats, aggregate_player_career, DB_PATH
+from data_loader import load_player_stats, get_player_stats, aggregate_player_career, DB_PATH
 
 
 def get_player_profile(player_id: str, db_path: str = DB_PATH) -> Optional[Dict[str, Union[str, List[str], Dict[str, Union[int, float]], List[Dict]]]]:
@@ -24,8 +24,7 @@ def get_player_profile(player_id: str, db_path: str = DB_PATH) -> Optional[Dict[
         >>> profile = get_player_profile("f1fa18fc-a93f-45b9-ac91-f70652744dd7")
         >>> print(profile['name'], profile['career']['ppg'])
     """
-    stats = load_player_stats(db_path)
-    player_stats = stats[stats['player_id'] == player_id].sort_values('season_start')
+    player_stats = get_player_stats(player_id, db_path).sort_values('season_start')
 
     if player_stats.empty:
         return None
@@ -93,13 +92,12 @@ def scoring_trend(player_id: str, db_path: str = DB_PATH) -> pd.DataFrame:
         - fg3_pg: 3-pointers per game for season
         - trend: 'improving', 'declining', 'stable', or 'insufficient_data'
     """
-    stats = load_player_stats(db_path)
-    player_stats = stats[stats['player_id'] == player_id].sort_values('season_start')
+    player_stats = get_player_stats(player_id, db_path).sort_values('season_start')
 
     if player_stats.empty:
         return pd.DataFrame()
 
-    trend = player_stats.groupby(['season_name', 'season_start']).agg({
+    trend = player_stats.groupby(['season_name', 'season_start'], observed=True).agg({
         'games_played': 'sum',
         'total_points': 'sum',
         'total_fouls': 'sum',
@@ -140,8 +138,7 @@ def consistency_metrics(player_id: str, db_path: str = DB_PATH) -> Dict[str, Uni
             - max_ppg: Highest PPG in any season
             - consistency_rating: 'very_consistent', 'consistent', 'variable', or 'insufficient_data'
     """
-    stats = load_player_stats(db_path)
-    player_stats = stats[stats['player_id'] == player_id]
+    player_stats = get_player_stats(player_id, db_path)
 
     if len(player_stats) < 2:
         return {'cv': None, 'std_ppg': None, 'consistency_rating': 'insufficient_data'}
@@ -180,14 +177,14 @@ def percentile_rank(player_id: str, db_path: str = DB_PATH) -> Optional[Dict[str
             - discipline_percentile: Percentile rank for discipline (lower fouls = higher rank)
         Returns None if player not found or insufficient peer data.
     """
-    stats = load_player_stats(db_path)
-    player_stats = stats[stats['player_id'] == player_id]
+    player_stats = get_player_stats(player_id, db_path)
 
     if player_stats.empty:
         return None
 
     primary_ag = player_stats['age_group'].mode().iloc[0]
-    peers = stats[stats['age_group'] == primary_ag].groupby('player_id').agg({
+    stats = load_player_stats(db_path)
+    peers = stats[stats['age_group'] == primary_ag].groupby('player_id', observed=True).agg({
         'games_played': 'sum', 'total_points': 'sum', 'total_fouls': 'sum',
         'three_point': 'sum',
     }).reset_index()
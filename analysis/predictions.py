@@ -1,17 +1,62 @@
 """
 FullCourtVision — Predictions
-Linear regression for scoring trends, random forest for game outcome prediction.
+Linear regression for scoring trends, PREDICTOR_MODELS classifiers for game outcome prediction.
 """
 
+import os
+import pickle
+import time
+from functools import partial
+
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from pandas.api.types import union_categoricals
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
+from sklearn.ensemble import (RandomForestClassifier, RandomForestRegressor,
+                              HistGradientBoostingClassifier, HistGradientBoostingRegressor)
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, r2_score
-from typing import Dict, Union, Optional
-from data_loader import load_games, load_player_stats, query, DB_PATH
+from typing import Callable, Dict, List, Union, Optional, Sequence, Tuple
+from data_loader import load_games, load_table, get_player_stats, query, data_version, DB_PATH
+from artifacts import get_or_compute
+from team_state import point_in_time_features
+from ratings import rating_features, load_game_ratings, RATING_FEATURES
+
+# Per-team strength features; the model's inputs are these for home then away
+TEAM_FEATURES = ['avg_pf', 'avg_pa', 'win_rate', 'scoring_std']
+# Completed games a team needs before it is used for training or prediction
+MIN_TEAM_GAMES = 3
+
+
+def _logistic_classifier():
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+
+
+def _ridge_regressor():
+    return make_pipeline(StandardScaler(), Ridge(alpha=1.0))
+
+
+# Early stopping on a 10% validation split: boosting stops once 20 rounds bring no improvement
+_BOOSTING = dict(max_iter=1000, learning_rate=0.05, early_stopping=True, validation_fraction=0.1,
+                 n_iter_no_change=20, random_state=42)
+
+# Game Predictor model name -> (win/loss classifier factory, margin regressor factory)
+PREDICTOR_MODELS: Dict[str, Tuple[Callable, Callable]] = {
+    'random_forest': (partial(RandomForestClassifier, n_estimators=100, random_state=42, n_jobs=-1),
+                      partial(RandomForestRegressor, n_estimators=100, random_state=42, n_jobs=-1)),
+    'hist_gradient_boosting': (partial(HistGradientBoostingClassifier, **_BOOSTING),
+                               partial(HistGradientBoostingRegressor, **_BOOSTING)),
+    'logistic_ridge': (_logistic_classifier, _ridge_regressor),
+}
+# The live predictor's model; FCV_PREDICTOR_MODEL picks another PREDICTOR_MODELS entry.
+# logistic_ridge is what cheapest_model() picks from --compare: the most accurate
+# of the three on these features, and about 2 KB against the forest's 87 MB
+PREDICTOR_MODEL = os.environ.get("FCV_PREDICTOR_MODEL", "logistic_ridge")
+# Rows in the inference latency measurement
+LATENCY_ROWS = 10_000
 
 
 def scoring_trend_regression(player_id: str, db_path: str = DB_PATH) -> Dict[str, Union[str, float, int]]:
@@ -35,8 +80,7 @@ def scoring_trend_regression(player_id: str, db_path: str = DB_PATH) -> Dict[str
             - trend: 'improving', 'declining', or 'stable'
             - seasons_count: Number of seasons analyzed
     """
-    stats = load_player_stats()
-    player = stats[stats['player_id'] == player_id].sort_values('season_start')
+    player = get_player_stats(player_id, db_path).sort_values('season_start')
 
     if len(player) < 2:
         return {'status': 'insufficient_data'}
@@ -67,18 +111,106 @@ def scoring_trend_regression(player_id: str, db_path: str = DB_PATH) -> Dict[str
     }
 
 
-def build_game_features(db_path: str = DB_PATH) -> pd.DataFrame:
+def completed_games(games: pd.DataFrame) -> pd.DataFrame:
+    """FINAL games with both scores recorded; some FINAL games have none."""
+    return games[(games['status'] == 'FINAL') & games['home_score'].notna() & games['away_score'].notna()]
+
+
+def _team_totals(completed: pd.DataFrame):
+    """Per-team TEAM_FEATURES of completed games, aggregated in long (one row per team per game) form.
+
+    Returns:
+        tuple: (sorted team ids, team code of each long row - home sides then
+        away sides, TEAM_FEATURES matrix with a row per team, games per team)
+    """
+    # Factorise through the id categoricals: far cheaper than hashing 2 strings per game
+    sides = union_categoricals([completed['home_team_id'].astype('category').array,
+                                completed['away_team_id'].astype('category').array],
+                               sort_categories=True).remove_unused_categories()
+    codes = sides.codes.astype(np.intp)
+    team_ids = sides.categories.astype(str)
+    home_score = completed['home_score'].to_numpy(dtype=float)
+    away_score = completed['away_score'].to_numpy(dtype=float)
+    pf = np.concatenate([home_score, away_score])
+    pa = np.concatenate([away_score, home_score])
+    games = np.bincount(codes, minlength=len(team_ids))
+    avg_pf = np.bincount(codes, pf, len(team_ids)) / games
+    avg_pa = np.bincount(codes, pa, len(team_ids)) / games
+    win_rate = np.bincount(codes, pf > pa, len(team_ids)) / games
+    # Two-pass population SD, as np.std
+    scoring_std = np.sqrt(np.bincount(codes, (pf - avg_pf[codes]) ** 2, len(team_ids)) / games)
+    return team_ids, codes, np.column_stack([avg_pf, avg_pa, win_rate, scoring_std]), games
+
+
+def team_features(games: Optional[pd.DataFrame] = None, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Strength features for every team over its completed games.
+
+    Args:
+        games (Optional[pd.DataFrame]): Games as returned by load_games(); loaded if None
+        db_path (str): Path to the SQLite database file the games are loaded from
+
+    Returns:
+        pd.DataFrame: Indexed by team_id with TEAM_FEATURES columns (avg_pf, avg_pa,
+        win_rate, scoring_std) plus games
+    """
+    if games is None:
+        games = load_games(db_path)
+    team_ids, _, matrix, counts = _team_totals(completed_games(games))
+    features = pd.DataFrame(matrix, index=pd.Index(team_ids, name='team_id'), columns=TEAM_FEATURES)
+    features['games'] = counts
+    return features
+
+
+def game_features(games: pd.DataFrame) -> pd.DataFrame:
+    """Feature matrix of build_game_features() for a games frame.
+
+    Teams are aggregated once in long home/away form and each game's features
+    are gathered by team code, so the cost is a few array passes regardless of
+    the number of games.
+
+    Args:
+        games (pd.DataFrame): Games with home/away team ids and scores and status,
+                              as returned by load_games()
+
+    Returns:
+        pd.DataFrame: Same columns and rows as build_game_features(), indexed by game_id
+    """
+    completed = completed_games(games)
+    if completed.empty:
+        return pd.DataFrame()
+
+    _, codes, matrix, counts = _team_totals(completed)
+    home, away = codes[:len(completed)], codes[len(completed):]
+    keep = (counts[home] >= MIN_TEAM_GAMES) & (counts[away] >= MIN_TEAM_GAMES)
+
+    df = pd.DataFrame(np.hstack([matrix[home[keep]], matrix[away[keep]]]),
+                      columns=[f'home_{c}' for c in TEAM_FEATURES] + [f'away_{c}' for c in TEAM_FEATURES],
+                      index=pd.Index(completed['id'].astype(str).to_numpy()[keep], name='game_id'))
+    home_score = completed['home_score'].to_numpy(dtype=float)[keep]
+    away_score = completed['away_score'].to_numpy(dtype=float)[keep]
+    df['home_win'] = (home_score > away_score).astype(int)
+    df['margin'] = home_score - away_score
+    return df
+
+
+def build_game_features(db_path: str = DB_PATH, point_in_time: bool = False,
+                        ratings: bool = False) -> pd.DataFrame:
     """Build feature matrix for game outcome prediction from team-level aggregates.
     
     Creates machine learning features for each completed game by calculating
     team strength metrics (average scoring, win rate, consistency) for both
-    home and away teams at the time of each game.
+    home and away teams. By default these are whole-history aggregates, which
+    include the game being predicted; point_in_time takes them as of kickoff
+    from the team state engine (team_state.py) instead.
     
     Args:
         db_path (str): Path to the SQLite database file
+        point_in_time (bool): Use each team's record before the game only, and
+                              add home_form/away_form (recent win rate)
+        ratings (bool): Add both teams' pre-game Elo ratings (ratings.RATING_FEATURES)
         
     Returns:
-        pd.DataFrame: Feature matrix with columns:
+        pd.DataFrame: Feature matrix indexed by game_id with columns:
             - home_avg_pf, home_avg_pa: Home team average points for/against
             - home_win_rate: Home team win percentage
             - home_scoring_std: Home team scoring standard deviation
@@ -88,13 +220,26 @@ def build_game_features(db_path: str = DB_PATH) -> pd.DataFrame:
             - home_win: Target variable (1 if home team won, 0 if away won)
             - margin: Point margin (home score - away score)
     """
-    games = load_games()
-    completed = games[games['status'] == 'FINAL'].copy()
+    if point_in_time:
+        df = point_in_time_features(db_path)
+        df = df[(df['home_games'] >= MIN_TEAM_GAMES) & (df['away_games'] >= MIN_TEAM_GAMES)]
+        columns = [f'{side}_{c}' for side in ('home', 'away') for c in TEAM_FEATURES + ['form']]
+        df = df.set_index('game_id')[columns + ['home_win', 'margin']].astype({'home_win': int})
+    else:
+        df = game_features(load_games(db_path))
+    if ratings and not df.empty:
+        elo = rating_features(load_game_ratings(db_path))
+        df = df.join(elo, how='inner')
+        df = df[[c for c in df.columns if c not in ('home_win', 'margin')] + ['home_win', 'margin']]
+    return df
+
 
+def _game_features_iterrows(games: pd.DataFrame) -> pd.DataFrame:
+    """The original row-by-row build_game_features(), kept as the benchmark baseline."""
+    completed = completed_games(games)
     if completed.empty:
         return pd.DataFrame()
 
-    # Build team strength features: avg scoring, win rate
     team_stats = {}
     for _, g in completed.iterrows():
         for tid, pf, pa in [(g['home_team_id'], g['home_score'], g['away_score']),
@@ -107,11 +252,10 @@ def build_game_features(db_path: str = DB_PATH) -> pd.DataFrame:
             if pf > pa:
                 team_stats[tid]['wins'] += 1
 
-    # Convert to features
-    team_features = {}
+    per_team = {}
     for tid, s in team_stats.items():
         gp = max(s['games'], 1)
-        team_features[tid] = {
+        per_team[tid] = {
             'avg_pf': np.mean(s['pf']),
             'avg_pa': np.mean(s['pa']),
             'win_rate': s['wins'] / gp,
@@ -119,11 +263,10 @@ def build_game_features(db_path: str = DB_PATH) -> pd.DataFrame:
             'scoring_std': np.std(s['pf']),
         }
 
-    # Build game-level features
     rows = []
     for _, g in completed.iterrows():
-        ht = team_features.get(g['home_team_id'])
-        at = team_features.get(g['away_team_id'])
+        ht = per_team.get(g['home_team_id'])
+        at = per_team.get(g['away_team_id'])
         if not ht or not at or ht['games'] < 3 or at['games'] < 3:
             continue
 
@@ -139,62 +282,153 @@ def build_game_features(db_path: str = DB_PATH) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
-def train_game_predictor(db_path: str = DB_PATH) -> Dict[str, Union[str, float, int, Dict, object]]:
-    """Train Random Forest models to predict game outcomes and point margins.
+def synthetic_games(n_games: int, games_per_team: int = 11, seed: int = 0) -> pd.DataFrame:
+    """Random FINAL games shaped like load_games() output, for benchmarking.
+
+    Args:
+        n_games (int): Number of games
+        games_per_team (int): Average games each team plays (about a season)
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Game ids, home/away team ids (categorical), int16 scores and status
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = max(2 * n_games // games_per_team, 2)
+    home = rng.integers(0, n_teams, n_games)
+    away = (home + rng.integers(1, n_teams, n_games)) % n_teams
+    strength = rng.normal(35, 8, n_teams)
+    teams = pd.Categorical.from_codes(np.arange(n_teams), [f'team-{i:07d}' for i in range(n_teams)])
+    return pd.DataFrame({
+        'id': [f'game-{i:08d}' for i in range(n_games)],
+        'home_team_id': teams[home],
+        'away_team_id': teams[away],
+        'home_score': np.clip(rng.normal(strength[home] + 2, 10), 0, None).round().astype('int16'),
+        'away_score': np.clip(rng.normal(strength[away], 10), 0, None).round().astype('int16'),
+        'status': 'FINAL',
+    })
+
+
+def benchmark_game_features(n_synthetic: int = 1_000_000, seed: int = 0) -> pd.DataFrame:
+    """Time game_features() against the row-by-row baseline on the games table and a synthetic one.
+
+    Both builders must produce the same frame; the baseline takes a few
+    minutes on a million games.
+
+    Args:
+        n_synthetic (int): Games in the synthetic table (0 to skip it)
+        seed (int): Random seed for the synthetic table
+
+    Returns:
+        pd.DataFrame: One row per table with games, feature rows, both timings and the speedup
+    """
+    tables = [('games table', load_games())]
+    if n_synthetic:
+        tables.append((f'synthetic {n_synthetic:,}', synthetic_games(n_synthetic, seed=seed)))
+
+    results = []
+    for label, games in tables:
+        start = time.perf_counter()
+        fast = game_features(games)
+        vectorized = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = _game_features_iterrows(games)
+        baseline = time.perf_counter() - start
+        pd.testing.assert_frame_equal(fast.reset_index(drop=True), slow, check_dtype=False)
+        results.append({'table': label, 'games': len(games), 'feature_rows': len(fast),
+                        'iterrows_s': round(baseline, 3), 'vectorized_s': round(vectorized, 3),
+                        'speedup': round(baseline / vectorized, 1)})
+        print(f"{label}: {len(games):,} games -> {len(fast):,} rows, "
+              f"iterrows {baseline:.2f}s, vectorized {vectorized:.3f}s ({baseline / vectorized:.0f}x)")
+    return pd.DataFrame(results)
+
+
+def game_feature_columns(point_in_time: bool = False, ratings: bool = False) -> list:
+    """The model inputs among build_game_features(db_path, point_in_time, ratings) columns."""
+    columns = [f'home_{c}' for c in TEAM_FEATURES] + [f'away_{c}' for c in TEAM_FEATURES]
+    if point_in_time:
+        columns += ['home_form', 'away_form']
+    if ratings:
+        columns += RATING_FEATURES
+    return columns
+
+
+def train_game_predictor(db_path: str = DB_PATH, point_in_time: bool = False, ratings: bool = False,
+                         model: str = PREDICTOR_MODEL) -> Dict[str, Union[str, float, int, Dict, object]]:
+    """Train models to predict game outcomes and point margins.
     
     Builds and trains both classification (win/loss) and regression (point margin)
-    models using team strength features. Includes cross-validation and feature
-    importance analysis.
+    models using team strength features. Includes cross-validation, feature
+    importance analysis and the cost of the models: training time, inference
+    latency and size.
     
     Args:
         db_path (str): Path to the SQLite database file
+        point_in_time (bool): Train on kickoff-time features with recent form
+                              (see build_game_features())
+        ratings (bool): Add pre-game Elo ratings to the features
+        model (str): PREDICTOR_MODELS entry: 'random_forest', 'hist_gradient_boosting'
+                     (early stopping) or 'logistic_ridge' (default: PREDICTOR_MODEL)
         
     Returns:
         Dict[str, Union[str, float, int, Dict, object]]: Training results including:
             - status: 'ok' if successful, 'insufficient_data' if < 50 games
-            - classifier: Trained RandomForestClassifier for win/loss prediction
-            - regressor: Trained RandomForestRegressor for margin prediction
+            - model: The PREDICTOR_MODELS entry trained
+            - classifier: Trained classifier for win/loss prediction
+            - regressor: Trained regressor for margin prediction
             - feature_cols: List of feature column names
             - accuracy: Test set classification accuracy
             - cv_accuracy: Cross-validation mean accuracy
             - cv_std: Cross-validation standard deviation
             - r2_margin: R² score for margin prediction
-            - feature_importance: Dictionary of feature importance scores
+            - margin_rmse: Test set RMSE of the predicted margin (points)
+            - feature_importance: Dictionary of feature importance scores (the
+              forest's impurity importances, else permutation importances on the test set)
+            - train_seconds: Time to fit both models
+            - latency_ms_per_10k: Time for both models to predict LATENCY_ROWS games on one core
+            - model_bytes: Pickled size of both models
+            - boosting_rounds: Rounds kept by early stopping (classifier, regressor), boosting only
             - training_samples: Number of training samples
             - test_samples: Number of test samples
     """
-    df = build_game_features(db_path)
+    df = build_game_features(db_path, point_in_time, ratings)
     if len(df) < 50:
         return {'status': 'insufficient_data'}
 
-    feature_cols = ['home_avg_pf', 'home_avg_pa', 'home_win_rate', 'home_scoring_std',
-                    'away_avg_pf', 'away_avg_pa', 'away_win_rate', 'away_scoring_std']
+    feature_cols = game_feature_columns(point_in_time, ratings)
+    make_classifier, make_regressor = PREDICTOR_MODELS[model]
 
     X = df[feature_cols].values
     y_class = df['home_win'].values
     y_margin = df['margin'].values
 
     X_train, X_test, y_train, y_test = train_test_split(X, y_class, test_size=0.2, random_state=42)
+    X_train_r, X_test_r, y_train_r, y_test_r = train_test_split(X, y_margin, test_size=0.2, random_state=42)
 
     # Classification: home win / away win
-    clf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-    clf.fit(X_train, y_train)
-    y_pred = clf.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-
-    cv_scores = cross_val_score(clf, X, y_class, cv=5, scoring='accuracy')
-
+    start = time.perf_counter()
+    clf = make_classifier().fit(X_train, y_train)
     # Regression: margin
-    reg = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-    X_train_r, X_test_r, y_train_r, y_test_r = train_test_split(X, y_margin, test_size=0.2, random_state=42)
-    reg.fit(X_train_r, y_train_r)
-    r2 = r2_score(y_test_r, reg.predict(X_test_r))
+    reg = make_regressor().fit(X_train_r, y_train_r)
+    train_seconds = time.perf_counter() - start
+
+    acc = accuracy_score(y_test, clf.predict(X_test))
+    cv_scores = cross_val_score(make_classifier(), X, y_class, cv=5, scoring='accuracy')
+    margin_pred = reg.predict(X_test_r)
+    r2 = r2_score(y_test_r, margin_pred)
 
     # Feature importance
-    importance = dict(zip(feature_cols, clf.feature_importances_.round(4).tolist()))
+    if hasattr(clf, 'feature_importances_'):
+        scores = clf.feature_importances_
+    else:
+        scores = permutation_importance(clf, X_test, y_test, n_repeats=5, random_state=42).importances_mean
+        scores = np.clip(scores, 0, None)
+        scores = scores / scores.sum() if scores.sum() > 0 else scores
+    importance = dict(zip(feature_cols, np.round(scores, 4).tolist()))
 
-    return {
+    result = {
         'status': 'ok',
+        'model': model,
         'classifier': clf,
         'regressor': reg,
         'feature_cols': feature_cols,
@@ -202,17 +436,184 @@ def train_game_predictor(db_path: str = DB_PATH) -> Dict[str, Union[str, float,
         'cv_accuracy': round(cv_scores.mean(), 3),
         'cv_std': round(cv_scores.std(), 3),
         'r2_margin': round(r2, 3),
+        'margin_rmse': round(float(np.sqrt(np.mean((y_test_r - margin_pred) ** 2))), 2),
         'feature_importance': importance,
+        'train_seconds': round(train_seconds, 3),
+        'latency_ms_per_10k': round(_prediction_latency(clf, reg, X_test) * 1000, 2),
+        'model_bytes': len(pickle.dumps((clf, reg), protocol=pickle.HIGHEST_PROTOCOL)),
         'training_samples': len(X_train),
         'test_samples': len(X_test),
     }
+    if hasattr(clf, 'n_iter_'):
+        result['boosting_rounds'] = (int(clf.n_iter_), int(reg.n_iter_))
+    return result
+
+
+def _prediction_latency(clf, reg, X: np.ndarray, repeats: int = 3) -> float:
+    """Best-of-repeats seconds for both models to score LATENCY_ROWS rows drawn from X, single-threaded
+    as GamePredictor runs them."""
+    rows = X[np.random.default_rng(0).integers(0, len(X), LATENCY_ROWS)]
+    for m in (clf, reg):
+        if hasattr(m, 'n_jobs'):
+            m.n_jobs = 1
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        clf.predict_proba(rows)
+        reg.predict(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_predictor_models(db_path: str = DB_PATH, models: Optional[Sequence[str]] = None,
+                             point_in_time: bool = False, ratings: bool = False) -> pd.DataFrame:
+    """Train every PREDICTOR_MODELS entry on the same features and compare accuracy against cost.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        models (Optional[Sequence[str]]): PREDICTOR_MODELS entries (default: all)
+        point_in_time (bool): Kickoff-time features (see build_game_features())
+        ratings (bool): Add pre-game Elo ratings to the features
+
+    Returns:
+        pd.DataFrame: One row per model with accuracy, cv_accuracy, r2_margin,
+        margin_rmse, train_seconds, latency_ms_per_10k and model_bytes
+    """
+    rows: List[Dict[str, object]] = []
+    for name in models or list(PREDICTOR_MODELS):
+        result = train_game_predictor(db_path, point_in_time, ratings, model=name)
+        if result.get('status') != 'ok':
+            continue
+        rows.append({k: result[k] for k in ('model', 'accuracy', 'cv_accuracy', 'r2_margin', 'margin_rmse',
+                                            'train_seconds', 'latency_ms_per_10k', 'model_bytes')})
+    return pd.DataFrame(rows)
+
+
+def cheapest_model(comparison: pd.DataFrame, min_accuracy: float) -> Optional[str]:
+    """The PREDICTOR_MODELS entry with the lowest inference latency (then size) whose
+    cv_accuracy meets min_accuracy, from compare_predictor_models(); None if none does."""
+    eligible = comparison[comparison['cv_accuracy'] >= min_accuracy]
+    if eligible.empty:
+        return None
+    return eligible.sort_values(['latency_ms_per_10k', 'model_bytes'])['model'].iloc[0]
+
+
+class GamePredictor:
+    """Trained game outcome models plus every team's precomputed feature vector.
+
+    Built once per data version (see load_game_predictor()) and kept in memory,
+    so a prediction is an array lookup and one predict_proba call for any
+    number of matchups.
+    """
+
+    def __init__(self, model_result: Dict, teams: pd.DataFrame):
+        """
+        Args:
+            model_result (Dict): Output of train_game_predictor() with status 'ok'
+            teams (pd.DataFrame): team_features() output
+        """
+        self.classifier = model_result['classifier']
+        self.regressor = model_result['regressor']
+        # One request at a time: worker threads cost more than they save
+        for model in (self.classifier, self.regressor):
+            if hasattr(model, 'n_jobs'):
+                model.n_jobs = 1
+        self.feature_cols = list(model_result['feature_cols'])
+        self.metrics = {k: v for k, v in model_result.items() if k not in ('classifier', 'regressor')}
+        teams = teams[teams['games'] >= MIN_TEAM_GAMES]
+        self.team_ids = pd.Index(teams.index.astype(str))
+        self.vectors = teams[TEAM_FEATURES].to_numpy(dtype=float)
+
+    def predict(self, home_team_ids: Sequence[str], away_team_ids: Sequence[str]) -> pd.DataFrame:
+        """Predict every (home, away) matchup in one pass.
+
+        Args:
+            home_team_ids (Sequence[str]): Home team of each matchup
+            away_team_ids (Sequence[str]): Away team of each matchup, aligned with home_team_ids
+
+        Returns:
+            pd.DataFrame: One row per matchup with the keys predict_matchup() returns;
+            status is 'insufficient_team_data' (and the numbers NaN) where either
+            team has fewer than MIN_TEAM_GAMES completed games
+        """
+        home = self.team_ids.get_indexer(pd.Index(home_team_ids).astype(str))
+        away = self.team_ids.get_indexer(pd.Index(away_team_ids).astype(str))
+        ok = (home >= 0) & (away >= 0)
+        out = pd.DataFrame({
+            'home_team_id': list(home_team_ids), 'away_team_id': list(away_team_ids),
+            'status': np.where(ok, 'ok', 'insufficient_team_data'),
+            'home_win_prob': np.nan, 'away_win_prob': np.nan, 'predicted_margin': np.nan,
+            'home_avg_score': np.nan, 'away_avg_score': np.nan,
+        })
+        if ok.any():
+            X = np.hstack([self.vectors[home[ok]], self.vectors[away[ok]]])
+            prob = self.classifier.predict_proba(X)
+            if prob.shape[1] > 1:
+                home_prob = prob[:, list(self.classifier.classes_).index(1)] * 100
+            else:
+                home_prob = np.full(len(X), 50.0)
+            out.loc[ok, 'home_win_prob'] = home_prob.round(1)
+            out.loc[ok, 'away_win_prob'] = (100 - home_prob).round(1)
+            out.loc[ok, 'predicted_margin'] = self.regressor.predict(X).round(1)
+            avg_pf = TEAM_FEATURES.index('avg_pf')
+            out.loc[ok, 'home_avg_score'] = X[:, avg_pf].round(1)
+            out.loc[ok, 'away_avg_score'] = X[:, len(TEAM_FEATURES) + avg_pf].round(1)
+        return out
+
+    def predict_one(self, home_team_id: str, away_team_id: str) -> Dict[str, Union[str, float]]:
+        """Predict a single matchup; same result as predict_matchup()."""
+        row = self.predict([home_team_id], [away_team_id]).iloc[0]
+        if row['status'] != 'ok':
+            return {'status': row['status']}
+        result = {'status': 'ok'}
+        result.update({k: float(row[k]) for k in ('home_win_prob', 'away_win_prob', 'predicted_margin',
+                                                  'home_avg_score', 'away_avg_score')})
+        return result
+
+    def team_vector(self, team_id: str) -> Optional[Dict[str, float]]:
+        """A team's TEAM_FEATURES values, or None if it has too few completed games."""
+        pos = self.team_ids.get_indexer([str(team_id)])[0]
+        if pos < 0:
+            return None
+        return dict(zip(TEAM_FEATURES, self.vectors[pos].tolist()))
+
+
+def _game_predictor_parts(db_path: str, model: str) -> Dict[str, object]:
+    result = train_game_predictor(db_path, model=model)
+    if result.get('status') != 'ok':
+        return {'model': result}
+    return {'model': result, 'teams': team_features(db_path=db_path).reset_index()}
+
+
+def load_game_predictor(db_path: str = DB_PATH, model: str = PREDICTOR_MODEL) -> Optional[GamePredictor]:
+    """The GamePredictor for the current data, trained at most once per data version.
+
+    The trained models and team features are persisted in the artifact store,
+    so after `python predictions.py` (or the first caller) has trained them,
+    every process and replica loads them instead of retraining.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        model (str): PREDICTOR_MODELS entry (default: PREDICTOR_MODEL)
+
+    Returns:
+        Optional[GamePredictor]: None if there are too few completed games to train
+    """
+    # Keyed on the estimators' parameters too, so retuning a registry entry retrains it
+    estimators = [repr(sorted(make().get_params(deep=True).items())) for make in PREDICTOR_MODELS[model]]
+    parts = get_or_compute("game_predictor", lambda: _game_predictor_parts(db_path, model), data_version(db_path),
+                           code=[_team_totals, team_features, game_features, train_game_predictor],
+                           params={'model': model, 'estimators': estimators})
+    if 'teams' not in parts:
+        return None
+    return GamePredictor(parts['model'], parts['teams'].set_index('team_id'))
 
 
 def predict_matchup(home_team_id: str, away_team_id: str, model_result: Optional[Dict] = None,
                     db_path: str = DB_PATH) -> Dict[str, Union[str, float]]:
     """Predict outcome of a matchup between two specific teams.
     
-    Uses trained Random Forest models to predict win probabilities and point
+    Uses the trained PREDICTOR_MODEL models to predict win probabilities and point
     margin for a hypothetical game between two teams based on their historical
     performance metrics.
     
@@ -220,7 +621,7 @@ def predict_matchup(home_team_id: str, away_team_id: str, model_result: Optional
         home_team_id (str): Unique identifier for the home team
         away_team_id (str): Unique identifier for the away team  
         model_result (Optional[Dict]): Pre-trained model results from train_game_predictor().
-                                     If None, will train model automatically.
+                                     If None, the persisted model from load_game_predictor() is used.
         db_path (str): Path to the SQLite database file
         
     Returns:
@@ -232,61 +633,144 @@ def predict_matchup(home_team_id: str, away_team_id: str, model_result: Optional
             - home_avg_score: Home team's average scoring
             - away_avg_score: Away team's average scoring
     """
-    if model_result is None or model_result.get('status') != 'ok':
-        model_result = train_game_predictor()
+    if model_result is not None and model_result.get('status') == 'ok':
+        predictor = GamePredictor(model_result, team_features(db_path=db_path))
+    else:
+        predictor = load_game_predictor(db_path)
 
-    if model_result.get('status') != 'ok':
+    if predictor is None:
         return {'status': 'model_unavailable'}
+    return predictor.predict_one(home_team_id, away_team_id)
 
-    # Get team features
-    games = load_games()
-    completed = games[games['status'] == 'FINAL']
-
-    def team_feat(tid):
-        home_g = completed[completed['home_team_id'] == tid]
-        away_g = completed[completed['away_team_id'] == tid]
-        pf = list(home_g['home_score']) + list(away_g['away_score'])
-        pa = list(home_g['away_score']) + list(away_g['home_score'])
-        if len(pf) < 3:
-            return None
-        wins = sum(1 for f, a in zip(pf, pa) if f > a)
-        return {
-            'avg_pf': np.mean(pf), 'avg_pa': np.mean(pa),
-            'win_rate': wins / len(pf), 'scoring_std': np.std(pf),
-        }
 
-    ht = team_feat(home_team_id)
-    at = team_feat(away_team_id)
+# Game statuses with nothing left to predict; FINAL games are kept only on request
+_VOID_STATUSES = ['CANCELLED', 'ABANDONED']
 
-    if not ht or not at:
-        return {'status': 'insufficient_team_data'}
 
-    X = np.array([[ht['avg_pf'], ht['avg_pa'], ht['win_rate'], ht['scoring_std'],
-                   at['avg_pf'], at['avg_pa'], at['win_rate'], at['scoring_std']]])
+def predict_fixtures(grade_id: Union[str, Sequence[str], None] = None,
+                     round_id: Union[str, Sequence[str], None] = None,
+                     pairs: Optional[Sequence[Tuple[str, str]]] = None,
+                     include_played: bool = False, predictor: Optional[GamePredictor] = None,
+                     db_path: str = DB_PATH) -> pd.DataFrame:
+    """Predict every scheduled game of one or more grades or rounds, or a list of matchups.
 
-    clf = model_result['classifier']
-    reg = model_result['regressor']
+    Loads the games table and the GamePredictor once and scores every selected
+    game in a single GamePredictor.predict() call, so a whole season's
+    remaining fixture costs about as much as one matchup.
 
-    prob = clf.predict_proba(X)[0]
-    margin = reg.predict(X)[0]
+    Args:
+        grade_id (Union[str, Sequence[str], None]): Grade(s) whose fixture to predict
+        round_id (Union[str, Sequence[str], None]): Round(s) to predict; with neither
+                                                    grade_id nor round_id, every
+                                                    scheduled game in the data
+        pairs (Optional[Sequence[Tuple[str, str]]]): (home_team_id, away_team_id)
+                                                     matchups to predict instead of
+                                                     scheduled games
+        include_played (bool): Also predict completed games (scores included), e.g.
+                               to check predictions against results
+        predictor (Optional[GamePredictor]): Predictor to use; defaults to
+                                             load_game_predictor()
+        db_path (str): Path to the SQLite database file
 
-    return {
-        'status': 'ok',
-        'home_win_prob': round(float(prob[1]) * 100, 1) if len(prob) > 1 else 50.0,
-        'away_win_prob': round(float(prob[0]) * 100, 1) if len(prob) > 1 else 50.0,
-        'predicted_margin': round(float(margin), 1),
-        'home_avg_score': round(ht['avg_pf'], 1),
-        'away_avg_score': round(at['avg_pf'], 1),
-    }
+    Returns:
+        pd.DataFrame: One row per game (or pair) with the columns of
+        GamePredictor.predict(); for scheduled games also game_id, grade_id,
+        round_id, round_name, date, time, game_status, home_score, away_score
+        and both team names, in kickoff order. status is 'model_unavailable'
+        when there are too few completed games to train.
+    """
+    if predictor is None:
+        predictor = load_game_predictor(db_path)
+
+    if pairs is not None:
+        pairs = list(pairs)
+        home_ids = [home for home, _ in pairs]
+        away_ids = [away for _, away in pairs]
+        return _predict_pairs(predictor, home_ids, away_ids)
+
+    games = load_table("games", db_path)
+    keep = ~games['status'].isin(_VOID_STATUSES)
+    if not include_played:
+        keep &= games['status'] != 'FINAL'
+    for column, selected in (('grade_id', grade_id), ('round_id', round_id)):
+        if selected is not None:
+            keep &= games[column].isin([selected] if isinstance(selected, str) else list(selected))
+    games = games[keep].sort_values(['date', 'time', 'id'], na_position='last', kind='stable')
+
+    fixture = pd.DataFrame({
+        'game_id': games['id'].astype(str).to_numpy(),
+        'grade_id': games['grade_id'].to_numpy(),
+        'round_id': games['round_id'].to_numpy(),
+        'round_name': games['round_name'].to_numpy(),
+        'date': games['date'].to_numpy(),
+        'time': games['time'].to_numpy(),
+        'game_status': games['status'].to_numpy(),
+        'home_score': games['home_score'].to_numpy(),
+        'away_score': games['away_score'].to_numpy(),
+    })
+    teams = load_table("teams", db_path)
+    names = pd.Series(teams['name'].astype(str).to_numpy(), index=teams['id'].astype(str).to_numpy())
+    names = names[~names.index.duplicated()]
+    predicted = _predict_pairs(predictor, games['home_team_id'].astype(str).to_numpy(),
+                               games['away_team_id'].astype(str).to_numpy())
+    predicted.insert(2, 'home_team_name', predicted['home_team_id'].map(names).to_numpy())
+    predicted.insert(3, 'away_team_name', predicted['away_team_id'].map(names).to_numpy())
+    return pd.concat([fixture, predicted], axis=1)
+
+
+def _predict_pairs(predictor: Optional[GamePredictor], home_ids: Sequence[str],
+                   away_ids: Sequence[str]) -> pd.DataFrame:
+    if predictor is not None:
+        return predictor.predict(home_ids, away_ids)
+    out = pd.DataFrame({'home_team_id': list(home_ids), 'away_team_id': list(away_ids),
+                        'status': 'model_unavailable'})
+    for col in ('home_win_prob', 'away_win_prob', 'predicted_margin', 'home_avg_score', 'away_avg_score'):
+        out[col] = np.nan
+    return out
 
 
 if __name__ == "__main__":
-    print("Training game predictor...")
-    result = train_game_predictor()
-    if result['status'] == 'ok':
+    import sys
+
+    if "--benchmark" in sys.argv:
+        benchmark_game_features()
+        sys.exit()
+
+    if "--compare" in sys.argv:
+        comparison = compare_predictor_models()
+        print(comparison.to_string(index=False))
+        for target in (0.65, 0.70):
+            print(f"Cheapest model with CV accuracy >= {target:.2f}: {cheapest_model(comparison, target)}")
+        sys.exit()
+
+    if "--fixtures" in sys.argv:
+        predictor = load_game_predictor()
+        start = time.perf_counter()
+        fixtures = predict_fixtures(predictor=predictor)
+        elapsed = time.perf_counter() - start
+        ok = fixtures['status'] == 'ok'
+        print(f"Predicted {ok.sum():,} of {len(fixtures):,} scheduled games in "
+              f"{fixtures['grade_id'].nunique():,} grades in {elapsed:.2f}s")
+        sample = fixtures.head(200)
+        start = time.perf_counter()
+        for home, away in zip(sample['home_team_id'], sample['away_team_id']):
+            predictor.predict_one(home, away)
+        per_game = (time.perf_counter() - start) / max(len(sample), 1)
+        print(f"One predict_one() per game: {per_game * 1000:.1f}ms each, "
+              f"~{per_game * len(fixtures):.1f}s for the whole fixture")
+        sys.exit()
+
+    print(f"Training game predictor ({PREDICTOR_MODEL})...")
+    start = time.perf_counter()
+    predictor = load_game_predictor()
+    if predictor is not None:
+        result = predictor.metrics
+        print(f"Ready in {time.perf_counter() - start:.1f}s ({len(predictor.team_ids):,} teams)")
         print(f"Accuracy: {result['accuracy']}")
         print(f"CV Accuracy: {result['cv_accuracy']} ± {result['cv_std']}")
         print(f"Margin R²: {result['r2_margin']}")
+        print(f"Train {result['train_seconds']}s, {result['latency_ms_per_10k']}ms per {LATENCY_ROWS:,} games, "
+              f"{result['model_bytes'] / 1e6:.1f} MB")
         print(f"Feature importance: {result['feature_importance']}")
     else:
         print("Insufficient data")
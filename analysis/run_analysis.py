@@ -146,7 +146,8 @@ def save_prediction_analysis():
     
     plt.barh(clean_names, values)
     plt.xlabel('Feature Importance')
-    plt.title('Random Forest Feature Importance\nGame Outcome Prediction')
+    model_name = model_result['model'].replace('_', ' ').title()
+    plt.title(f'{model_name} Feature Importance\nGame Outcome Prediction')
     plt.tight_layout()
     plt.savefig(os.path.join(OUTPUT_DIR, f"feature_importance_{TIMESTAMP}.png"), dpi=300, bbox_inches='tight')
     plt.close()
@@ -224,7 +225,7 @@ def generate_summary_report(clustered_df, summary, model_result):
     # Prediction model results
     if model_result and model_result.get('status') == 'ok':
         report.append("## Game Outcome Prediction")
-        report.append(f"- Algorithm: Random Forest")
+        report.append(f"- Algorithm: {model_result['model'].replace('_', ' ').title()}")
         report.append(f"- Training samples: {model_result['training_samples']:,}")
         report.append(f"- Test samples: {model_result['test_samples']:,}")
         report.append(f"- Test Accuracy: {model_result['accuracy']:.1%}")
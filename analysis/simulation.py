@@ -0,0 +1,264 @@
+"""
+FullCourtVision — Season Simulation
+Monte Carlo ladder projections. Each grade's remaining fixture is played out
+n_simulations times from the game predictor's win probabilities and margin
+distribution, every simulation of a grade at once as numpy arrays, giving each
+team's finishing-position probabilities and finals odds.
+
+Ladders follow grade_standings: 2 points a win, 1 a draw, then points
+differential. Teams still level are separated at random.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from data_loader import load_table, DB_PATH
+from predictions import load_game_predictor, predict_fixtures, GamePredictor
+
+N_SIMULATIONS = 10_000
+# Top-N ladder positions that make finals
+FINALS_SPOTS = 4
+WIN_POINTS = 2
+DRAW_POINTS = 1
+# Margin SD (points) when the predictor reports none; the SD of completed games' margins
+DEFAULT_MARGIN_SD = 17.0
+# Simulations per block, bounding memory on big grades
+SIMULATION_BLOCK = 5_000
+
+_VOID_STATUSES = ['CANCELLED', 'ABANDONED']
+
+LADDER_COLUMNS = ['P', 'W', 'D', 'L', 'PF', 'PA', 'PD', 'PTS']
+
+
+def current_ladders(games: pd.DataFrame) -> pd.DataFrame:
+    """Current ladder of every grade from its completed games.
+
+    Teams with only unplayed games are included with zero rows, so every team
+    in a grade's fixture has a ladder entry.
+
+    Args:
+        games (pd.DataFrame): Raw games table (load_table("games"))
+
+    Returns:
+        pd.DataFrame: LADDER_COLUMNS indexed by (grade_id, team_id)
+    """
+    games = games[~games['status'].isin(_VOID_STATUSES)]
+    grade = games['grade_id'].astype(str).to_numpy()
+    home = games['home_team_id'].astype(str).to_numpy()
+    away = games['away_team_id'].astype(str).to_numpy()
+    home_score = games['home_score'].to_numpy(dtype=float)
+    away_score = games['away_score'].to_numpy(dtype=float)
+    played = (games['status'] == 'FINAL').to_numpy() & ~np.isnan(home_score) & ~np.isnan(away_score)
+
+    # One row per team per game: home sides then away sides
+    both = np.concatenate([played, played])
+    pf = np.concatenate([home_score, away_score])
+    pa = np.concatenate([away_score, home_score])
+    sides = pd.DataFrame({
+        'grade_id': np.concatenate([grade, grade]),
+        'team_id': np.concatenate([home, away]),
+        'P': both.astype(int),
+        'W': (both & (pf > pa)).astype(int),
+        'D': (both & (pf == pa)).astype(int),
+        'L': (both & (pf < pa)).astype(int),
+        'PF': np.where(both, pf, 0),
+        'PA': np.where(both, pa, 0),
+    })
+    ladder = sides.groupby(['grade_id', 'team_id'], sort=False)[['P', 'W', 'D', 'L', 'PF', 'PA']].sum()
+    ladder[['PF', 'PA']] = ladder[['PF', 'PA']].astype(int)
+    ladder['PD'] = ladder['PF'] - ladder['PA']
+    ladder['PTS'] = ladder['W'] * WIN_POINTS + ladder['D'] * DRAW_POINTS
+    return ladder[LADDER_COLUMNS]
+
+
+def simulate_ladder(points: np.ndarray, differential: np.ndarray, home: np.ndarray, away: np.ndarray,
+                    home_win_prob: np.ndarray, predicted_margin: np.ndarray, margin_sd: float,
+                    n_simulations: int = N_SIMULATIONS, seed: Union[int, Sequence[int], None] = None
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """Play out one grade's remaining games n_simulations times.
+
+    Each game's result is drawn from home_win_prob; its margin from a normal
+    around predicted_margin with SD margin_sd, conditioned on that result and
+    rounded to whole points (a rounded margin of 0 is a draw). Every simulation
+    of a block is sampled, scored and ranked as one array operation.
+
+    Args:
+        points (np.ndarray): Current ladder points per team
+        differential (np.ndarray): Current points differential per team
+        home (np.ndarray): Home team of each remaining game, as positions in points
+        away (np.ndarray): Away team of each remaining game, as positions in points
+        home_win_prob (np.ndarray): P(home win) of each game, 0-1
+        predicted_margin (np.ndarray): Expected home margin of each game
+        margin_sd (float): SD of the actual margin around the predicted one
+        n_simulations (int): Seasons to simulate
+        seed (Union[int, Sequence[int], None]): Random seed
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (position_counts, total_points): position_counts[t, k]
+        is how many simulations team t finished in position k+1; total_points[t]
+        is the sum over simulations of its final points
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    n_games = len(home)
+    counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    total_points = np.zeros(n_teams)
+
+    home_side = np.zeros((n_games, n_teams))
+    home_side[np.arange(n_games), home] = 1
+    away_side = np.zeros((n_games, n_teams))
+    away_side[np.arange(n_games), away] = 1
+    # P(continuous margin rounds to a home loss or draw)
+    below = ndtr((0.5 - predicted_margin) / margin_sd)
+    team = np.arange(n_teams)
+
+    for start in range(0, n_simulations, SIMULATION_BLOCK):
+        block = min(SIMULATION_BLOCK, n_simulations - start)
+        home_win = rng.random((block, n_games)) < home_win_prob
+        u = rng.random((block, n_games))
+        quantile = np.where(home_win, below + (1 - below) * u, below * u)
+        margin = np.rint(predicted_margin + margin_sd * ndtri(np.clip(quantile, 1e-12, 1 - 1e-12)))
+        margin = np.where(home_win, np.maximum(margin, 1), np.minimum(margin, 0))
+        draw = (margin == 0).astype(float)
+        away_win = (margin < 0).astype(float)
+
+        final_points = (points + WIN_POINTS * (home_win @ home_side + away_win @ away_side)
+                        + DRAW_POINTS * (draw @ (home_side + away_side)))
+        final_differential = differential + margin @ (home_side - away_side)
+        # Points, then differential, then a random draw for teams still level
+        score = final_points * 1e7 + final_differential + rng.random((block, n_teams))
+        order = np.argsort(-score, axis=1)
+        position = np.empty_like(order)
+        np.put_along_axis(position, order, np.broadcast_to(team, order.shape), axis=1)
+        counts += np.bincount((team * n_teams + position).ravel(),
+                              minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+        total_points += final_points.sum(axis=0)
+    return counts, total_points
+
+
+def _simulate_grade(task: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """simulate_ladder() on a task tuple; top level so a process pool can run it."""
+    return simulate_ladder(*task)
+
+
+def simulate_season(grade_ids: Union[str, Sequence[str], None] = None, n_simulations: int = N_SIMULATIONS,
+                    finals_spots: int = FINALS_SPOTS, workers: Optional[int] = None,
+                    predictor: Optional[GamePredictor] = None, seed: int = 0,
+                    db_path: str = DB_PATH) -> pd.DataFrame:
+    """Project the final ladder of one or more grades by Monte Carlo simulation.
+
+    Loads the games once and predicts every remaining game of the selected
+    grades in one predict_fixtures() call, then simulates each grade (see
+    simulate_ladder()). Games the predictor cannot score (teams with too few
+    completed games) are treated as coin flips with a predicted margin of 0.
+
+    Args:
+        grade_ids (Union[str, Sequence[str], None]): Grade(s) to project; None for
+                                                     every grade with games left to play
+        n_simulations (int): Seasons to simulate per grade
+        finals_spots (int): Ladder positions that make finals
+        workers (Optional[int]): Worker processes to spread grades across; None or 1
+                                 simulates in this process
+        predictor (Optional[GamePredictor]): Predictor to use; defaults to load_game_predictor()
+        seed (int): Random seed; each grade's draws depend only on it and the
+                    grade's place in grade_ids, not on workers
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        pd.DataFrame: One row per team and grade, by grade then expected position,
+        with grade_id, team_id, team_name, the current ladder (LADDER_COLUMNS),
+        remaining games, exp_pts, exp_position, first_prob, finals_prob and
+        pos_1..pos_N (probability of finishing in each position; 0 beyond the
+        grade's size)
+    """
+    if predictor is None:
+        predictor = load_game_predictor(db_path)
+    ladder = current_ladders(load_table("games", db_path)).reset_index()
+    ladder_rows = ladder.groupby('grade_id', sort=False).indices
+
+    fixture = predict_fixtures(grade_id=grade_ids, predictor=predictor, db_path=db_path)
+    fixture_grades = fixture['grade_id'].astype(str).to_numpy()
+    if grade_ids is None:
+        selected = list(dict.fromkeys(fixture_grades))
+    else:
+        selected = [grade_ids] if isinstance(grade_ids, str) else list(grade_ids)
+    selected = [g for g in selected if g in ladder_rows]
+    if not selected:
+        return pd.DataFrame(columns=['grade_id', 'team_id', 'team_name'] + LADDER_COLUMNS)
+
+    ok = (fixture['status'] == 'ok').to_numpy()
+    prob = np.where(ok, fixture['home_win_prob'].to_numpy(dtype=float) / 100, 0.5)
+    margin = np.where(ok, fixture['predicted_margin'].to_numpy(dtype=float), 0.0)
+    margin_sd = (predictor.metrics.get('margin_rmse') if predictor is not None else None) or DEFAULT_MARGIN_SD
+    fixture_rows = pd.Series(np.arange(len(fixture))).groupby(fixture_grades).indices
+    no_games = np.array([], dtype=int)
+
+    team_ids = ladder['team_id'].to_numpy()
+    points = ladder['PTS'].to_numpy(dtype=float)
+    differential = ladder['PD'].to_numpy(dtype=float)
+    fixture_home = fixture['home_team_id'].to_numpy()
+    fixture_away = fixture['away_team_id'].to_numpy()
+    tasks: List[tuple] = []
+    sides: List[np.ndarray] = []
+    for i, grade_id in enumerate(selected):
+        rows = ladder_rows[grade_id]
+        games = fixture_rows.get(grade_id, no_games)
+        teams = pd.Index(team_ids[rows])
+        home = teams.get_indexer(fixture_home[games])
+        away = teams.get_indexer(fixture_away[games])
+        tasks.append((points[rows], differential[rows], home, away, prob[games], margin[games],
+                      margin_sd, n_simulations, [seed, i]))
+        sides.append(np.concatenate([home, away]))
+
+    if workers is not None and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            simulated = list(pool.map(_simulate_grade, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        simulated = [_simulate_grade(task) for task in tasks]
+
+    # One frame for every grade; position probabilities padded to the biggest grade
+    sizes = np.array([len(ladder_rows[g]) for g in selected])
+    out = ladder.iloc[np.concatenate([ladder_rows[g] for g in selected])].reset_index(drop=True)
+    probs = np.zeros((len(out), sizes.max()))
+    total_points = np.empty(len(out))
+    remaining = np.empty(len(out), dtype=int)
+    offset = 0
+    for size, (counts, totals), side in zip(sizes, simulated, sides):
+        probs[offset:offset + size, :size] = counts / n_simulations
+        total_points[offset:offset + size] = totals
+        remaining[offset:offset + size] = np.bincount(side, minlength=size)
+        offset += size
+
+    teams = load_table("teams", db_path)
+    names = pd.Series(teams['name'].astype(str).to_numpy(), index=teams['id'].astype(str).to_numpy())
+    out.insert(2, 'team_name', out['team_id'].map(names[~names.index.duplicated()]))
+    out['remaining'] = remaining
+    out['exp_pts'] = (total_points / n_simulations).round(2)
+    out['exp_position'] = (probs @ np.arange(1, probs.shape[1] + 1)).round(2)
+    out['first_prob'] = probs[:, 0].round(4)
+    out['finals_prob'] = probs[:, :finals_spots].sum(axis=1).round(4)
+    out = pd.concat([out, pd.DataFrame(probs.round(4), columns=[f'pos_{k + 1}' for k in range(probs.shape[1])])],
+                    axis=1)
+    out['_grade'] = np.repeat(np.arange(len(selected)), sizes)
+    out = out.sort_values(['_grade', 'exp_position', 'team_id'], kind='stable')
+    return out.drop(columns='_grade').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    workers = os.cpu_count() if "--pool" in sys.argv else None
+    predictor = load_game_predictor()
+    start = time.perf_counter()
+    projections = simulate_season(predictor=predictor, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {projections['grade_id'].nunique():,} grades ({len(projections):,} teams) "
+          f"x {N_SIMULATIONS:,} seasons in {elapsed:.1f}s ({workers or 1} process(es))")
+    print(projections.head(10)[['grade_id', 'team_id', 'PTS', 'remaining', 'exp_pts',
+                                'exp_position', 'first_prob', 'finals_prob']].to_string(index=False))
@@ -128,13 +128,13 @@ def grade_standings(grade_id: str, db_path: str = DB_PATH) -> pd.DataFrame:
     """
     return query("""
         WITH team_results AS (
-            SELECT home_team_id as team_id,
+            SELECT home_team_key as team_key,
                 CASE WHEN home_score > away_score THEN 1 ELSE 0 END as win,
                 CASE WHEN home_score < away_score THEN 1 ELSE 0 END as loss,
                 home_score as pf, away_score as pa
             FROM games WHERE grade_id = ? AND status = 'FINAL'
             UNION ALL
-            SELECT away_team_id,
+            SELECT away_team_key,
                 CASE WHEN away_score > home_score THEN 1 ELSE 0 END,
                 CASE WHEN away_score < home_score THEN 1 ELSE 0 END,
                 away_score, home_score
@@ -143,8 +143,8 @@ def grade_standings(grade_id: str, db_path: str = DB_PATH) -> pd.DataFrame:
         SELECT t.name as team, COUNT(*) as P, SUM(win) as W, SUM(loss) as L,
                SUM(pf) as PF, SUM(pa) as PA, SUM(pf) - SUM(pa) as PD,
                SUM(win) * 2 as PTS
-        FROM team_results tr JOIN teams t ON tr.team_id = t.id
-        GROUP BY tr.team_id
+        FROM team_results tr JOIN teams t ON t.team_key = tr.team_key
+        GROUP BY tr.team_key
         ORDER BY PTS DESC, PD DESC
     """, [grade_id, grade_id], db_path)
 
@@ -174,7 +174,7 @@ def team_scoring_patterns(team_id: str, db_path: str = DB_PATH) -> Dict[str, Uni
         SELECT ps.player_id, p.first_name || ' ' || p.last_name as name,
                ps.games_played, ps.total_points, ps.one_point, ps.two_point, ps.three_point
         FROM player_stats ps
-        JOIN players p ON ps.player_id = p.id
+        JOIN players p ON p.player_key = ps.player_key
         WHERE ps.team_name = (SELECT name FROM teams WHERE id = ?)
         ORDER BY ps.total_points DESC
     """, [team_id], db_path)
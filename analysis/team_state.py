@@ -0,0 +1,234 @@
+"""
+FullCourtVision — Team State
+Point-in-time team strength features. TeamStateEngine walks games in kickoff
+order keeping each team's running record (points for/against, win rate,
+Welford mean and variance of points scored, recent form), so every game gets
+the features its teams had before tip-off in one O(n) pass, without the game
+itself or anything after it leaking in.
+
+The engine's state and the per-game features are saved in the artifact store;
+update_team_state() loads the latest save and only walks games it has not
+seen, so a new round costs a pass over that round.
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_games, data_version, DB_PATH
+from artifacts import artifact_key, code_hash, latest_artifact, save_artifact, ARTIFACT_DIR
+
+# Results in a team's recent form
+FORM_GAMES = 5
+
+STATE_ARTIFACT = "team_state"
+
+# Features of each side, as home_<name> / away_<name>
+STATE_FEATURES = ['avg_pf', 'avg_pa', 'win_rate', 'scoring_std', 'form', 'games']
+
+FEATURE_COLUMNS = (['game_id', 'date', 'home_team_id', 'away_team_id', 'home_score', 'away_score']
+                   + [f'home_{c}' for c in STATE_FEATURES] + [f'away_{c}' for c in STATE_FEATURES]
+                   + ['home_win', 'margin'])
+
+_TEAM_COLUMNS = ['team_id', 'games', 'mean_pf', 'm2_pf', 'sum_pa', 'wins', 'recent']
+
+
+class TeamStateEngine:
+    """Running per-team state over completed games, applied in kickoff order."""
+
+    def __init__(self, form_games: int = FORM_GAMES):
+        """
+        Args:
+            form_games (int): Most recent results that make up a team's form
+        """
+        self.form_games = form_games
+        # team_id -> [games, mean_pf, m2_pf, sum_pa, wins, recent results deque]
+        self.teams: Dict[str, list] = {}
+        self._features: List[pd.DataFrame] = []
+        self._applied = set()
+        self.data_version: Optional[str] = None
+
+    def _team(self, team_id: str) -> list:
+        state = self.teams.get(team_id)
+        if state is None:
+            state = self.teams[team_id] = [0, 0.0, 0.0, 0.0, 0, deque(maxlen=self.form_games)]
+        return state
+
+    @staticmethod
+    def _snapshot(state: list) -> tuple:
+        n, mean_pf, m2_pf, sum_pa, wins, recent = state
+        if n == 0:
+            return (math.nan,) * 5 + (0,)
+        return mean_pf, sum_pa / n, wins / n, math.sqrt(m2_pf / n), sum(recent) / len(recent), n
+
+    @staticmethod
+    def _apply(state: list, pf: float, pa: float) -> None:
+        state[0] += 1
+        delta = pf - state[1]
+        state[1] += delta / state[0]
+        state[2] += delta * (pf - state[1])
+        state[3] += pa
+        won = pf > pa
+        state[4] += won
+        state[5].append(won)
+
+    def process(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Features as of kickoff for every game not yet applied, applying the completed ones.
+
+        Games are walked by date, time and id. Completed games (FINAL with both
+        scores) update their teams after their features are taken and are
+        remembered, so passing the full games table again only walks what is
+        new. Unplayed games get their teams' current features and are walked
+        again next time. A result recorded after later games were applied is
+        applied when it arrives.
+
+        Args:
+            games (pd.DataFrame): Games as returned by load_games()
+
+        Returns:
+            pd.DataFrame: FEATURE_COLUMNS for the walked games in kickoff order;
+            home_win and margin are NaN for unplayed games. Team features are
+            NaN (and games 0) for a team's first game.
+        """
+        games = games[~games['id'].astype(str).isin(self._applied)]
+        games = games.sort_values(['date', 'time', 'id'], na_position='last', kind='stable')
+        ids = games['id'].astype(str).tolist()
+        home_ids = games['home_team_id'].astype(str).tolist()
+        away_ids = games['away_team_id'].astype(str).tolist()
+        home_scores = games['home_score'].to_numpy(dtype=float)
+        away_scores = games['away_score'].to_numpy(dtype=float)
+        completed = ((games['status'] == 'FINAL').to_numpy()
+                     & ~np.isnan(home_scores) & ~np.isnan(away_scores))
+
+        rows = []
+        for i, game_id in enumerate(ids):
+            home = self._team(home_ids[i])
+            away = self._team(away_ids[i])
+            rows.append(self._snapshot(home) + self._snapshot(away))
+            if completed[i]:
+                self._apply(home, home_scores[i], away_scores[i])
+                self._apply(away, away_scores[i], home_scores[i])
+                self._applied.add(game_id)
+
+        df = pd.DataFrame(rows, columns=[f'home_{c}' for c in STATE_FEATURES] + [f'away_{c}' for c in STATE_FEATURES])
+        df.insert(0, 'game_id', ids)
+        df.insert(1, 'date', games['date'].to_numpy())
+        df.insert(2, 'home_team_id', home_ids)
+        df.insert(3, 'away_team_id', away_ids)
+        df.insert(4, 'home_score', home_scores)
+        df.insert(5, 'away_score', away_scores)
+        df['home_win'] = np.where(completed, (home_scores > away_scores).astype(float), np.nan)
+        df['margin'] = np.where(completed, home_scores - away_scores, np.nan)
+        df[['home_games', 'away_games']] = df[['home_games', 'away_games']].astype(int)
+        self._features.append(df[completed].reset_index(drop=True))
+        return df
+
+    @property
+    def features(self) -> pd.DataFrame:
+        """FEATURE_COLUMNS of every applied game, in the order they were applied."""
+        if len(self._features) > 1:
+            self._features = [pd.concat(self._features, ignore_index=True)]
+        return self._features[0] if self._features else pd.DataFrame(columns=FEATURE_COLUMNS)
+
+    def team_table(self) -> pd.DataFrame:
+        """Each team's current features (as of after its latest applied game), indexed by team_id."""
+        table = pd.DataFrame([self._snapshot(s) for s in self.teams.values()], columns=STATE_FEATURES,
+                             index=pd.Index(list(self.teams), name='team_id'))
+        table['games'] = table['games'].astype(int)
+        return table
+
+    def stale_results(self, games: pd.DataFrame) -> bool:
+        """True if games has removed or re-scored an applied game, so the state needs a rebuild."""
+        applied = self.features[['game_id', 'home_score', 'away_score']]
+        if applied.empty:
+            return False
+        current = pd.DataFrame({'game_id': games['id'].astype(str),
+                                'home_now': games['home_score'].astype(float),
+                                'away_now': games['away_score'].astype(float)})
+        merged = applied.merge(current, on='game_id', how='left')
+        return bool(((merged['home_score'] != merged['home_now'])
+                     | (merged['away_score'] != merged['away_now'])).any())
+
+    def to_parts(self) -> Dict[str, object]:
+        """The engine as artifact parts (see artifacts.save_artifact())."""
+        teams = pd.DataFrame([[tid] + s[:5] + [''.join('1' if r else '0' for r in s[5])]
+                              for tid, s in self.teams.items()], columns=_TEAM_COLUMNS)
+        return {'teams': teams, 'features': self.features,
+                'meta': {'form_games': self.form_games, 'data_version': self.data_version}}
+
+    @classmethod
+    def from_parts(cls, parts: Dict[str, object]) -> 'TeamStateEngine':
+        """Rebuild an engine saved by to_parts()."""
+        engine = cls(parts['meta']['form_games'])
+        engine.data_version = parts['meta']['data_version']
+        for row in parts['teams'].itertuples(index=False):
+            engine.teams[row.team_id] = [int(row.games), float(row.mean_pf), float(row.m2_pf), float(row.sum_pa),
+                                         int(row.wins), deque((c == '1' for c in row.recent), maxlen=engine.form_games)]
+        features = parts['features'].copy()
+        engine._features = [features]
+        engine._applied = set(features['game_id'])
+        return engine
+
+
+def update_team_state(db_path: str = DB_PATH, form_games: int = FORM_GAMES, rebuild: bool = False,
+                      root: str = ARTIFACT_DIR) -> TeamStateEngine:
+    """The team state engine brought up to date with the current data.
+
+    Loads the latest saved engine and walks only the games it has not applied;
+    it is rebuilt from scratch when rebuild is set, when its code or
+    form_games changed, or when an applied game was removed or re-scored.
+    The updated engine is saved back under the current data version.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        form_games (int): Most recent results that make up a team's form
+        rebuild (bool): Ignore saved state
+        root (str): Artifact store directory
+
+    Returns:
+        TeamStateEngine: Engine with every completed game applied
+    """
+    version = data_version(db_path)
+    code = code_hash(TeamStateEngine)
+    engine = None
+    saved = None if rebuild else latest_artifact(STATE_ARTIFACT, mmap=False, root=root)
+    if saved is not None:
+        key, parts = saved
+        meta = parts['meta']
+        if meta.get('code') == code and meta.get('form_games') == form_games:
+            engine = TeamStateEngine.from_parts(parts)
+            if engine.data_version == version:
+                return engine
+
+    games = load_games(db_path)
+    if engine is None or engine.stale_results(games):
+        engine = TeamStateEngine(form_games)
+    engine.process(games)
+    engine.data_version = version
+
+    parts = engine.to_parts()
+    parts['meta']['code'] = code
+    try:
+        save_artifact(STATE_ARTIFACT, artifact_key(version, code, {'form_games': form_games}), parts, root)
+    except OSError:
+        pass  # read-only store: the next call walks the new games again
+    return engine
+
+
+def point_in_time_features(db_path: str = DB_PATH) -> pd.DataFrame:
+    """FEATURE_COLUMNS as of kickoff for every completed game, in the order the games were applied."""
+    return update_team_state(db_path).features
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    engine = update_team_state(rebuild=True)
+    print(f"Rebuilt in {time.perf_counter() - start:.2f}s: {len(engine.features):,} games, {len(engine.teams):,} teams")
+    start = time.perf_counter()
+    update_team_state()
+    print(f"Up-to-date load in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,331 @@
+"""Expensive cached computations for the dashboard and the background warmer
+that precomputes them.
+
+compute_archetypes() and archetype_by_org() are module-level st.cache_data
+functions keyed on the data version, so the Player Archetypes page and the
+warmer share one cache entry. The fitted archetypes and the Game Predictor's
+models are also kept in the on-disk artifact store (analysis/artifacts.py),
+so a restarted process or another replica loads them instead of refitting. ensure_warmer() starts a daemon thread per
+server process that, at start and after every data-version change, runs
+WARM_STEPS: those functions, the common parameterless page queries (served
+from db.q()'s result cache afterwards) and the name search index. Progress
+is shown in the sidebar by render_warm_status() and written to
+WARM_STATUS_PATH for the healthcheck.
+
+    python app_cache.py                # warm in this process and print step timings
+    python app_cache.py --healthcheck  # exit 0 once the server's caches are warm for the current data
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from db import q, get_data_version, search_names
+from artifacts import get_or_compute
+from predictions import load_game_predictor
+
+# Seconds between data-version checks once the caches are warm
+WARM_POLL_SECONDS = float(os.environ.get("FCV_WARM_POLL_SECONDS", "30"))
+# Status file shared with `python app_cache.py --healthcheck`
+WARM_STATUS_PATH = os.environ.get("FCV_WARM_STATUS", os.path.join(tempfile.gettempdir(), "fcv_cache_warm.json"))
+
+# Queries pages run on load without parameters; the pages use these constants
+# so the warmed result-cache keys match
+HOME_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM players) as players,
+        (SELECT COUNT(*) FROM player_stats) as stat_lines,
+        (SELECT COUNT(*) FROM games) as games,
+        (SELECT COUNT(*) FROM organisations) as orgs,
+        (SELECT COUNT(*) FROM seasons) as seasons
+"""
+HOME_SEASONS_SQL = "SELECT name, start_date, end_date, status FROM seasons ORDER BY start_date DESC"
+SEASON_PICKER_SQL = "SELECT season_key, name FROM seasons ORDER BY start_date DESC"
+ORGANISATIONS_SQL = "SELECT name, type, suburb, state FROM organisations"
+
+# Leaderboard category -> query; {season_filter} is "" for all seasons
+LEADERBOARD_SQL = {
+    "Top Scorers": """
+        SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
+               g.name as grade, s.name as season,
+               ps.total_points, ps.games_played,
+               ROUND(CAST(ps.total_points AS FLOAT) / MAX(ps.games_played, 1), 1) as PPG
+        FROM player_stats ps
+        JOIN players p ON p.player_key = ps.player_key
+        JOIN grades g ON g.grade_key = ps.grade_key
+        JOIN seasons s ON s.season_key = g.season_key
+        WHERE ps.total_points > 0 {season_filter}
+        ORDER BY ps.total_points DESC LIMIT 50
+    """,
+    "Top 3PT Shooters": """
+        SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
+               g.name as grade, s.name as season,
+               ps.three_point, ps.games_played, ps.total_points
+        FROM player_stats ps
+        JOIN players p ON p.player_key = ps.player_key
+        JOIN grades g ON g.grade_key = ps.grade_key
+        JOIN seasons s ON s.season_key = g.season_key
+        WHERE ps.three_point > 0 {season_filter}
+        ORDER BY ps.three_point DESC LIMIT 50
+    """,
+    "Most Games Played": """
+        SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
+               g.name as grade, s.name as season,
+               ps.games_played, ps.total_points
+        FROM player_stats ps
+        JOIN players p ON p.player_key = ps.player_key
+        JOIN grades g ON g.grade_key = ps.grade_key
+        JOIN seasons s ON s.season_key = g.season_key
+        WHERE ps.games_played > 0 {season_filter}
+        ORDER BY ps.games_played DESC LIMIT 50
+    """,
+}
+
+ARCHETYPE_FEATURES = ['ppg', 'ft_pg', 'fg2_pg', 'fg3_pg', 'fpg']
+
+
+# Keyed on the data version: recomputed only after the data changes
+@st.cache_data(max_entries=1, show_spinner=False)
+def compute_archetypes(data_version):
+    """K-means archetype per player (5+ games) from per-game stats.
+
+    Returns:
+        tuple: (DataFrame with the features, cluster and archetype per player, feature column names)
+    """
+    artifact = get_or_compute("archetypes", _fit_archetypes, data_version)
+    return artifact["players"], list(ARCHETYPE_FEATURES)
+
+
+def _fit_archetypes():
+    # Aggregate per-game stats per player (min 5 GP)
+    df = q("""
+        SELECT player_key, player_name,
+               games_played as gp, total_points as pts,
+               one_point as ft, two_point as fg2, three_point as fg3,
+               total_fouls as fouls
+        FROM player_career
+        WHERE games_played >= 5
+    """)
+    df['ppg'] = df['pts'] / df['gp']
+    df['ft_pg'] = df['ft'] / df['gp']
+    df['fg2_pg'] = df['fg2'] / df['gp']
+    df['fg3_pg'] = df['fg3'] / df['gp']
+    df['fpg'] = df['fouls'] / df['gp']
+
+    features = list(ARCHETYPE_FEATURES)
+    X = df[features].fillna(0).values
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
+    df['cluster'] = kmeans.fit_predict(X_scaled)
+
+    # Assign archetype names by cluster characteristics
+    cluster_means = df.groupby('cluster')[features].mean()
+    # Sharpshooter: highest fg3_pg
+    # Inside Scorer: highest fg2_pg relative to fg3_pg
+    # High Volume: highest ppg
+    # Physical: highest fpg
+    # Balanced: remaining
+    assigned = {}
+    remaining_clusters = set(range(5))
+
+    # High Volume = highest ppg
+    c = cluster_means['ppg'].idxmax()
+    assigned[c] = "High Volume"
+    remaining_clusters.discard(c)
+
+    # Sharpshooter = highest fg3_pg (among remaining)
+    c = cluster_means.loc[list(remaining_clusters), 'fg3_pg'].idxmax()
+    assigned[c] = "Sharpshooter"
+    remaining_clusters.discard(c)
+
+    # Physical = highest fpg (among remaining)
+    c = cluster_means.loc[list(remaining_clusters), 'fpg'].idxmax()
+    assigned[c] = "Physical"
+    remaining_clusters.discard(c)
+
+    # Inside Scorer = highest fg2_pg (among remaining)
+    c = cluster_means.loc[list(remaining_clusters), 'fg2_pg'].idxmax()
+    assigned[c] = "Inside Scorer"
+    remaining_clusters.discard(c)
+
+    # Balanced = whatever's left
+    c = remaining_clusters.pop()
+    assigned[c] = "Balanced"
+
+    df['archetype'] = df['cluster'].map(assigned)
+    return {"players": df, "scaler": scaler, "kmeans": kmeans, "centroids": kmeans.cluster_centers_}
+
+
+# Link players to orgs via player_stats.team_name → teams.name → teams.organisation_id
+@st.cache_data(max_entries=1, show_spinner=False)
+def archetype_by_org(data_version):
+    """compute_archetypes() rows joined to each player's most common organisation."""
+    # Get player → org mapping (most common org per player)
+    player_org = q("""
+        SELECT ps.player_key, o.name as org_name, COUNT(*) as cnt
+        FROM player_stats ps
+        JOIN teams t ON ps.team_name = t.name
+        JOIN organisations o ON t.organisation_id = o.id
+        GROUP BY ps.player_key, o.name
+    """)
+    if player_org.empty:
+        return pd.DataFrame()
+    # Keep most common org per player
+    idx = player_org.groupby('player_key')['cnt'].idxmax()
+    player_org = player_org.loc[idx, ['player_key', 'org_name']]
+    arch_df, _ = compute_archetypes(data_version)
+    return arch_df.merge(player_org, on='player_key', how='inner')
+
+
+# Display names for predictions.GamePredictor.feature_cols, in order
+OUTCOME_FEATURES = ['Home Avg PF', 'Home Avg PA', 'Home Win%', 'Home Scoring SD',
+                    'Away Avg PF', 'Away Avg PA', 'Away Win%', 'Away Scoring SD']
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def game_predictor(data_version):
+    """The Game Predictor's in-memory GamePredictor for data_version (None with too few games).
+
+    Loaded from the artifact store, where `python analysis/predictions.py` or
+    the warmer trained it through predictions.train_game_predictor().
+    """
+    return load_game_predictor()
+
+
+# (label, callable taking the data version), run in order
+WARM_STEPS = [
+    ("Home counts", lambda v: q(HOME_COUNTS_SQL)),
+    ("Seasons", lambda v: (q(HOME_SEASONS_SQL), q(SEASON_PICKER_SQL))),
+    ("Leaderboards", lambda v: [q(sql.format(season_filter="")) for sql in LEADERBOARD_SQL.values()]),
+    ("Organisations", lambda v: q(ORGANISATIONS_SQL + " ORDER BY name")),
+    ("Name search index", lambda v: search_names("smith", kinds=("player", "team", "organisation"))),
+    ("Player archetypes", compute_archetypes),
+    ("Archetypes by organisation", archetype_by_org),
+    ("Game Predictor model", game_predictor),
+]
+
+
+def warm(version=None, progress=None):
+    """Run every WARM_STEPS entry for version (default: the current data version).
+
+    Args:
+        version (str): Data version to warm
+        progress (callable): Called as progress(done, total, label) before each step and at the end
+
+    Returns:
+        list: (label, seconds) per step
+    """
+    version = version or get_data_version()
+    timings = []
+    for done, (label, step) in enumerate(WARM_STEPS):
+        if progress:
+            progress(done, len(WARM_STEPS), label)
+        start = time.perf_counter()
+        step(version)
+        timings.append((label, time.perf_counter() - start))
+    if progress:
+        progress(len(WARM_STEPS), len(WARM_STEPS), "")
+    return timings
+
+
+def _write_status(status):
+    tmp = WARM_STATUS_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f)
+    os.replace(tmp, WARM_STATUS_PATH)
+
+
+def _publish(warmer, **changes):
+    with warmer["lock"]:
+        warmer["status"].update(changes, updated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        snapshot = dict(warmer["status"])
+    try:
+        _write_status(snapshot)
+    except OSError:
+        pass  # the sidebar still shows progress without a writable status file
+
+
+def _warm_loop(warmer):
+    status = warmer["status"]
+    while True:
+        try:
+            version = get_data_version()
+            if version != status["version"] or status["state"] == "failed":
+                _publish(warmer, state="warming", version=version, done=0, total=len(WARM_STEPS), error=None)
+                start = time.perf_counter()
+                warm(version, lambda done, total, label: _publish(warmer, done=done, total=total, step=label))
+                _publish(warmer, state="ready", seconds=round(time.perf_counter() - start, 2))
+        except Exception as e:  # keep serving; the pages compute on demand and the next poll retries
+            _publish(warmer, state="failed", error=f"{type(e).__name__}: {e}")
+        time.sleep(WARM_POLL_SECONDS)
+
+
+@st.cache_resource
+def _warmer():
+    warmer = {"lock": threading.Lock(),
+              "status": {"pid": os.getpid(), "state": "starting", "version": None,
+                         "done": 0, "total": len(WARM_STEPS), "step": "", "seconds": None, "error": None}}
+    threading.Thread(target=_warm_loop, args=(warmer,), name="fcv-cache-warmer", daemon=True).start()
+    return warmer
+
+
+def ensure_warmer():
+    """Start this server process's warmer thread if it is not running yet. Cheap to call on every rerun."""
+    return _warmer()
+
+
+def warm_status():
+    """Snapshot of the warmer's progress (state, version, done/total, step, seconds, error)."""
+    warmer = _warmer()
+    with warmer["lock"]:
+        return dict(warmer["status"])
+
+
+def render_warm_status(container=st.sidebar):
+    """Show the warmer's progress in container (the sidebar by default)."""
+    s = warm_status()
+    if s["state"] in ("starting", "warming"):
+        container.progress(s["done"] / max(s["total"], 1),
+                           text=f"Warming caches ({s['done']}/{s['total']}): {s['step'] or '...'}")
+    elif s["state"] == "failed":
+        container.caption(f"⚠️ Cache warm-up failed: {s['error']}")
+    else:
+        container.caption(f"✅ Caches warm ({s['seconds']}s, data {s['version'][:8]})")
+
+
+def healthcheck():
+    """0 if the server's warmer reports ready for the current data version, else 1."""
+    try:
+        with open(WARM_STATUS_PATH, encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        print(f"unhealthy: no warm status at {WARM_STATUS_PATH}")
+        return 1
+    current = get_data_version()
+    if status.get("state") != "ready" or status.get("version") != current:
+        print(f"unhealthy: {status.get('state')} ({status.get('done')}/{status.get('total')}) "
+              f"for data {status.get('version')}, current {current}")
+        return 1
+    print(f"healthy: caches warm for data {current} in {status.get('seconds')}s")
+    return 0
+
+
+if __name__ == "__main__":
+    if "--healthcheck" in sys.argv:
+        sys.exit(healthcheck())
+    total = 0.0
+    for label, seconds in warm():
+        print(f"{label:<28} {seconds:>8.2f}s")
+        total += seconds
+    print(f"{'TOTAL':<28} {total:>8.2f}s")
@@ -0,0 +1,178 @@
+"""Materialize the dashboard's aggregate tables into playhq.db.
+
+Assigns the integer surrogate keys (surrogate_keys.py), builds the grade_dim
+dimension, then player_career, player_season, team_record, grade_standings
+and player_age_group from player_stats/games so pages read pre-grouped rows
+instead of re-running the same GROUP BYs on every rerun. The derived tables
+are keyed and joined on the integer keys. Also builds the name_search
+trigram index, brings the Elo tables team_ratings and game_ratings up to
+date (analysis/ratings.py; only new games are rated) and applies the
+index_advisor.py migration. export_data.py runs this before exporting, so
+the tables also ship as parquet. Finally stamps data/data_version.json
+(analysis/data_manifest.py) so caches keyed on the data version refresh.
+
+Re-run after every scrape:
+    python build_aggregates.py
+"""
+
+import os
+import sqlite3
+import sys
+import pandas as pd
+
+import index_advisor
+import name_search
+import surrogate_keys
+
+_ANALYSIS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis")
+if _ANALYSIS_DIR not in sys.path:
+    sys.path.insert(0, _ANALYSIS_DIR)
+
+from data_loader import build_grade_dim
+import data_manifest
+import ratings
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "playhq.db")
+
+# name -> (SELECT producing the table, indexes)
+AGGREGATES = {
+    "player_career": ("""
+        SELECT ps.player_key, p.first_name, p.last_name,
+               p.first_name || ' ' || p.last_name AS player_name,
+               SUM(ps.games_played) AS games_played,
+               SUM(ps.total_points) AS total_points,
+               SUM(ps.one_point) AS one_point,
+               SUM(ps.two_point) AS two_point,
+               SUM(ps.three_point) AS three_point,
+               SUM(ps.total_fouls) AS total_fouls,
+               COUNT(DISTINCT ps.grade_id) AS num_grades,
+               ROUND(CAST(SUM(ps.total_points) AS FLOAT) / MAX(SUM(ps.games_played), 1), 2) AS ppg
+        FROM player_stats ps
+        JOIN players p ON p.player_key = ps.player_key
+        GROUP BY ps.player_key, p.first_name, p.last_name
+    """, ["player_key", "games_played"]),
+
+    "player_season": ("""
+        SELECT ps.player_key, g.season_key, s.name AS season_name, s.start_date,
+               SUM(ps.games_played) AS games_played,
+               SUM(ps.total_points) AS total_points,
+               SUM(ps.one_point) AS one_point,
+               SUM(ps.two_point) AS two_point,
+               SUM(ps.three_point) AS three_point,
+               SUM(ps.total_fouls) AS total_fouls
+        FROM player_stats ps
+        JOIN grades g ON g.grade_key = ps.grade_key
+        JOIN seasons s ON s.season_key = g.season_key
+        GROUP BY ps.player_key, g.season_key, s.name, s.start_date
+    """, ["player_key"]),
+
+    "team_record": ("""
+        WITH results AS (
+            SELECT home_team_key AS team_key, home_score AS pf, away_score AS pa
+            FROM games WHERE status = 'FINAL'
+            UNION ALL
+            SELECT away_team_key, away_score, home_score
+            FROM games WHERE status = 'FINAL'
+        )
+        SELECT r.team_key, t.name, t.season_key,
+               COUNT(*) AS played,
+               SUM(CASE WHEN pf > pa THEN 1 ELSE 0 END) AS wins,
+               SUM(CASE WHEN pf < pa THEN 1 ELSE 0 END) AS losses,
+               SUM(CASE WHEN pf = pa THEN 1 ELSE 0 END) AS draws,
+               SUM(pf) AS pts_for, SUM(pa) AS pts_against
+        FROM results r JOIN teams t ON t.team_key = r.team_key
+        GROUP BY r.team_key, t.name, t.season_key
+    """, ["team_key"]),
+
+    "grade_standings": ("""
+        WITH team_results AS (
+            SELECT grade_key, home_team_key AS team_key,
+                CASE WHEN home_score > away_score THEN 1 ELSE 0 END AS win,
+                CASE WHEN home_score < away_score THEN 1 ELSE 0 END AS loss,
+                CASE WHEN home_score = away_score THEN 1 ELSE 0 END AS draw,
+                home_score AS pts_for, away_score AS pts_against
+            FROM games WHERE status = 'FINAL'
+            UNION ALL
+            SELECT grade_key, away_team_key,
+                CASE WHEN away_score > home_score THEN 1 ELSE 0 END,
+                CASE WHEN away_score < home_score THEN 1 ELSE 0 END,
+                CASE WHEN away_score = home_score THEN 1 ELSE 0 END,
+                away_score, home_score
+            FROM games WHERE status = 'FINAL'
+        )
+        SELECT tr.grade_key, tr.team_key, t.name AS team,
+               COUNT(*) AS P, SUM(win) AS W, SUM(loss) AS L, SUM(draw) AS D,
+               SUM(pts_for) AS PF, SUM(pts_against) AS PA, SUM(pts_for) - SUM(pts_against) AS PD,
+               SUM(win) * 2 + SUM(draw) AS PTS
+        FROM team_results tr JOIN teams t ON t.team_key = tr.team_key
+        GROUP BY tr.grade_key, tr.team_key, t.name
+    """, ["grade_key, PTS DESC, PD DESC"]),
+
+    # Peer pools for the Scouting Report
+    "player_age_group": ("""
+        SELECT ps.player_key, COALESCE(gd.age_group, 'Unknown') AS age_group,
+               SUM(ps.games_played) AS gp,
+               SUM(ps.total_points) AS pts,
+               SUM(ps.total_fouls) AS fouls,
+               SUM(ps.one_point) AS ft,
+               SUM(ps.two_point) AS fg2,
+               SUM(ps.three_point) AS fg3
+        FROM player_stats ps
+        JOIN grade_dim gd ON gd.grade_key = ps.grade_key
+        GROUP BY ps.player_key, COALESCE(gd.age_group, 'Unknown')
+    """, ["age_group, gp", "player_key"]),
+}
+
+
+def _build_grade_dim(conn):
+    """grade_dim: age group, gender, division tier and season order per grade."""
+    grades = pd.read_sql_query("SELECT id, season_id, name, grade_key, season_key FROM grades", conn)
+    seasons = pd.read_sql_query("SELECT id, name, start_date FROM seasons", conn)
+    dim = build_grade_dim(grades, seasons)
+    conn.execute("DROP TABLE IF EXISTS grade_dim")
+    conn.execute("CREATE TABLE grade_dim (grade_key INTEGER PRIMARY KEY, season_key INTEGER, "
+                 "grade_id TEXT, season_id TEXT, age_group TEXT, gender TEXT, "
+                 "division_tier INTEGER, season_order INTEGER)")
+    conn.executemany("INSERT INTO grade_dim VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     dim.astype(object).where(dim.notna(), None).itertuples(index=False, name=None))
+    print(f"Building grade_dim... {len(dim):,} rows")
+
+
+def build(db_path: str = DB_PATH) -> dict:
+    """(Re)create every aggregate table and its indexes in db_path.
+
+    Returns:
+        dict: The data_version manifest stamped for db_path afterwards
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        keys = surrogate_keys.build(conn)
+        print("Surrogate keys: " + ", ".join(f"{n:,} {entity}s" for entity, n in keys.items()))
+        _build_grade_dim(conn)
+        for name, (select_sql, indexes) in AGGREGATES.items():
+            print(f"Building {name}...", end=" ")
+            conn.execute(f"DROP TABLE IF EXISTS [{name}]")
+            conn.execute(f"CREATE TABLE [{name}] AS {select_sql}")
+            for cols in indexes:
+                suffix = "_".join(c.split()[0] for c in cols.split(","))
+                conn.execute(f"CREATE INDEX [idx_{name}_{suffix}] ON [{name}] ({cols})")
+            rows = conn.execute(f"SELECT COUNT(*) FROM [{name}]").fetchone()[0]
+            print(f"{rows:,} rows")
+        conn.commit()
+        print("Updating team ratings...", end=" ")
+        rated = ratings.update_ratings(conn)
+        print(f"{rated['rated']:,} games rated ({rated['games']:,} in total, {rated['teams']:,} grade teams)")
+        print("Building name_search...")
+        name_search.build(conn)
+        created = index_advisor.apply_indexes(conn)
+        print(f"Created {len(created)} workload index(es)")
+    finally:
+        conn.close()
+    # Stamped after closing so the manifest is never older than the file
+    manifest = data_manifest.stamp_sqlite(db_path, "build_aggregates.py")
+    print(f"Data version: {manifest['version']}")
+    return manifest
+
+
+if __name__ == "__main__":
+    build()
@@ -1,60 +1,576 @@
 """
 Database abstraction layer for FullCourtVision.
 Provides q() for SQL queries with automatic parquet fallback on Streamlit Cloud.
+
+In parquet mode the SQL runs on DuckDB straight over the parquet files when
+duckdb is installed (FCV_QUERY_ENGINE=duckdb, the default), otherwise on an
+in-memory SQLite copy of the tables (FCV_QUERY_ENGINE=sqlite). Either way a
+table is only touched once a query references it, and the SQLite copy only
+holds the columns queries have asked for so far.
+
+Parquet files exported before the surrogate keys (surrogate_keys.py) get
+their *_key columns derived on read, so the key joins work on either layout.
+Likewise a parquet set without the tables build_aggregates.py materializes
+gets each one built in memory, from the same definition, the first time a
+query reads it.
+
+search_names() serves the name search boxes from the name_search trigram
+index, read from playhq.db or built in memory in parquet mode.
+
+Cached results live until the data version changes: the data_version.json
+manifest the writers stamp (analysis/data_manifest.py), not a TTL. The
+data files are checked for a new version at most once per
+SOURCE_CHECK_SECONDS, not on every query.
 """
 
+import json
 import os
+import re
+import sys
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 import pandas as pd
+import pyarrow.parquet as pq
 import streamlit as st
 
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(_BASE_DIR, "data", "playhq.db")
 PARQUET_DIR = os.path.join(_BASE_DIR, "data", "parquet")
 
-_USE_SQLITE = os.path.isfile(DB_PATH)
+_ANALYSIS_DIR = os.path.join(_BASE_DIR, "analysis")
+if _ANALYSIS_DIR not in sys.path:
+    sys.path.insert(0, _ANALYSIS_DIR)
+
+from db_pool import get_pool, close_all
+from data_loader import build_grade_dim
+import build_aggregates
+import data_manifest
+import name_search
+import ratings
+import surrogate_keys
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# FCV_DATA_SOURCE=parquet forces parquet mode even when playhq.db exists
+_USE_SQLITE = os.path.isfile(DB_PATH) and os.environ.get("FCV_DATA_SOURCE", "").lower() != "parquet"
+QUERY_ENGINE = os.environ.get("FCV_QUERY_ENGINE", "duckdb").lower()
+_USE_DUCKDB = not _USE_SQLITE and QUERY_ENGINE == "duckdb" and duckdb is not None
+
+RESULT_CACHE_MAX_ENTRIES = 512
+# Seconds between checks of the data files for a new version; queries in
+# between (a page rerun's worth) reuse the last check
+SOURCE_CHECK_SECONDS = float(os.environ.get("FCV_SOURCE_CHECK_SECONDS", "5"))
+
+# FCV_QUERY_LOG=path appends every q() call as a JSON line (read by index_advisor.py)
+QUERY_LOG = os.environ.get("FCV_QUERY_LOG")
+_query_log_lock = threading.Lock()
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+[\[\"]?(\w+)", re.IGNORECASE)
+_SELECT_STAR = re.compile(r"(?:\bSELECT|,)\s*(?:\w+\.)?\*", re.IGNORECASE)
+
+# Tables build_aggregates.py materializes, built in memory when the parquet set lacks them
+_AGGREGATE_SQL = {name: select_sql for name, (select_sql, _) in build_aggregates.AGGREGATES.items()}
+_RATING_TABLES = ["team_ratings", "game_ratings"]
+_DERIVED_TABLES = ["grade_dim", *_AGGREGATE_SQL, *_RATING_TABLES]
+
+
+def _parquet_path(table):
+    return os.path.join(PARQUET_DIR, f"{table}.parquet")
+
+
+def _stored_columns(table):
+    return pq.read_schema(_parquet_path(table)).names
+
+
+def _parquet_columns(table):
+    """Columns of a parquet table, including the key columns derived on read."""
+    stored = _stored_columns(table)
+    return stored + [key for key, _, _ in surrogate_keys.missing_keys(table, stored)]
+
+
+def _entity_ids(table):
+    """An entity table's id column, and its own key column if the file has one."""
+    if not os.path.isfile(_parquet_path(table)):
+        return pd.DataFrame({"id": pd.Series(dtype=object)})
+    own_key = surrogate_keys.KEY_COLUMNS[table][0][0]
+    return pd.read_parquet(_parquet_path(table), columns=[c for c in ("id", own_key) if c in _stored_columns(table)])
+
+
+def _read_parquet(table, columns=None):
+    """Read a parquet table (optionally only columns), deriving any key columns the file lacks."""
+    missing = surrogate_keys.missing_keys(table, _stored_columns(table))
+    if columns is not None:
+        missing = [ref for ref in missing if ref[0] in columns]
+    if not missing:
+        return pd.read_parquet(_parquet_path(table), columns=columns)
+    read = None
+    if columns is not None:
+        needed = set(columns) | {uuid_col for _, _, uuid_col in missing}
+        read = [c for c in _stored_columns(table) if c in needed]
+    df = surrogate_keys.derive_keys(table, pd.read_parquet(_parquet_path(table), columns=read), _entity_ids)
+    return df if columns is None else df[list(columns)]
+
+
+def _referenced_tables(sql, tables=None):
+    """Parquet tables a query reads: the declared list, else every FROM/JOIN target.
+
+    CTE and alias names are dropped because they have no parquet file.
+    """
+    available = {f[:-8] for f in os.listdir(PARQUET_DIR) if f.endswith(".parquet")} | set(_DERIVED_TABLES)
+    names = tables if tables is not None else _TABLE_REF.findall(sql)
+    return sorted({t for t in names if t in available})
+
+
+def _derived(table):
+    """True if table is built in memory because the parquet set has no file for it."""
+    return table in _DERIVED_TABLES and not os.path.isfile(_parquet_path(table))
+
+
+def _grade_dim():
+    """grade_dim from the grades and seasons parquet, as build_aggregates.py builds it."""
+    grades = _read_parquet("grades", ["id", "season_id", "name", "grade_key", "season_key"])
+    seasons = _read_parquet("seasons", ["id", "name", "start_date"])
+    return build_grade_dim(grades, seasons)
+
+
+def _rating_tables():
+    """team_ratings and game_ratings rated from the games parquet, as ratings.update_ratings() stores them."""
+    games = _read_parquet("games", ["id", "grade_id", "home_team_id", "away_team_id",
+                                    "home_score", "away_score", "date", "time", "status"])
+    games["date"] = pd.to_datetime(games["date"], errors="coerce")
+    elo = ratings.compute_ratings(games)
+    grade_keys = _read_parquet("grades", ["id", "grade_key"]).set_index("id")["grade_key"]
+    team_keys = _read_parquet("teams", ["id", "team_key"]).set_index("id")["team_key"]
+    game_ratings = elo.game_ratings
+    game_ratings = game_ratings.assign(date=game_ratings["date"].dt.strftime("%Y-%m-%d"),
+                                       grade_key=game_ratings["grade_id"].map(grade_keys),
+                                       home_team_key=game_ratings["home_team_id"].map(team_keys),
+                                       away_team_key=game_ratings["away_team_id"].map(team_keys))
+    team_ratings = elo.team_ratings()
+    team_ratings = team_ratings.assign(grade_key=team_ratings["grade_id"].map(grade_keys),
+                                       team_key=team_ratings["team_id"].map(team_keys))
+    return {"team_ratings": team_ratings, "game_ratings": game_ratings}
+
+
+def _derived_frame(table):
+    """Rows of a derived table that is built in pandas rather than from its aggregate SQL."""
+    if table == "grade_dim":
+        return _grade_dim()
+    return _rating_tables()[table]
+
+
+def _referenced_columns(sql, table):
+    """Columns of table that sql can touch: all of them for SELECT *, else any
+    column whose name appears as a word in the SQL text."""
+    columns = _parquet_columns(table)
+    if _SELECT_STAR.search(sql):
+        return columns
+    words = {w.lower() for w in re.findall(r"\w+", sql)}
+    # COUNT(*) alone still needs one column to count rows
+    return [c for c in columns if c.lower() in words] or columns[:1]
+
+
+class _ResultCache:
+    """Bounded LRU cache of query results keyed on (normalized SQL, params).
+
+    Entries never expire on their own; the whole cache is dropped whenever the
+    data version changes.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync_version(self, version) -> bool:
+        """Clear the cache if the data version moved. Returns True if it did."""
+        with self._lock:
+            if version == self._version:
+                return False
+            changed = self._version is not None
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+            if changed:
+                self.invalidations += 1
+            return changed
+
+    def get(self, key):
+        with self._lock:
+            df = self._entries.get(key)
+            if df is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return df
+            self.misses += 1
+            return None
+
+    def put(self, key, df: pd.DataFrame) -> None:
+        with self._lock:
+            self._entries[key] = df
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'version': self._version[0] if self._version else None,
+            }
+
+
+_result_cache = _ResultCache(RESULT_CACHE_MAX_ENTRIES)
+_version_counter = 0
+_source_files = None
+_source_version = None
+# time.monotonic() of the last version check and source sync (None: check on next use)
+_version_checked_at = None
+_source_synced_at = None
+
+
+def bump_data_version():
+    """Force every cached query result to be recomputed on next use."""
+    global _version_counter, _source_synced_at
+    _version_counter += 1
+    _source_synced_at = None
+
+
+def get_data_version():
+    """Current data version (manifest version, or a file fingerprint if unstamped).
+
+    Pass it to st.cache_data functions so their entries follow the data.
+    Re-read from the files at most once per SOURCE_CHECK_SECONDS.
+    """
+    global _source_version, _version_checked_at
+    now = time.monotonic()
+    if _version_checked_at is None or now - _version_checked_at >= SOURCE_CHECK_SECONDS:
+        _source_version = data_manifest.source_version(DB_PATH if _USE_SQLITE else PARQUET_DIR)
+        _version_checked_at = now
+    return _source_version
+
+
+def _cache_key(sql, params):
+    return " ".join(sql.split()), tuple(params or ())
+
+
+def _log_query(sql, params):
+    line = json.dumps({"sql": sql, "params": list(params or [])}, default=str)
+    with _query_log_lock, open(QUERY_LOG, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _sync_source():
+    """Drop cached results and derived state if the data version changed since
+    the last sync, and reopen SQLite connections if the file was rewritten.
+    Does nothing within SOURCE_CHECK_SECONDS of the last sync."""
+    global _source_files, _source_synced_at
+    now = time.monotonic()
+    if _source_synced_at is not None and now - _source_synced_at < SOURCE_CHECK_SECONDS:
+        return
+    _source_synced_at = now
+    changed = _result_cache.sync_version((get_data_version(), _version_counter))
+    if changed:
+        _reset_source()
+        _get_name_index.clear()
+    if _USE_SQLITE:
+        # Immutable connections must not outlive the file they opened, even
+        # when the rewrite left the data (and so the cached results) unchanged
+        files = data_manifest.source_fingerprint(DB_PATH)
+        if not changed and _source_files is not None and files != _source_files:
+            close_all()
+        _source_files = files
+
+
+def q(sql, params=None, tables=None):
+    """Execute SQL, serving repeated (sql, params) pairs from the result cache.
+
+    Returns a shallow copy of the cached frame: callers can add, replace,
+    rename or drop columns and sort or filter freely, but must not write
+    values in place (.loc/.iloc assignment, inplace=True fillna), which
+    would change the cached rows. In parquet mode, tables optionally declares which tables the query reads
+    instead of parsing them from the SQL.
+    """
+    if QUERY_LOG:
+        _log_query(sql, params)
+    _sync_source()
+
+    key = _cache_key(sql, params)
+    df = _result_cache.get(key)
+    if df is None:
+        df = _execute(sql, params, tables)
+        _result_cache.put(key, df)
+    return df.copy(deep=False)
+
+
+def search_names(text, kinds=("player",), limit=20):
+    """Ranked name matches for a search box, tolerant of partial and misspelt names.
+
+    Args:
+        text (str): What the user typed
+        kinds (tuple): Any of 'player', 'team', 'organisation'
+        limit (int): Maximum number of matches
+
+    Returns:
+        pd.DataFrame: kind, id and name per match, best first (a shallow
+        copy of the cached frame, as from q())
+    """
+    _sync_source()
+    key = ("search_names", " ".join(text.lower().split()), tuple(kinds), limit)
+    df = _result_cache.get(key)
+    if df is None:
+        rows = _search(text, tuple(kinds), limit)
+        df = pd.DataFrame(rows, columns=["kind", "id", "name"])
+        _result_cache.put(key, df)
+    return df.copy(deep=False)
 
 
 @st.cache_resource
-def _get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+def _get_name_index():
+    """In-memory name_search index over the current source's names."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    for table, columns in (("players", "id, first_name, last_name"),
+                           ("teams", "id, name"), ("organisations", "id, name")):
+        _execute(f"SELECT {columns} FROM {table}").to_sql(table, conn, index=False)
+    name_search.build(conn)
+    return {"conn": conn, "lock": threading.Lock()}
 
 
-@st.cache_data(ttl=3600)
-def _load_parquet(table: str) -> pd.DataFrame:
-    return pd.read_parquet(os.path.join(PARQUET_DIR, f"{table}.parquet"))
+def _search_memory(text, kinds, limit):
+    index = _get_name_index()
+    with index["lock"]:
+        return name_search.search(index["conn"], text, kinds, limit)
 
 
-def _all_tables():
-    """Load all tables into a dict for in-memory querying."""
-    tables = {}
-    for f in os.listdir(PARQUET_DIR):
-        if f.endswith(".parquet"):
-            name = f[:-8]
-            tables[name] = _load_parquet(name)
-    return tables
+def get_cache_stats():
+    """Result cache hit/miss/eviction counters."""
+    return _result_cache.stats()
 
 
 if _USE_SQLITE:
-    def q(sql, params=None):
-        """Execute SQL against SQLite."""
-        return pd.read_sql_query(sql, _get_conn(), params=params or [])
+    def _execute(sql, params=None, tables=None):
+        """Execute SQL against SQLite using a pooled read-only connection."""
+        with get_pool(DB_PATH).connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params or [])
+
+    def _reset_source():
+        # Pooled connections are immutable and would keep reading the old file
+        close_all()
+
+    def _search(text, kinds, limit):
+        """Search the on-disk name_search table (built by build_aggregates.py)."""
+        with get_pool(DB_PATH).connection() as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'name_search'").fetchone():
+                return name_search.search(conn, text, kinds, limit)
+        return _search_memory(text, kinds, limit)
 
     def get_data_source():
         return "SQLite"
+
+    def get_pool_stats():
+        """Connection pool size and wait-time metrics."""
+        return get_pool(DB_PATH).stats()
+
+    def get_loaded_tables():
+        """Everything is on disk in SQLite mode."""
+        return {}
+elif _USE_DUCKDB:
+    # Parquet mode on DuckDB: each table is a view over its parquet file, so
+    # queries scan only the columns and row groups they need.
+    _SCALAR_MAX = re.compile(r"\bMAX\(((?:[^(),]|\([^()]*\))+),((?:[^(),]|\([^()]*\))+)\)", re.IGNORECASE)
+    _LIKE = re.compile(r"\bLIKE\b", re.IGNORECASE)
+    _FLOAT = re.compile(r"\bAS\s+FLOAT\b", re.IGNORECASE)
+    _duckdb_local = threading.local()
+
+    def _to_duckdb_sql(sql):
+        """Translate the SQLite-isms used by the dashboard to DuckDB."""
+        # Two-argument MAX() is a scalar in SQLite but a top-N aggregate in DuckDB
+        sql = _SCALAR_MAX.sub(r"GREATEST(\1,\2)", sql)
+        # SQLite FLOAT is a double; DuckDB's is single precision
+        sql = _FLOAT.sub("AS DOUBLE", sql)
+        # SQLite LIKE is case-insensitive
+        return _LIKE.sub("ILIKE", sql)
+
+    @st.cache_resource
+    def _get_duckdb_db():
+        return {"conn": duckdb.connect(":memory:"), "views": set(), "lock": threading.Lock()}
+
+    def _create_table(conn, table, df):
+        # A table rather than a registered frame, which only this cursor could see
+        conn.register("_rows", df)
+        conn.execute(f"CREATE OR REPLACE TABLE \"{table}\" AS SELECT * FROM _rows")
+        conn.unregister("_rows")
+
+    def _register(db, table):
+        """Make table queryable (caller holds the lock): a view over its parquet
+        file, or a table when its rows need keys derived or it is built here."""
+        if table in db["views"]:
+            return
+        conn = db["conn"]
+        if _derived(table):
+            if table not in _AGGREGATE_SQL:
+                _create_table(conn, table, _derived_frame(table))
+            else:
+                select_sql = _AGGREGATE_SQL[table]
+                for source in _referenced_tables(select_sql):
+                    _register(db, source)
+                conn.execute(f"CREATE OR REPLACE TABLE \"{table}\" AS {_to_duckdb_sql(select_sql)}")
+                for column, column_type, *_ in conn.execute(f"DESCRIBE \"{table}\"").fetchall():
+                    if column_type == "HUGEINT":  # SUM() of integers, which pandas would get as floats
+                        conn.execute(f"ALTER TABLE \"{table}\" ALTER \"{column}\" TYPE BIGINT")
+        elif surrogate_keys.missing_keys(table, _stored_columns(table)):
+            # Exported before the surrogate keys: load the rows with keys derived
+            _create_table(conn, table, _read_parquet(table))
+        else:
+            path = _parquet_path(table).replace("\\", "/")
+            conn.execute(f"CREATE OR REPLACE VIEW \"{table}\" AS SELECT * FROM read_parquet('{path}')")
+        db["views"].add(table)
+
+    def _duckdb_cursor(tables):
+        """Per-thread cursor on the shared DuckDB database, with each
+        referenced table registered on first use."""
+        db = _get_duckdb_db()
+        missing = [t for t in tables if t not in db["views"]]
+        if missing:
+            with db["lock"]:
+                for table in missing:
+                    _register(db, table)
+        if getattr(_duckdb_local, "conn", None) is not db["conn"]:
+            _duckdb_local.conn = db["conn"]
+            _duckdb_local.cursor = db["conn"].cursor()
+        return _duckdb_local.cursor
+
+    def _execute(sql, params=None, tables=None):
+        """Execute SQL with DuckDB directly over the parquet files."""
+        cursor = _duckdb_cursor(_referenced_tables(sql, tables))
+        return cursor.execute(_to_duckdb_sql(sql), list(params or [])).df()
+
+    def _reset_source():
+        _get_duckdb_db.clear()
+
+    _search = _search_memory
+
+    def get_data_source():
+        return "Parquet (DuckDB)"
+
+    def get_pool_stats():
+        """No connection pool in parquet mode."""
+        return {}
+
+    def get_loaded_tables():
+        """Tables registered so far (DuckDB projects columns per scan)."""
+        return {t: None for t in sorted(_get_duckdb_db()["views"])}
 else:
-    # Parquet mode: load all tables into an in-memory SQLite for SQL compat
+    # Parquet mode: copy referenced tables into an in-memory SQLite for SQL
+    # compat, reading only the columns queries have used so far
     @st.cache_resource
-    def _get_memory_conn():
-        conn = sqlite3.connect(":memory:", check_same_thread=False)
-        tables = _all_tables()
-        for name, df in tables.items():
-            df.to_sql(name, conn, index=False, if_exists="replace")
-        return conn
+    def _get_memory_db():
+        return {"conn": sqlite3.connect(":memory:", check_same_thread=False),
+                "columns": {}, "lock": threading.Lock()}
+
+    def _build_derived(db, table):
+        if table not in _AGGREGATE_SQL:
+            _derived_frame(table).to_sql(table, db["conn"], index=False)
+        else:
+            select_sql = _AGGREGATE_SQL[table]
+            _materialize(db, select_sql, None)
+            db["conn"].execute(f"CREATE TABLE [{table}] AS {select_sql}")
+        db["columns"][table] = {r[1] for r in db["conn"].execute(f"PRAGMA table_info([{table}])")}
+
+    def _materialize(db, sql, tables):
+        for table in _referenced_tables(sql, tables):
+            if _derived(table):
+                if table not in db["columns"]:
+                    _build_derived(db, table)
+                continue
+            loaded = db["columns"].get(table, set())
+            needed = set(_referenced_columns(sql, table))
+            if needed <= loaded:
+                continue
+            columns = [c for c in _parquet_columns(table) if c in loaded | needed]
+            df = _read_parquet(table, columns)
+            df.to_sql(table, db["conn"], index=False, if_exists="replace")
+            db["columns"][table] = set(columns)
 
-    def q(sql, params=None):
-        """Execute SQL against in-memory SQLite loaded from parquet."""
-        return pd.read_sql_query(sql, _get_memory_conn(), params=params or [])
+    def _execute(sql, params=None, tables=None):
+        """Execute SQL against in-memory SQLite loaded lazily from parquet."""
+        db = _get_memory_db()
+        with db["lock"]:
+            _materialize(db, sql, tables)
+            return pd.read_sql_query(sql, db["conn"], params=params or [])
+
+    def _reset_source():
+        _get_memory_db.clear()
+
+    _search = _search_memory
 
     def get_data_source():
         return "Parquet"
+
+    def get_pool_stats():
+        """No connection pool in parquet mode."""
+        return {}
+
+    def get_loaded_tables():
+        """Columns materialized so far, per table."""
+        return {t: sorted(cols) for t, cols in sorted(_get_memory_db()["columns"].items())}
+
+
+def _benchmark_engine():
+    """Cold-start this process on the configured engine and print timings as JSON."""
+    start = time.perf_counter()
+    _execute("SELECT COUNT(*) AS n FROM organisations")
+    startup = time.perf_counter() - start
+    start = time.perf_counter()
+    _execute("SELECT t.name, s.name AS season FROM teams t JOIN seasons s ON t.season_id = s.id "
+             "WHERE t.name LIKE ? ORDER BY s.start_date DESC LIMIT 50", ["%u12%"])
+    query = time.perf_counter() - start
+    try:
+        import resource
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss_mb = rss_kb / 1024 if sys.platform != "darwin" else rss_kb / (1024 * 1024)
+    except ImportError:  # Windows
+        peak_rss_mb = None
+    print(json.dumps({
+        'source': get_data_source(),
+        'startup_s': round(startup, 3),
+        'query_ms': round(query * 1000, 2),
+        'peak_rss_mb': round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+    }))
+
+
+if __name__ == "__main__":
+    # python db.py                -> compare parquet-mode engines, each in a fresh process
+    # python db.py --bench-engine -> report for the engine selected by the environment
+    if "--bench-engine" in sys.argv:
+        _benchmark_engine()
+    else:
+        import subprocess
+        print(f"{'Engine':<20} {'Startup (s)':>12} {'Query (ms)':>12} {'Peak RSS (MB)':>14}")
+        for engine in ["sqlite", "duckdb"]:
+            env = {**os.environ, "FCV_DATA_SOURCE": "parquet", "FCV_QUERY_ENGINE": engine}
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--bench-engine"],
+                                 env=env, capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{engine:<20} failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{r['source']:<20} {r['startup_s']:>12} {r['query_ms']:>12} {str(r['peak_rss_mb']):>14}")
@@ -1,8 +1,30 @@
-"""Export playhq.db tables to compressed parquet files for Streamlit Cloud deployment."""
+"""Export playhq.db tables to compressed parquet files for Streamlit Cloud deployment.
+
+Files are zstd-compressed with dictionary-encoded text/UUID columns and rows
+sorted on each table's lookup keys, so row-group min/max statistics let readers
+(DuckDB, pyarrow filters) skip row groups. Rows are written in a deterministic
+order so re-exporting an unchanged database gives the same data.
+data/parquet/data_version.json is written last with the exported tables'
+row counts and content hashes, so the app's caches refresh only when the
+exported data actually changed.
+
+    python export_data.py            # rebuild aggregates, export all tables
+    python export_data.py --compare  # also report size/read time vs the old gzip layout
+"""
 
 import os
+import sys
 import sqlite3
+import tempfile
+import time
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import build_aggregates
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis"))
+import data_manifest
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "playhq.db")
 OUT_DIR = os.path.join(os.path.dirname(__file__), "data", "parquet")
@@ -10,23 +32,117 @@ OUT_DIR = os.path.join(os.path.dirname(__file__), "data", "parquet")
 TABLES = [
     "organisations", "competitions", "seasons", "grades", "teams",
     "players", "player_stats", "games", "rounds",
+    # Materialized by build_aggregates.py
+    "grade_dim", "player_career", "player_season", "team_record", "grade_standings", "player_age_group",
+    "team_ratings", "game_ratings",
 ]
 
-def export():
+# Row order per table: the columns pages filter/join on come first
+SORT_KEYS = {
+    "competitions": ["organisation_id", "id"],
+    "seasons": ["competition_id", "id"],
+    "grades": ["season_key", "grade_key"],
+    "teams": ["season_key", "team_key"],
+    "player_stats": ["player_id", "grade_id"],
+    "games": ["grade_key", "date", "id"],
+    "rounds": ["grade_key", "number", "id"],
+    "grade_dim": ["season_key", "grade_key"],
+    "player_career": ["player_key"],
+    "player_season": ["player_key", "start_date", "season_key"],
+    "team_record": ["team_key"],
+    "grade_standings": ["grade_key", "PTS DESC", "PD DESC", "team_key"],
+    "player_age_group": ["age_group", "player_key"],
+    "team_ratings": ["grade_key", "rating DESC", "team_key"],
+    "game_ratings": ["grade_key", "date", "game_id"],
+}
+
+ROW_GROUP_SIZE = 32_768
+COMPRESSION = "zstd"
+
+
+def _read_table(conn, table):
+    keys = SORT_KEYS.get(table, ["id"])
+    # Keys may carry a direction, e.g. "PTS DESC"
+    order = ", ".join(f"[{col}] {direction}".rstrip()
+                      for col, _, direction in (k.partition(" ") for k in keys))
+    return pd.read_sql_query(f"SELECT * FROM [{table}] ORDER BY {order}", conn)
+
+
+def write_parquet(df: pd.DataFrame, path: str) -> None:
+    """Write df with the deployment layout (zstd, dictionary text, row-group stats)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    text_cols = [f.name for f in table.schema if pa.types.is_string(f.type)]
+    pq.write_table(
+        table, path,
+        compression=COMPRESSION,
+        use_dictionary=text_cols,
+        write_statistics=True,
+        row_group_size=ROW_GROUP_SIZE,
+    )
+
+
+def _size_mb(path):
+    return os.path.getsize(path) / (1024 * 1024)
+
+
+def _read_time(path, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pd.read_parquet(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def export(compare: bool = False):
+    digests = build_aggregates.build(DB_PATH)["tables"]
     os.makedirs(OUT_DIR, exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
+    report = []
+    tmp_dir = tempfile.mkdtemp() if compare else None
 
     for table in TABLES:
         print(f"Exporting {table}...", end=" ")
-        df = pd.read_sql_query(f"SELECT * FROM [{table}]", conn)
+        df = _read_table(conn, table)
         path = os.path.join(OUT_DIR, f"{table}.parquet")
-        df.to_parquet(path, engine="pyarrow", compression="gzip", index=False)
-        size_mb = os.path.getsize(path) / (1024 * 1024)
-        print(f"{len(df):,} rows -> {size_mb:.2f} MB")
+        write_parquet(df, path)
+        print(f"{len(df):,} rows -> {_size_mb(path):.2f} MB")
+
+        if compare:
+            # Previous layout: unsorted, gzip, pyarrow defaults
+            old_path = os.path.join(tmp_dir, f"{table}.parquet")
+            old_df = pd.read_sql_query(f"SELECT * FROM [{table}]", conn)
+            old_df.to_parquet(old_path, engine="pyarrow", compression="gzip", index=False)
+            report.append({
+                "table": table,
+                "gzip_mb": _size_mb(old_path), "zstd_mb": _size_mb(path),
+                "gzip_read_ms": _read_time(old_path) * 1000, "zstd_read_ms": _read_time(path) * 1000,
+            })
+            os.remove(old_path)
 
     conn.close()
-    total = sum(os.path.getsize(os.path.join(OUT_DIR, f)) for f in os.listdir(OUT_DIR))
-    print(f"\nTotal parquet size: {total / (1024*1024):.2f} MB")
+    missing = [t for t in TABLES if not os.path.isfile(os.path.join(OUT_DIR, f"{t}.parquet"))]
+    if missing:
+        raise RuntimeError(f"Parquet export incomplete, missing: {', '.join(missing)}")
+
+    # The parquet files hold the same rows as the tables just hashed, so reuse their digests
+    manifest = data_manifest.build_manifest({t: digests[t] for t in TABLES}, "export_data.py")
+    data_manifest.write_manifest(OUT_DIR, manifest)
+
+    total = sum(os.path.getsize(os.path.join(OUT_DIR, f)) for f in os.listdir(OUT_DIR) if f.endswith(".parquet"))
+    print(f"\nTotal parquet size: {total / (1024*1024):.2f} MB (data version {manifest['version']})")
+
+    if compare:
+        os.rmdir(tmp_dir)
+        print(f"\n{'Table':<15} {'gzip MB':>9} {'zstd MB':>9} {'gzip read ms':>13} {'zstd read ms':>13}")
+        for r in report:
+            print(f"{r['table']:<15} {r['gzip_mb']:>9.2f} {r['zstd_mb']:>9.2f} "
+                  f"{r['gzip_read_ms']:>13.1f} {r['zstd_read_ms']:>13.1f}")
+        print(f"{'TOTAL':<15} {sum(r['gzip_mb'] for r in report):>9.2f} "
+              f"{sum(r['zstd_mb'] for r in report):>9.2f} "
+              f"{sum(r['gzip_read_ms'] for r in report):>13.1f} "
+              f"{sum(r['zstd_read_ms'] for r in report):>13.1f}")
+
 
 if __name__ == "__main__":
-    export()
+    export(compare="--compare" in sys.argv)
@@ -0,0 +1,145 @@
+"""Index advisor for the dashboard's SQLite query workload.
+
+Replays the queries db.q() logged (run the app with FCV_QUERY_LOG=path),
+prints each one's EXPLAIN QUERY PLAN full scans, and applies INDEXES — the
+indexes that workload needs on top of the scraper's schema — as a repeatable
+migration. build_aggregates.py applies the migration after every rebuild.
+
+    FCV_QUERY_LOG=data/query_log.jsonl streamlit run streamlit_app.py
+    python index_advisor.py                   # report scans in the logged workload
+    python index_advisor.py --apply           # create missing indexes, report again
+    python index_advisor.py other_log.jsonl --apply
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "playhq.db")
+LOG_PATH = os.path.join(os.path.dirname(__file__), "data", "query_log.jsonl")
+
+# name -> (table, indexed columns). CREATE INDEX IF NOT EXISTS, so safe to re-run.
+INDEXES = {
+    # Grade Browser fixtures/standings and grade-level game scans
+    "idx_games_grade_status": ("games", "grade_id, status"),
+    # Team Search results: WHERE home_team_id = ? OR away_team_id = ? (multi-index OR)
+    "idx_games_home_team": ("games", "home_team_id, status"),
+    "idx_games_away_team": ("games", "away_team_id, status"),
+    # Team lists per season and team-name joins from player_stats.team_name
+    "idx_teams_season_name": ("teams", "season_id, name"),
+    "idx_teams_name": ("teams", "name"),
+    "idx_player_stats_team_name": ("player_stats", "team_name"),
+    # ORDER BY on the season/organisation pickers
+    "idx_seasons_start_date": ("seasons", "start_date"),
+    "idx_organisations_name": ("organisations", "name"),
+}
+
+_TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+[\[\"]?(\w+)[\]\"]?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIAS = {"WHERE", "JOIN", "LEFT", "INNER", "CROSS", "ON", "GROUP", "ORDER",
+              "LIMIT", "UNION", "HAVING", "USING", "NATURAL"}
+_SCAN = re.compile(r"^SCAN (\w+)")
+_CONTAINS_LIKE = re.compile(r"\bLIKE\s+\?", re.IGNORECASE)
+
+
+def load_workload(log_path=LOG_PATH):
+    """Distinct (sql, params) pairs from a db.q() query log, in first-seen order."""
+    seen = {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                seen.setdefault(" ".join(entry["sql"].split()), entry)
+    return [(e["sql"], e["params"]) for e in seen.values()]
+
+
+def explain(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN detail lines for sql."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", list(params))]
+
+
+def _aliases(sql, tables):
+    """Map each alias (and bare name) in sql to the real table it refers to."""
+    aliases = {}
+    for table, alias in _TABLE_ALIAS.findall(sql):
+        if table in tables:
+            aliases[table] = table
+            if alias and alias.upper() not in _NOT_ALIAS:
+                aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql, params=()):
+    """Base tables the plan reads row by row with no index at all.
+
+    Scans that walk an index (to satisfy ORDER BY/GROUP BY, or a covering
+    index for COUNT(*)) are not flagged.
+
+    Returns:
+        list: (table, plan detail) pairs
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    aliases = _aliases(sql, tables)
+    scans = []
+    for detail in explain(conn, sql, params):
+        m = _SCAN.match(detail)
+        if m and m.group(1) in aliases and "USING" not in detail:
+            scans.append((aliases[m.group(1)], detail))
+    return scans
+
+
+def apply_indexes(conn):
+    """Create any missing INDEXES and refresh planner statistics.
+
+    Returns:
+        list: Names of the indexes that were created
+    """
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    created = []
+    for name, (table, columns) in INDEXES.items():
+        if table not in tables:
+            continue
+        conn.execute(f"CREATE INDEX IF NOT EXISTS [{name}] ON [{table}] ({columns})")
+        if name not in existing:
+            created.append(name)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return created
+
+
+def _report(conn, workload):
+    flagged = 0
+    for sql, params in workload:
+        scans = full_scans(conn, sql, params)
+        if not scans:
+            continue
+        flagged += 1
+        print(f"\n{' '.join(sql.split())[:120]}")
+        for table, detail in scans:
+            print(f"    {detail}  [{table}]")
+        if _CONTAINS_LIKE.search(sql):
+            print("    (LIKE with a bound pattern: a leading-% search cannot use a b-tree index)")
+    print(f"\n{flagged} of {len(workload)} distinct queries do a full scan")
+
+
+def advise(db_path=DB_PATH, log_path=LOG_PATH, apply=False):
+    """Report full scans in the logged workload, optionally applying the migration first."""
+    workload = load_workload(log_path) if os.path.isfile(log_path) else []
+    conn = sqlite3.connect(db_path)
+    try:
+        if apply:
+            created = apply_indexes(conn)
+            print(f"Created {len(created)} index(es): {', '.join(created) or '-'}")
+        if workload:
+            _report(conn, workload)
+        else:
+            print(f"No query log at {log_path}; run the app with FCV_QUERY_LOG={log_path}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    advise(log_path=args[0] if args else LOG_PATH, apply="--apply" in sys.argv)
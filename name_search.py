@@ -0,0 +1,300 @@
+"""Trigram full-text search over player, team and organisation names.
+
+build() creates the name_search FTS5 table (tokenize='trigram') over
+name_search_entries, a copy of the player, team and organisation names on a
+connection; search() ranks matches for a typed name. build_aggregates.py builds the table into
+playhq.db; db.search_names() builds it in memory when the table is absent
+(parquet mode).
+
+    python name_search.py     # p50/p95 search latency against data/playhq.db
+"""
+
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "playhq.db")
+
+KINDS = ("player", "team", "organisation")
+
+_SOURCES = {
+    "player": "SELECT 'player', id, first_name || ' ' || last_name FROM players",
+    "team": "SELECT 'team', id, name FROM teams",
+    "organisation": "SELECT 'organisation', id, name FROM organisations",
+}
+
+# Share of the query's trigrams a name must contain to count as a typo match
+MIN_TRIGRAM_OVERLAP = 0.5
+# A typo match may be one edit (insert, delete, substitute, swap adjacent
+# letters) from the query per this many characters, and at least one
+CHARS_PER_TYPO = 6
+# Most names scored for edit distance per typo search
+TYPO_CANDIDATES = 20
+# Typo lookups skip trigrams in more names than this, bar the query's rarest:
+# each would read thousands of rows that its rarer trigrams mostly find anyway
+TYPO_COMMON_DOCS = 200
+# Most index rows a typo lookup reads, rarest trigram first
+TYPO_SCAN_ROWS = 300
+
+
+def build(conn):
+    """(Re)create name_search from the source tables on conn."""
+    for table in ("name_search_vocab", "name_search", "name_search_entries"):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    # Names live in a plain table (cheaper to read back than FTS content);
+    # the NOCASE index serves prefix LIKE for queries too short for trigrams
+    conn.execute("CREATE TABLE name_search_entries ("
+                 "id INTEGER PRIMARY KEY, kind TEXT, entity_id TEXT, name TEXT COLLATE NOCASE)")
+    for sql in _SOURCES.values():
+        conn.execute(f"INSERT INTO name_search_entries (kind, entity_id, name) {sql}")
+    conn.execute("CREATE INDEX idx_name_search_entries_name ON name_search_entries (name)")
+    conn.execute("CREATE VIRTUAL TABLE name_search USING fts5(name, content = 'name_search_entries', "
+                 "content_rowid = 'id', tokenize = 'trigram')")
+    conn.execute("INSERT INTO name_search (name_search) VALUES ('rebuild')")
+    # Per-trigram document counts, used to pick the most selective trigrams
+    conn.execute("CREATE VIRTUAL TABLE name_search_vocab USING fts5vocab(name_search, 'row')")
+    conn.commit()
+
+
+def _trigrams(text):
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _typo_variants(text):
+    """text with two adjacent letters swapped, and (from 5 characters) with one letter dropped.
+
+    A swap breaks most of a short query's trigrams, so these are looked up
+    as substrings instead; each is at least 3 characters, for the index.
+
+    Returns:
+        tuple: (swaps, drops), each a list of (variant, trigrams of text it keeps)
+    """
+    grams = [text[i:i + 3] for i in range(len(text) - 2)]
+    swaps = [(text[:i] + text[i + 1] + text[i] + text[i + 2:], grams[:max(i - 2, 0)] + grams[i + 2:])
+             for i in range(len(text) - 1)]
+    drops = [(text[:i] + text[i + 1:], grams[:max(i - 2, 0)] + grams[i + 1:])
+             for i in range(len(text))] if len(text) >= 5 else []
+    seen = {text}
+    variants = ([], [])
+    for distinct, found in zip(variants, (swaps, drops)):
+        for variant, kept in found:
+            if variant not in seen and len(variant.strip()) >= 3:
+                seen.add(variant)
+                distinct.append((variant, kept))
+    return variants
+
+
+def _typo_distance(text, name, bound=None):
+    """Fewest edits (insert, delete, substitute, swap adjacent letters) turning text into part of name.
+
+    With a bound, anything over it is returned as bound + 1, and only the
+    cells that can still be within it are computed.
+    """
+    n = len(text)
+    cap = n if bound is None else min(n, bound + 1)
+    # Row i holds the distances of text[:j] to the best substring ending at name[i - 1]
+    before, prev = None, [min(j, cap) for j in range(n + 1)]
+    # Deepest j whose distance in the last row is under cap; cells past it are at cap
+    last = cap - 1 if cap < n else n
+    best = prev[n]
+    for i, c in enumerate(name):
+        row = [cap] * (n + 1)
+        row[0] = 0
+        stop = min(n, last + 1)
+        for j in range(1, stop + 1):
+            d = prev[j - 1] + (c != text[j - 1])
+            if prev[j] + 1 < d:
+                d = prev[j] + 1
+            if row[j - 1] + 1 < d:
+                d = row[j - 1] + 1
+            if before is not None and j > 1 and c == text[j - 2] and name[i - 1] == text[j - 1] \
+                    and before[j - 2] + 1 < d:
+                d = before[j - 2] + 1
+            row[j] = d if d < cap else cap
+        last = stop
+        while last and row[last] >= cap:
+            last -= 1
+        if row[n] < best:
+            best = row[n]
+        before, prev = prev, row
+    return best
+
+
+def _ranked_matches(conn, text, grams, match, kinds, min_shared, limit):
+    """Entries matching the FTS query that contain text or min_shared of its grams, best first."""
+    shared = " + ".join("(instr(lname, ?) > 0)" for _ in grams)
+    return conn.execute(f"""
+        SELECT kind, entity_id, name FROM (
+            SELECT kind, entity_id, name, lname, instr(lname, ?) AS pos, {shared} AS shared
+            FROM (SELECT kind, entity_id, name, lower(name) AS lname
+                  FROM name_search_entries
+                  WHERE id IN (SELECT rowid FROM name_search WHERE name_search MATCH ?) AND kind IN ({', '.join('?' * len(kinds))}))
+        )
+        WHERE pos > 0 OR shared >= ?
+        ORDER BY CASE WHEN pos = 1 THEN 0
+                      WHEN pos > 1 AND substr(lname, pos - 1, 1) = ' ' THEN 1
+                      WHEN pos > 1 THEN 2 ELSE 3 END,
+                 shared DESC, length(name), name
+        LIMIT ?
+    """, [text, *grams, match, *kinds, min_shared, limit]).fetchall()
+
+
+def _typo_candidates(conn, grams, variants, terms, kinds, min_shared):
+    """Entries matching any FTS term that contain a variant or min_shared of grams, likeliest first.
+
+    Terms are read in order until TYPO_SCAN_ROWS rows, so the rarest go first.
+
+    Returns:
+        list: (kind, entity_id, name, lowercased name, grams shared, contains a variant)
+    """
+    lookups = " UNION ALL ".join("SELECT rowid FROM name_search WHERE name_search MATCH ?" for _ in terms)
+    rows = conn.execute(f"""
+        SELECT kind, entity_id, name FROM name_search_entries
+        WHERE id IN (SELECT rowid FROM ({lookups}) LIMIT ?) AND kind IN ({', '.join('?' * len(kinds))})
+    """, [*terms, TYPO_SCAN_ROWS, *kinds]).fetchall()
+    # Scored here rather than with instr() in SQL, which costs several times more per row
+    candidates = []
+    for kind, entity_id, name in rows:
+        lname = name.lower()
+        shared = sum(map(lname.__contains__, grams))
+        near = any(map(lname.__contains__, variants))
+        if near or shared >= min_shared:
+            candidates.append((kind, entity_id, name, lname, shared, near))
+    candidates.sort(key=lambda c: (not c[5], -c[4], len(c[2])))
+    return candidates[:TYPO_CANDIDATES]
+
+
+def _typo_matches(conn, text, grams, kinds, limit):
+    """Names within the allowed edits of text, or sharing MIN_TRIGRAM_OVERLAP of its grams."""
+    min_shared = math.ceil(len(grams) * MIN_TRIGRAM_OVERLAP)
+    max_edits = max(1, len(text) // CHARS_PER_TYPO)
+    counts = dict(conn.execute(
+        f"SELECT term, doc FROM name_search_vocab WHERE term IN ({', '.join('?' * len(grams))})",
+        grams).fetchall())
+    # Each edit breaks at most 4 of text's trigrams (a swap), so a name within
+    # max_edits holds one of the rarest 4 * max_edits + 1, and a name sharing
+    # min_shared one of the rarest len - min_shared + 1. Common ones other than
+    # the rarest are left out.
+    rarest = sorted(counts, key=counts.get)[:max(4 * max_edits + 1, len(grams) - min_shared + 1)]
+    rare = rarest[:1] + [g for g in rarest[1:] if counts[g] <= TYPO_COMMON_DOCS]
+
+    # A swap or drop is only looked up as a substring when every trigram of
+    # text it keeps is common (short queries); otherwise one of those finds it
+    variants = _typo_variants(text)
+    swaps, drops = ([variant for variant, kept in found if not set(kept) & set(rare)] for found in variants)
+    every_variant = [variant for found in variants for variant, _ in found]
+    # Fewer shared trigrams than this means more than max_edits edits
+    min_near_shared = len(grams) - 4 * max_edits
+
+    def scored(variants, terms):
+        matches = []
+        for kind, entity_id, name, lname, n_shared, near in _typo_candidates(
+                conn, grams, variants, [_quote(t) for t in terms], kinds,
+                max(1, min(min_shared, min_near_shared))):
+            # Nothing contains text itself, so holding a swap or drop of it is exactly one edit
+            if near or any(map(lname.__contains__, every_variant)):
+                edits = 1
+            elif n_shared >= min_near_shared:
+                # Past max_edits only the shared trigrams rank a name, so the distance is capped
+                edits = _typo_distance(text, lname, max_edits)
+            else:
+                edits = max_edits + 1
+            if edits <= max_edits or n_shared >= min_shared:
+                matches.append((edits, -n_shared, len(name), name, kind, entity_id))
+        return matches
+
+    matches = scored(swaps, swaps + rare) if swaps or rare else []
+    # Dropped letters are looked up only when nothing so far is within max_edits
+    if drops and not any(m[0] <= max_edits for m in matches):
+        matches += scored(drops, drops)
+    # Both lookups can find a name; keep its best ranking
+    best = {}
+    for match in sorted(matches):
+        best.setdefault(match[4:], match)
+    return [(kind, entity_id, name) for _, _, _, name, kind, entity_id in list(best.values())[:limit]]
+
+
+def search(conn, text, kinds=KINDS, limit=20):
+    """Ranked name matches for text.
+
+    Names containing a 3+ character query are found through the trigram
+    index and ranked prefix hits first, then word-prefix hits, then other
+    substring hits, shorter names first. If nothing contains the query it
+    is treated as misspelt. Candidates are read through the query's rarest
+    trigrams, skipping those in more than TYPO_COMMON_DOCS names and at most
+    TYPO_SCAN_ROWS rows, plus names containing the query with two adjacent
+    letters swapped where no looked-up trigram would find them. Names with
+    a letter of the query dropped are only looked up if that finds nothing
+    close enough. Candidates are ranked by edit distance to the closest
+    part of the name, then trigrams shared.
+    Those more than one edit per CHARS_PER_TYPO characters away are dropped
+    unless they pass the overlap. Shorter queries fall back to a prefix
+    match.
+
+    Args:
+        conn: Connection holding the name_search table
+        text (str): Partial or misspelt name
+        kinds (tuple): Entity kinds to return (see KINDS)
+        limit (int): Maximum number of matches
+
+    Returns:
+        list: (kind, entity_id, name) tuples, best match first
+    """
+    text = " ".join(text.lower().split())
+    if not text:
+        return []
+
+    # Prefix hits rank first and come straight off the NOCASE index, so if
+    # there are enough of them the trigram lookup can be skipped
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    prefix_hits = conn.execute(
+        f"SELECT kind, entity_id, name FROM name_search_entries "
+        f"WHERE name LIKE ? ESCAPE '\\' AND kind IN ({', '.join('?' * len(kinds))}) ORDER BY length(name), name LIMIT ?",
+        [f"{escaped}%", *kinds, limit]).fetchall()
+    if len(text) < 3 or len(prefix_hits) == limit:
+        return prefix_hits
+
+    # Names containing the text; typo matches are only looked for without any
+    grams = _trigrams(text)
+    hits = _ranked_matches(conn, text, grams, _quote(text), kinds, len(grams), limit)
+    if hits:
+        return hits
+
+    return _typo_matches(conn, text, grams, kinds, limit)
+
+
+def benchmark(db_path=DB_PATH, n=500, seed=0):
+    """Time search() on substrings and one-letter typos of real player names."""
+    conn = sqlite3.connect(db_path)
+    names = [r[0] for r in conn.execute("SELECT name FROM name_search_entries WHERE kind = 'player'")]
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        name = rng.choice(names).lower()
+        start = rng.randrange(max(len(name) - 4, 1))
+        query = name[start:start + rng.randint(3, 10)]
+        if len(query) > 4 and rng.random() < 0.3:
+            i = rng.randrange(1, len(query) - 1)
+            query = query[:i] + query[i + 1] + query[i] + query[i + 2:]
+        queries.append(query)
+
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        search(conn, query, kinds=("player",))
+        times.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    times.sort()
+    print(f"{n} searches over {len(names):,} player names: "
+          f"p50 {times[n // 2]:.2f} ms, p95 {times[int(n * 0.95)]:.2f} ms, max {times[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
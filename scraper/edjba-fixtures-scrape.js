@@ -148,7 +148,7 @@ async function main() {
     console.log(`  Games with scores: ${gamesWithScores}`);
 
   } finally {
-    database.close();
+    db.closeDb(database);
   }
 }
 
@@ -275,7 +275,7 @@ async function main() {
     console.log(`  Organisations: ${stats.organisations}`);
 
   } finally {
-    database.close();
+    db.closeDb(database);
   }
 }
 
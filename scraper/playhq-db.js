@@ -1,7 +1,10 @@
 const Database = require('better-sqlite3');
+const crypto = require('crypto');
+const fs = require('fs');
 const path = require('path');
 
 const DB_PATH = path.join(__dirname, '..', 'data', 'playhq.db');
+const DATA_VERSION_PATH = path.join(path.dirname(DB_PATH), 'data_version.json');
 
 function getDb() {
   const db = new Database(DB_PATH);
@@ -209,6 +212,56 @@ function logScrape(db, entityType, entityId, success = true, error = null) {
     .run(entityType, entityId, success ? 1 : 0, error);
 }
 
+// Data version manifest (same format and hashing as analysis/data_manifest.py)
+const EXCLUDED_TABLES = new Set(['scrape_log']);
+const FTS_SHADOW_SUFFIXES = ['_data', '_idx', '_content', '_docsize', '_config'];
+
+function canonicalValue(value) {
+  return Buffer.isBuffer(value) ? value.toString('hex') : value;
+}
+
+function hashedTables(db) {
+  const rows = db.prepare(`SELECT name, sql FROM sqlite_master WHERE type = 'table'
+    AND name NOT LIKE 'sqlite_%' ORDER BY name`).all();
+  const virtual = new Set(rows.filter(r => (r.sql || '').toUpperCase().startsWith('CREATE VIRTUAL')).map(r => r.name));
+  const shadow = new Set([...virtual].flatMap(v => FTS_SHADOW_SUFFIXES.map(s => v + s)));
+  return rows.map(r => r.name).filter(n => !virtual.has(n) && !shadow.has(n) && !EXCLUDED_TABLES.has(n));
+}
+
+function dataVersionManifest(db, writer) {
+  const tables = {};
+  for (const table of hashedTables(db).sort()) {
+    const hash = crypto.createHash('sha256');
+    let rows = 0;
+    for (const row of db.prepare(`SELECT * FROM [${table}] ORDER BY rowid`).raw().iterate()) {
+      hash.update(JSON.stringify(row.map(canonicalValue)) + '\n', 'utf8');
+      rows++;
+    }
+    tables[table] = { rows, hash: hash.digest('hex') };
+  }
+  const body = {};
+  for (const [table, d] of Object.entries(tables)) body[table] = { hash: d.hash, rows: d.rows };
+  return {
+    version: crypto.createHash('sha256').update(JSON.stringify(body), 'utf8').digest('hex').slice(0, 16),
+    written_at: new Date().toISOString().replace(/\.\d{3}Z$/, '+00:00'),
+    writer,
+    tables,
+  };
+}
+
+// Close a connection that wrote data and stamp data/data_version.json, so the
+// dashboard's caches pick up the new data. The manifest is written after the
+// close (which checkpoints the WAL) so it is never older than the file.
+function closeDb(db, writer = path.basename(require.main ? require.main.filename : 'playhq-db.js')) {
+  const manifest = dataVersionManifest(db, writer);
+  db.close();
+  const tmp = DATA_VERSION_PATH + '.tmp';
+  fs.writeFileSync(tmp, JSON.stringify(manifest, null, 2));
+  fs.renameSync(tmp, DATA_VERSION_PATH);
+  console.log(`Data version: ${manifest.version}`);
+  return manifest;
+}
+
 // Query helpers
 function getPlayer(db, playerId) {
   return db.prepare('SELECT * FROM players WHERE id = ?').get(playerId);
@@ -245,7 +298,7 @@ function getStats(db) {
 }
 
 module.exports = {
-  getDb, initDb, DB_PATH,
+  getDb, initDb, closeDb, dataVersionManifest, DB_PATH, DATA_VERSION_PATH,
   upsertOrganisation, upsertCompetition, upsertSeason, upsertGrade,
   upsertTeam, upsertPlayer, upsertPlayerStats, upsertGame, upsertRound,
   logScrape, getPlayer, getPlayerStats, searchPlayers, getStats,
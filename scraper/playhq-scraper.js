@@ -328,7 +328,7 @@ async function scrapeAssociation(orgId, options = {}) {
     console.log('\n  DB totals:', JSON.stringify(stats));
     
   } finally {
-    database.close();
+    db.closeDb(database);
   }
 
   // Sync to Supabase after scrape
@@ -349,7 +349,7 @@ if (require.main === module) {
   
   if (command === 'orgs') {
     const database = db.getDb();
-    scrapeOrganisations(database).then(() => database.close());
+    scrapeOrganisations(database).then(() => db.closeDb(database));
   } else if (command === 'assoc') {
     const orgId = args[1];
     if (!orgId) { console.log('Usage: node playhq-scraper.js assoc <orgId>'); process.exit(1); }
@@ -302,7 +302,7 @@ async function main() {
     console.log(`  DB totals: ${JSON.stringify(stats, null, 2)}`);
 
   } finally {
-    database.close();
+    db.closeDb(database);
   }
 }
 
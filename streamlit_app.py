@@ -1,18 +1,21 @@
 """FullCourtVision — Victorian Basketball Analytics Dashboard."""
 
 import os
-import re
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 
 st.set_page_config(page_title="FullCourtVision", page_icon="🏀", layout="wide")
 
-from db import q, get_data_source
+from db import q, get_data_source, get_data_version, search_names
+from app_cache import (compute_archetypes, archetype_by_org, game_predictor, OUTCOME_FEATURES,
+                       ensure_warmer, render_warm_status,
+                       HOME_COUNTS_SQL, HOME_SEASONS_SQL, SEASON_PICKER_SQL, ORGANISATIONS_SQL, LEADERBOARD_SQL)
+
+# Precompute the expensive caches in the background (once per process and data version)
+ensure_warmer()
 
 
 # ── Sidebar ──
@@ -20,7 +23,7 @@ st.sidebar.title("🏀 FullCourtVision")
 page = st.sidebar.radio(
     "Navigate",
     ["Home", "Player Search", "Team Search", "Leaderboards",
-     "Grade Browser", "Player Comparison", "Scouting Report", "Player Archetypes",
+     "Grade Browser", "Team Ratings", "Player Comparison", "Scouting Report", "Player Archetypes",
      "Game Predictor", "Featured: Joshua Dworkin", "Organisations"],
 )
 
@@ -32,6 +35,7 @@ st.sidebar.markdown(
     "and historical performance tracking across multiple organisations and seasons."
 )
 st.sidebar.markdown("[GitHub Repository](https://github.com/LittleBennos/FullCourtVision)")
+render_warm_status()
 
 # ── HOME ──
 if page == "Home":
@@ -40,14 +44,7 @@ if page == "Home":
     st.divider()
 
     # Dynamic hero stats from DB
-    counts = q("""
-        SELECT
-            (SELECT COUNT(*) FROM players) as players,
-            (SELECT COUNT(*) FROM player_stats) as stat_lines,
-            (SELECT COUNT(*) FROM games) as games,
-            (SELECT COUNT(*) FROM organisations) as orgs,
-            (SELECT COUNT(*) FROM seasons) as seasons
-    """)
+    counts = q(HOME_COUNTS_SQL)
     c1, c2, c3, c4, c5 = st.columns(5)
     c1.metric("Players", f"{counts['players'][0]:,}")
     c2.metric("Stat Lines", f"{counts['stat_lines'][0]:,}")
@@ -60,7 +57,7 @@ if page == "Home":
 
     # Recent seasons
     st.subheader("Seasons")
-    seasons = q("SELECT name, start_date, end_date, status FROM seasons ORDER BY start_date DESC")
+    seasons = q(HOME_SEASONS_SQL)
     st.dataframe(seasons, use_container_width=True, hide_index=True)
 
 # ── PLAYER SEARCH ──
@@ -68,17 +65,14 @@ elif page == "Player Search":
     st.header("🔍 Player Search")
     search = st.text_input("Search by name")
     if search and len(search) >= 2:
-        players = q(
-            "SELECT id, first_name, last_name FROM players WHERE first_name || ' ' || last_name LIKE ? LIMIT 50",
-            [f"%{search}%"],
-        )
+        players = search_names(search, limit=50)
         if players.empty:
             st.info("No players found.")
         else:
             for _, p in players.iterrows():
-                if st.button(f"{p['first_name']} {p['last_name']}", key=p['id']):
+                if st.button(p['name'], key=p['id']):
                     st.session_state['selected_player'] = p['id']
-                    st.session_state['selected_player_name'] = f"{p['first_name']} {p['last_name']}"
+                    st.session_state['selected_player_name'] = p['name']
 
     pid = st.session_state.get('selected_player')
     if pid:
@@ -88,8 +82,8 @@ elif page == "Player Search":
                    ps.games_played, ps.total_points, ps.one_point, ps.two_point, ps.three_point,
                    ps.total_fouls, ps.ranking
             FROM player_stats ps
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN seasons s ON g.season_id = s.id
+            JOIN grades g ON g.grade_key = ps.grade_key
+            JOIN seasons s ON s.season_key = g.season_key
             WHERE ps.player_id = ?
             ORDER BY s.start_date DESC
         """, [pid])
@@ -123,10 +117,14 @@ elif page == "Team Search":
     st.header("🏀 Team Search")
     search = st.text_input("Search by team name")
     if search and len(search) >= 2:
-        teams = q(
-            "SELECT t.id, t.name, s.name as season FROM teams t JOIN seasons s ON t.season_id = s.id WHERE t.name LIKE ? ORDER BY s.start_date DESC LIMIT 50",
-            [f"%{search}%"],
-        )
+        teams = search_names(search, kinds=("team",), limit=50)
+        if not teams.empty:
+            seasons = q(
+                f"SELECT t.id, s.name as season FROM teams t JOIN seasons s ON s.season_key = t.season_key "
+                f"WHERE t.id IN ({', '.join('?' * len(teams))})",
+                teams['id'].tolist(),
+            )
+            teams = teams.merge(seasons, on='id', how='left')
         if teams.empty:
             st.info("No teams found.")
         else:
@@ -143,26 +141,22 @@ elif page == "Team Search":
         games = q("""
             SELECT g.round_name, g.date,
                    ht.name as home_team, g.home_score,
-                   at.name as away_team, g.away_score,
+                   awt.name as away_team, g.away_score,
                    g.venue, g.status
             FROM games g
-            JOIN teams ht ON g.home_team_id = ht.id
-            JOIN teams at ON g.away_team_id = at.id
+            JOIN teams ht ON ht.team_key = g.home_team_key
+            JOIN teams awt ON awt.team_key = g.away_team_key
             WHERE (g.home_team_id = ? OR g.away_team_id = ?) AND g.status = 'FINAL'
             ORDER BY g.date
         """, [tid, tid])
         if not games.empty:
-            wl = q("""
-                SELECT
-                    SUM(CASE WHEN (home_team_id = ? AND home_score > away_score) OR (away_team_id = ? AND away_score > home_score) THEN 1 ELSE 0 END) as wins,
-                    SUM(CASE WHEN (home_team_id = ? AND home_score < away_score) OR (away_team_id = ? AND away_score < home_score) THEN 1 ELSE 0 END) as losses,
-                    COUNT(*) as played
-                FROM games WHERE (home_team_id = ? OR away_team_id = ?) AND status = 'FINAL'
-            """, [tid, tid, tid, tid, tid, tid])
+            wl = q("SELECT tr.wins, tr.losses, tr.played FROM team_record tr "
+                   "JOIN teams t ON t.team_key = tr.team_key WHERE t.id = ?", [tid])
+            rec = wl.iloc[0] if not wl.empty else {'wins': 0, 'losses': 0, 'played': 0}
             c1, c2, c3 = st.columns(3)
-            c1.metric("Wins", int(wl['wins'][0] or 0))
-            c2.metric("Losses", int(wl['losses'][0] or 0))
-            c3.metric("Games", int(wl['played'][0] or 0))
+            c1.metric("Wins", int(rec['wins'] or 0))
+            c2.metric("Losses", int(rec['losses'] or 0))
+            c3.metric("Games", int(rec['played'] or 0))
 
             st.dataframe(games, use_container_width=True, hide_index=True)
 
@@ -171,9 +165,9 @@ elif page == "Team Search":
         roster = q("""
             SELECT p.first_name, p.last_name, ps.games_played, ps.total_points, ps.one_point, ps.two_point, ps.three_point, ps.total_fouls
             FROM player_stats ps
-            JOIN players p ON ps.player_id = p.id
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN teams t ON t.season_id = g.season_id AND ps.team_name = t.name
+            JOIN players p ON p.player_key = ps.player_key
+            JOIN grades g ON g.grade_key = ps.grade_key
+            JOIN teams t ON t.season_key = g.season_key AND ps.team_name = t.name
             WHERE t.id = ?
             ORDER BY ps.total_points DESC
         """, [tid])
@@ -186,7 +180,7 @@ elif page == "Leaderboards":
     st.header("🏆 Leaderboards")
 
     # Filters
-    seasons = q("SELECT id, name FROM seasons ORDER BY start_date DESC")
+    seasons = q(SEASON_PICKER_SQL)
     col1, col2 = st.columns(2)
     with col1:
         sel_season = st.selectbox("Season", ["All"] + seasons['name'].tolist())
@@ -196,47 +190,11 @@ elif page == "Leaderboards":
     season_filter = ""
     params = []
     if sel_season != "All":
-        sid = seasons[seasons['name'] == sel_season]['id'].iloc[0]
-        season_filter = "AND g.season_id = ?"
+        sid = int(seasons[seasons['name'] == sel_season]['season_key'].iloc[0])
+        season_filter = "AND g.season_key = ?"
         params = [sid]
 
-    if board == "Top Scorers":
-        df = q(f"""
-            SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
-                   g.name as grade, s.name as season,
-                   ps.total_points, ps.games_played,
-                   ROUND(CAST(ps.total_points AS FLOAT) / MAX(ps.games_played, 1), 1) as PPG
-            FROM player_stats ps
-            JOIN players p ON ps.player_id = p.id
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN seasons s ON g.season_id = s.id
-            WHERE ps.total_points > 0 {season_filter}
-            ORDER BY ps.total_points DESC LIMIT 50
-        """, params)
-    elif board == "Top 3PT Shooters":
-        df = q(f"""
-            SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
-                   g.name as grade, s.name as season,
-                   ps.three_point, ps.games_played, ps.total_points
-            FROM player_stats ps
-            JOIN players p ON ps.player_id = p.id
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN seasons s ON g.season_id = s.id
-            WHERE ps.three_point > 0 {season_filter}
-            ORDER BY ps.three_point DESC LIMIT 50
-        """, params)
-    else:
-        df = q(f"""
-            SELECT p.first_name || ' ' || p.last_name as player, ps.team_name,
-                   g.name as grade, s.name as season,
-                   ps.games_played, ps.total_points
-            FROM player_stats ps
-            JOIN players p ON ps.player_id = p.id
-            JOIN grades g ON ps.grade_id = g.id
-            JOIN seasons s ON g.season_id = s.id
-            WHERE ps.games_played > 0 {season_filter}
-            ORDER BY ps.games_played DESC LIMIT 50
-        """, params)
+    df = q(LEADERBOARD_SQL[board].format(season_filter=season_filter), params)
 
     st.dataframe(df, use_container_width=True, hide_index=True)
 
@@ -249,43 +207,25 @@ elif page == "Leaderboards":
 elif page == "Grade Browser":
     st.header("📋 Grade / Competition Browser")
 
-    seasons = q("SELECT id, name FROM seasons ORDER BY start_date DESC")
+    seasons = q(SEASON_PICKER_SQL)
     sel_season = st.selectbox("Season", seasons['name'].tolist())
-    sid = seasons[seasons['name'] == sel_season]['id'].iloc[0]
+    sid = int(seasons[seasons['name'] == sel_season]['season_key'].iloc[0])
 
-    grades = q("SELECT id, name, type FROM grades WHERE season_id = ? ORDER BY name", [sid])
+    grades = q("SELECT grade_key, name, type FROM grades WHERE season_key = ? ORDER BY name", [sid])
     if grades.empty:
         st.info("No grades for this season.")
     else:
         sel_grade = st.selectbox("Grade", grades['name'].tolist())
-        gid = grades[grades['name'] == sel_grade]['id'].iloc[0]
+        gid = int(grades[grades['name'] == sel_grade]['grade_key'].iloc[0])
 
         tab1, tab2 = st.tabs(["Standings", "Fixtures"])
 
         with tab1:
             standings = q("""
-                WITH team_results AS (
-                    SELECT home_team_id as team_id,
-                        CASE WHEN home_score > away_score THEN 1 ELSE 0 END as win,
-                        CASE WHEN home_score < away_score THEN 1 ELSE 0 END as loss,
-                        CASE WHEN home_score = away_score THEN 1 ELSE 0 END as draw,
-                        home_score as pts_for, away_score as pts_against
-                    FROM games WHERE grade_id = ? AND status = 'FINAL'
-                    UNION ALL
-                    SELECT away_team_id,
-                        CASE WHEN away_score > home_score THEN 1 ELSE 0 END,
-                        CASE WHEN away_score < home_score THEN 1 ELSE 0 END,
-                        CASE WHEN away_score = home_score THEN 1 ELSE 0 END,
-                        away_score, home_score
-                    FROM games WHERE grade_id = ? AND status = 'FINAL'
-                )
-                SELECT t.name as team, COUNT(*) as P, SUM(win) as W, SUM(loss) as L, SUM(draw) as D,
-                       SUM(pts_for) as PF, SUM(pts_against) as PA, SUM(pts_for) - SUM(pts_against) as PD,
-                       SUM(win) * 2 + SUM(draw) as PTS
-                FROM team_results tr JOIN teams t ON tr.team_id = t.id
-                GROUP BY tr.team_id
+                SELECT team, P, W, L, D, PF, PA, PD, PTS
+                FROM grade_standings WHERE grade_key = ?
                 ORDER BY PTS DESC, PD DESC
-            """, [gid, gid])
+            """, [gid])
             if standings.empty:
                 st.info("No completed games yet.")
             else:
@@ -294,15 +234,62 @@ elif page == "Grade Browser":
         with tab2:
             fixtures = q("""
                 SELECT g.round_name, g.date, g.time, ht.name as home, g.home_score,
-                       at.name as away, g.away_score, g.venue, g.status
+                       awt.name as away, g.away_score, g.venue, g.status
                 FROM games g
-                JOIN teams ht ON g.home_team_id = ht.id
-                JOIN teams at ON g.away_team_id = at.id
-                WHERE g.grade_id = ?
+                JOIN teams ht ON ht.team_key = g.home_team_key
+                JOIN teams awt ON awt.team_key = g.away_team_key
+                WHERE g.grade_key = ?
                 ORDER BY g.date, g.time
             """, [gid])
             st.dataframe(fixtures, use_container_width=True, hide_index=True)
 
+# ── TEAM RATINGS ──
+elif page == "Team Ratings":
+    st.header("📈 Team Ratings")
+    st.markdown("Margin-aware Elo ratings per grade, updated after every round. "
+                "New teams in a grade start from their previous grade's rating pulled halfway back to 1500.")
+
+    seasons = q(SEASON_PICKER_SQL)
+    sel_season = st.selectbox("Season", seasons['name'].tolist(), key="elo_season")
+    sid = int(seasons[seasons['name'] == sel_season]['season_key'].iloc[0])
+
+    grades = q("""
+        SELECT gr.grade_key, gr.name FROM grades gr
+        WHERE gr.season_key = ? AND EXISTS (SELECT 1 FROM team_ratings r WHERE r.grade_key = gr.grade_key)
+        ORDER BY gr.name
+    """, [sid])
+    if grades.empty:
+        st.info("No rated grades for this season.")
+    else:
+        sel_grade = st.selectbox("Grade", grades['name'].tolist(), key="elo_grade")
+        gid = int(grades[grades['name'] == sel_grade]['grade_key'].iloc[0])
+
+        ratings = q("""
+            SELECT COALESCE(t.name, r.team_id) as team, ROUND(r.rating, 1) as rating, r.games
+            FROM team_ratings r
+            LEFT JOIN teams t ON t.team_key = r.team_key
+            WHERE r.grade_key = ?
+            ORDER BY r.rating DESC
+        """, [gid])
+        ratings.insert(0, 'rank', range(1, len(ratings) + 1))
+        st.dataframe(ratings, use_container_width=True, hide_index=True)
+
+        history = q("""
+            SELECT COALESCE(t.name, h.team_id) as team, h.date, h.rating
+            FROM (SELECT home_team_id as team_id, home_team_key as team_key, date, home_elo_post as rating
+                  FROM game_ratings WHERE grade_key = ?
+                  UNION ALL
+                  SELECT away_team_id, away_team_key, date, away_elo_post
+                  FROM game_ratings WHERE grade_key = ?) h
+            LEFT JOIN teams t ON t.team_key = h.team_key
+            ORDER BY h.date
+        """, [gid, gid])
+        if not history.empty:
+            fig = px.line(history, x='date', y='rating', color='team', markers=True, title="Rating after each game")
+            fig.add_hline(y=1500, line_dash='dot', line_color='grey')
+            fig.update_layout(template='plotly_dark', height=450)
+            st.plotly_chart(fig, use_container_width=True)
+
 # ── PLAYER COMPARISON ──
 elif page == "Player Comparison":
     st.header("⚔️ Player Comparison")
@@ -314,19 +301,20 @@ elif page == "Player Comparison":
     player_names = []
     for s in [search1, search2, search3]:
         if s and len(s) >= 2:
-            p = q("SELECT id, first_name, last_name FROM players WHERE first_name || ' ' || last_name LIKE ? LIMIT 1", [f"%{s}%"])
+            p = search_names(s, limit=1)
             if not p.empty:
                 player_ids.append(p['id'].iloc[0])
-                player_names.append(f"{p['first_name'].iloc[0]} {p['last_name'].iloc[0]}")
+                player_names.append(p['name'].iloc[0])
 
     if len(player_ids) >= 2:
         all_stats = []
         for pid, pname in zip(player_ids, player_names):
             s = q("""
-                SELECT SUM(games_played) as games, SUM(total_points) as points,
-                       SUM(one_point) as ft, SUM(two_point) as fg2, SUM(three_point) as fg3,
-                       SUM(total_fouls) as fouls
-                FROM player_stats WHERE player_id = ?
+                SELECT pc.games_played as games, pc.total_points as points,
+                       pc.one_point as ft, pc.two_point as fg2, pc.three_point as fg3,
+                       pc.total_fouls as fouls
+                FROM players p LEFT JOIN player_career pc ON pc.player_key = p.player_key
+                WHERE p.id = ?
             """, [pid])
             s['player'] = pname
             gp = max(int(s['games'].iloc[0] or 0), 1)
@@ -363,23 +351,22 @@ elif page == "Scouting Report":
     search = st.text_input("Enter player name", key="scout_search")
 
     if search and len(search) >= 2:
-        players = q(
-            "SELECT id, first_name, last_name FROM players WHERE first_name || ' ' || last_name LIKE ? LIMIT 20",
-            [f"%{search}%"],
-        )
+        players = search_names(search, limit=20)
         if players.empty:
             st.info("No players found.")
         else:
-            options = {f"{r['first_name']} {r['last_name']}": r['id'] for _, r in players.iterrows()}
+            options = {r['name']: r['id'] for _, r in players.iterrows()}
             sel = st.selectbox("Select player", list(options.keys()))
             pid = options[sel]
 
             # ── Fetch all stat lines for this player ──
             stats = q("""
-                SELECT ps.*, g.name as grade, s.name as season, s.start_date
+                SELECT ps.*, g.name as grade, s.name as season, s.start_date,
+                       COALESCE(gd.age_group, 'Unknown') as age_group
                 FROM player_stats ps
-                JOIN grades g ON ps.grade_id = g.id
-                JOIN seasons s ON g.season_id = s.id
+                JOIN grades g ON g.grade_key = ps.grade_key
+                JOIN seasons s ON s.season_key = g.season_key
+                LEFT JOIN grade_dim gd ON gd.grade_key = ps.grade_key
                 WHERE ps.player_id = ?
                 ORDER BY s.start_date
             """, [pid])
@@ -387,15 +374,9 @@ elif page == "Scouting Report":
             if stats.empty:
                 st.warning("No stats available for this player.")
             else:
-                # Extract age group from grade name
-                def extract_age_group(grade_name):
-                    m = re.search(r'(U\d{2})', str(grade_name))
-                    return m.group(1) if m else 'Unknown'
-
-                stats['age_group'] = stats['grade'].apply(extract_age_group)
-
                 # ── HEADER ──
                 pname = sel
+                pkey = stats['player_key'].iloc[0]
                 teams = stats['team_name'].dropna().unique().tolist()
                 total_gp = int(stats['games_played'].sum())
                 total_pts = int(stats['total_points'].sum())
@@ -470,19 +451,10 @@ elif page == "Scouting Report":
 
                 # Get all players' aggregated stats in the same age group
                 peers = q("""
-                    SELECT ps.player_id,
-                           SUM(ps.games_played) as gp,
-                           SUM(ps.total_points) as pts,
-                           SUM(ps.total_fouls) as fouls,
-                           SUM(ps.one_point) as ft,
-                           SUM(ps.two_point) as fg2,
-                           SUM(ps.three_point) as fg3
-                    FROM player_stats ps
-                    JOIN grades g ON ps.grade_id = g.id
-                    WHERE g.name LIKE ?
-                    GROUP BY ps.player_id
-                    HAVING SUM(ps.games_played) >= 3
-                """, [f"%{primary_ag}%"])
+                    SELECT player_key, gp, pts, fouls, ft, fg2, fg3
+                    FROM player_age_group
+                    WHERE age_group = ? AND gp >= 3
+                """, [primary_ag])
 
                 if not peers.empty and len(peers) >= 5:
                     peers['ppg'] = peers['pts'] / peers['gp'].clip(lower=1)
@@ -491,7 +463,7 @@ elif page == "Scouting Report":
                     peers['fg2pg'] = peers['fg2'] / peers['gp'].clip(lower=1)
                     peers['ftpg'] = peers['ft'] / peers['gp'].clip(lower=1)
 
-                    player_row = peers[peers['player_id'] == pid]
+                    player_row = peers[peers['player_key'] == pkey]
                     if not player_row.empty:
                         pr = player_row.iloc[0]
                         metrics_list = [
@@ -647,7 +619,7 @@ elif page == "Scouting Report":
                     feature_cols = ['ppg', 'fg3pg', 'fg2pg', 'ftpg', 'fpg']
                     # Ensure we have these columns
                     peer_features = peers[feature_cols].values
-                    player_idx = peers.index[peers['player_id'] == pid]
+                    player_idx = peers.index[peers['player_key'] == pkey]
 
                     if len(player_idx) > 0:
                         player_vec = peer_features[player_idx[0]]
@@ -667,18 +639,18 @@ elif page == "Scouting Report":
                         top5 = similarities[:5]
 
                         # Fetch names
-                        sim_ids = [peers.iloc[i]['player_id'] for i, _ in top5]
+                        sim_keys = [int(peers.iloc[i]['player_key']) for i, _ in top5]
                         sim_names = q(
-                            f"SELECT id, first_name || ' ' || last_name as name FROM players WHERE id IN ({','.join(['?']*len(sim_ids))})",
-                            sim_ids
+                            f"SELECT player_key, first_name || ' ' || last_name as name FROM players WHERE player_key IN ({','.join(['?']*len(sim_keys))})",
+                            sim_keys
                         )
-                        name_map = dict(zip(sim_names['id'], sim_names['name']))
+                        name_map = dict(zip(sim_names['player_key'], sim_names['name']))
 
                         sim_data = []
                         for i, sim_score in top5:
                             row = peers.iloc[i]
                             sim_data.append({
-                                'Player': name_map.get(row['player_id'], 'Unknown'),
+                                'Player': name_map.get(row['player_key'], 'Unknown'),
                                 'Similarity': f"{sim_score:.1%}",
                                 'GP': int(row['gp']),
                                 'PPG': round(row['ppg'], 1),
@@ -703,75 +675,7 @@ elif page == "Player Archetypes":
     ARCHETYPE_ICONS = {"Sharpshooter": "🎯", "Inside Scorer": "💪", "High Volume": "🔥",
                        "Physical": "🛡️", "Balanced": "⚖️"}
 
-    @st.cache_data(ttl=3600)
-    def compute_archetypes():
-        # Aggregate per-game stats per player (min 5 GP)
-        df = q("""
-            SELECT ps.player_id,
-                   p.first_name || ' ' || p.last_name as player_name,
-                   SUM(ps.games_played) as gp,
-                   SUM(ps.total_points) as pts,
-                   SUM(ps.one_point) as ft,
-                   SUM(ps.two_point) as fg2,
-                   SUM(ps.three_point) as fg3,
-                   SUM(ps.total_fouls) as fouls
-            FROM player_stats ps
-            JOIN players p ON ps.player_id = p.id
-            GROUP BY ps.player_id
-            HAVING SUM(ps.games_played) >= 5
-        """)
-        df['ppg'] = df['pts'] / df['gp']
-        df['ft_pg'] = df['ft'] / df['gp']
-        df['fg2_pg'] = df['fg2'] / df['gp']
-        df['fg3_pg'] = df['fg3'] / df['gp']
-        df['fpg'] = df['fouls'] / df['gp']
-
-        features = ['ppg', 'ft_pg', 'fg2_pg', 'fg3_pg', 'fpg']
-        X = df[features].fillna(0).values
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-
-        kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
-        df['cluster'] = kmeans.fit_predict(X_scaled)
-
-        # Assign archetype names by cluster characteristics
-        cluster_means = df.groupby('cluster')[features].mean()
-        # Sharpshooter: highest fg3_pg
-        # Inside Scorer: highest fg2_pg relative to fg3_pg
-        # High Volume: highest ppg
-        # Physical: highest fpg
-        # Balanced: remaining
-        assigned = {}
-        remaining_clusters = set(range(5))
-
-        # High Volume = highest ppg
-        c = cluster_means['ppg'].idxmax()
-        assigned[c] = "High Volume"
-        remaining_clusters.discard(c)
-
-        # Sharpshooter = highest fg3_pg (among remaining)
-        c = cluster_means.loc[list(remaining_clusters), 'fg3_pg'].idxmax()
-        assigned[c] = "Sharpshooter"
-        remaining_clusters.discard(c)
-
-        # Physical = highest fpg (among remaining)
-        c = cluster_means.loc[list(remaining_clusters), 'fpg'].idxmax()
-        assigned[c] = "Physical"
-        remaining_clusters.discard(c)
-
-        # Inside Scorer = highest fg2_pg (among remaining)
-        c = cluster_means.loc[list(remaining_clusters), 'fg2_pg'].idxmax()
-        assigned[c] = "Inside Scorer"
-        remaining_clusters.discard(c)
-
-        # Balanced = whatever's left
-        c = remaining_clusters.pop()
-        assigned[c] = "Balanced"
-
-        df['archetype'] = df['cluster'].map(assigned)
-        return df, features
-
-    arch_df, feature_cols = compute_archetypes()
+    arch_df, feature_cols = compute_archetypes(get_data_version())
 
     # Summary metrics
     st.subheader("📊 Overview")
@@ -854,26 +758,7 @@ elif page == "Player Archetypes":
     # ── Archetype Distribution by Organisation ──
     st.subheader("🏢 Archetype Distribution by Organisation")
 
-    # Link players to orgs via player_stats.team_name → teams.name → teams.organisation_id
-    @st.cache_data(ttl=3600)
-    def archetype_by_org():
-        # Get player → org mapping (most common org per player)
-        player_org = q("""
-            SELECT ps.player_id, o.name as org_name, COUNT(*) as cnt
-            FROM player_stats ps
-            JOIN teams t ON ps.team_name = t.name
-            JOIN organisations o ON t.organisation_id = o.id
-            GROUP BY ps.player_id, o.name
-        """)
-        if player_org.empty:
-            return pd.DataFrame()
-        # Keep most common org per player
-        idx = player_org.groupby('player_id')['cnt'].idxmax()
-        player_org = player_org.loc[idx, ['player_id', 'org_name']]
-        merged = arch_df.merge(player_org, on='player_id', how='inner')
-        return merged
-
-    org_df = archetype_by_org()
+    org_df = archetype_by_org(get_data_version())
     if org_df.empty:
         st.info("Could not link players to organisations.")
     else:
@@ -911,17 +796,13 @@ elif page == "Player Archetypes":
 # ── GAME PREDICTOR ──
 elif page == "Game Predictor":
     st.header("🔮 Game Outcome Predictor")
-    st.markdown("Select two teams to predict the outcome using a Random Forest model trained on historical results.")
+    st.markdown("Select two teams to predict the outcome using a model trained on historical results.")
 
-    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import accuracy_score
-
-    seasons = q("SELECT id, name FROM seasons ORDER BY start_date DESC")
+    seasons = q(SEASON_PICKER_SQL)
     sel_season = st.selectbox("Season", seasons['name'].tolist(), key="pred_season")
-    sid = seasons[seasons['name'] == sel_season]['id'].iloc[0]
+    sid = int(seasons[seasons['name'] == sel_season]['season_key'].iloc[0])
 
-    teams_in_season = q("SELECT id, name FROM teams WHERE season_id = ? ORDER BY name", [sid])
+    teams_in_season = q("SELECT id, name FROM teams WHERE season_key = ? ORDER BY name", [sid])
 
     if len(teams_in_season) < 2:
         st.warning("Not enough teams in this season.")
@@ -937,59 +818,18 @@ elif page == "Game Predictor":
             home_id = teams_in_season[teams_in_season['name'] == home_team]['id'].iloc[0]
             away_id = teams_in_season[teams_in_season['name'] == away_team]['id'].iloc[0]
 
-            # Build features from all completed games
-            all_games = q("""
-                SELECT home_team_id, away_team_id, home_score, away_score
-                FROM games WHERE status = 'FINAL' AND home_score IS NOT NULL
-            """)
+            predictor = game_predictor(get_data_version())
 
-            if len(all_games) < 50:
+            if predictor is None:
                 st.error("Not enough historical games to train model.")
             else:
-                # Build team strength lookup
-                team_stats = {}
-                for _, g in all_games.iterrows():
-                    for tid, pf, pa in [(g['home_team_id'], g['home_score'], g['away_score']),
-                                         (g['away_team_id'], g['away_score'], g['home_score'])]:
-                        if tid not in team_stats:
-                            team_stats[tid] = {'pf': [], 'pa': []}
-                        team_stats[tid]['pf'].append(pf)
-                        team_stats[tid]['pa'].append(pa)
-
-                def feat(tid):
-                    s = team_stats.get(tid)
-                    if not s or len(s['pf']) < 2:
-                        return None
-                    wins = sum(1 for f, a in zip(s['pf'], s['pa']) if f > a)
-                    return [np.mean(s['pf']), np.mean(s['pa']), wins / len(s['pf']), np.std(s['pf'])]
-
-                # Training data
-                rows_X, rows_y = [], []
-                for _, g in all_games.iterrows():
-                    hf = feat(g['home_team_id'])
-                    af = feat(g['away_team_id'])
-                    if hf and af:
-                        rows_X.append(hf + af)
-                        rows_y.append(1 if g['home_score'] > g['away_score'] else 0)
-
-                X = np.array(rows_X)
-                y = np.array(rows_y)
-
-                clf = RandomForestClassifier(n_estimators=100, random_state=42)
-                X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42)
-                clf.fit(X_tr, y_tr)
-                acc = accuracy_score(y_te, clf.predict(X_te))
-
-                hf = feat(home_id)
-                af = feat(away_id)
-
-                if not hf or not af:
+                pred = predictor.predict_one(home_id, away_id)
+
+                if pred['status'] != 'ok':
                     st.error("One or both teams have insufficient game history for prediction.")
                 else:
-                    pred_X = np.array([hf + af])
-                    prob = clf.predict_proba(pred_X)[0]
-                    home_prob = prob[1] * 100 if len(prob) > 1 else 50
-                    away_prob = prob[0] * 100 if len(prob) > 1 else 50
+                    home_prob = pred['home_win_prob']
+                    away_prob = pred['away_win_prob']
 
                     st.divider()
                     winner = home_team if home_prob > away_prob else away_team
@@ -999,26 +839,28 @@ elif page == "Game Predictor":
                     <div style="background: linear-gradient(135deg, #1a1a2e, #0f3460); padding: 30px;
                                 border-radius: 15px; text-align: center; border: 2px solid #e94560;">
                         <h2 style="color: #e94560; margin: 0;">🏆 Predicted Winner: {winner}</h2>
-                        <p style="color: #ccc; font-size: 1.2em;">{win_prob:.1f}% win probability</p>
+                        <p style="color: #ccc; font-size: 1.2em;">{win_prob:.1f}% win probability · predicted margin {pred['predicted_margin']:+.1f}</p>
                     </div>
                     """, unsafe_allow_html=True)
 
                     st.write("")
                     c1, c2 = st.columns(2)
-                    c1.metric(f"🏠 {home_team}", f"{home_prob:.1f}%", delta=f"Avg {hf[0]:.1f} PPG")
-                    c2.metric(f"✈️ {away_team}", f"{away_prob:.1f}%", delta=f"Avg {af[0]:.1f} PPG")
+                    c1.metric(f"🏠 {home_team}", f"{home_prob:.1f}%", delta=f"Avg {pred['home_avg_score']:.1f} PPG")
+                    c2.metric(f"✈️ {away_team}", f"{away_prob:.1f}%", delta=f"Avg {pred['away_avg_score']:.1f} PPG")
 
                     # Feature importance
-                    feat_names = ['Home Avg PF', 'Home Avg PA', 'Home Win%', 'Home Scoring Var',
-                                  'Away Avg PF', 'Away Avg PA', 'Away Win%', 'Away Scoring Var']
-                    imp = pd.DataFrame({'Feature': feat_names, 'Importance': clf.feature_importances_})
+                    metrics = predictor.metrics
+                    imp = pd.DataFrame({'Feature': OUTCOME_FEATURES,
+                                        'Importance': [metrics['feature_importance'][c] for c in predictor.feature_cols]})
                     imp = imp.sort_values('Importance', ascending=True)
                     fig = px.bar(imp, x='Importance', y='Feature', orientation='h',
-                                 title=f'Feature Importance (Model Accuracy: {acc:.1%})')
+                                 title=f"Feature Importance (Model Accuracy: {metrics['accuracy']:.1%})")
                     fig.update_layout(template='plotly_dark', height=350)
                     st.plotly_chart(fig, use_container_width=True)
 
-                    st.caption(f"Model trained on {len(X_tr):,} games, tested on {len(X_te):,} games.")
+                    model_name = metrics.get('model', 'random_forest').replace('_', ' ').title()
+                    st.caption(f"{model_name} model trained on {metrics['training_samples']:,} games, tested on "
+                               f"{metrics['test_samples']:,} games (5-fold CV accuracy {metrics['cv_accuracy']:.1%}).")
 
 # ── FEATURED: JOSHUA DWORKIN ──
 elif page == "Featured: Joshua Dworkin":
@@ -1029,8 +871,8 @@ elif page == "Featured: Joshua Dworkin":
     stats = q("""
         SELECT ps.*, g.name as grade, s.name as season, s.start_date
         FROM player_stats ps
-        JOIN grades g ON ps.grade_id = g.id
-        JOIN seasons s ON g.season_id = s.id
+        JOIN grades g ON g.grade_key = ps.grade_key
+        JOIN seasons s ON s.season_key = g.season_key
         WHERE ps.player_id = ?
         ORDER BY s.start_date
     """, [JOSH_ID])
@@ -1130,7 +972,7 @@ elif page == "Featured: Joshua Dworkin":
 elif page == "Organisations":
     st.header("🏢 Organisation Directory")
     search = st.text_input("Filter by name or suburb")
-    sql = "SELECT name, type, suburb, state FROM organisations"
+    sql = ORGANISATIONS_SQL
     params = []
     if search:
         sql += " WHERE name LIKE ? OR suburb LIKE ?"
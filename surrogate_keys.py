@@ -0,0 +1,156 @@
+"""Dense integer surrogate keys for players, teams, grades and seasons.
+
+build() keeps one <entity>_keys table per entity mapping each UUID to a dense
+INTEGER key, adds matching *_key columns to the scraper's tables, indexes
+them, and installs AFTER INSERT triggers so rows the scraper writes later are
+keyed as they arrive. Mappings are append-only: a key never changes once
+assigned, new UUIDs get the next free key. Pages and the derived tables join
+on the integer keys; the UUID columns stay in place for lookups by ID and
+PlayHQ links. build_aggregates.py runs this before building the aggregates.
+derive_keys() fills the key columns in on read for parquet files exported
+before the keys existed.
+
+    python surrogate_keys.py     # (re)key data/playhq.db
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "data", "playhq.db")
+
+# entity -> table whose id column it keys
+ENTITIES = {"player": "players", "team": "teams", "grade": "grades", "season": "seasons"}
+
+# table -> (key column, entity, UUID column) for every UUID that gets a key;
+# an entity table lists its own key first
+KEY_COLUMNS = {
+    "players": [("player_key", "player", "id")],
+    "teams": [("team_key", "team", "id"), ("season_key", "season", "season_id")],
+    "grades": [("grade_key", "grade", "id"), ("season_key", "season", "season_id")],
+    "seasons": [("season_key", "season", "id")],
+    "player_stats": [("player_key", "player", "player_id"), ("grade_key", "grade", "grade_id")],
+    "games": [("grade_key", "grade", "grade_id"), ("home_team_key", "team", "home_team_id"),
+              ("away_team_key", "team", "away_team_id")],
+    "rounds": [("grade_key", "grade", "grade_id")],
+}
+
+# Secondary indexes on the key columns (each entity's own key gets a unique index)
+KEY_INDEXES = {
+    "teams": ["season_key, name"],
+    "grades": ["season_key"],
+    "player_stats": ["player_key", "grade_key"],
+    "games": ["grade_key, status", "home_team_key", "away_team_key"],
+    "rounds": ["grade_key"],
+}
+
+
+def _columns(conn, table):
+    return {r[1] for r in conn.execute(f"PRAGMA table_info([{table}])")}
+
+
+def _assign(conn, entity, tables):
+    """Give every UUID of entity seen in tables a key, keeping existing ones."""
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {entity}_keys ("
+                 f"{entity}_key INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE)")
+    sources = [f"SELECT [{uuid_col}] AS id FROM [{table}]"
+               for table in tables
+               for _, ent, uuid_col in KEY_COLUMNS[table] if ent == entity]
+    if not sources:
+        return
+    conn.execute(f"INSERT OR IGNORE INTO {entity}_keys (id) "
+                 f"SELECT id FROM ({' UNION '.join(sources)}) WHERE id IS NOT NULL ORDER BY id")
+
+
+def _trigger_sql(table, refs):
+    # NOT EXISTS rather than INSERT OR IGNORE: the scraper's INSERT OR REPLACE
+    # would override the trigger's conflict clause and re-key existing UUIDs
+    inserts = "".join(f"INSERT INTO {entity}_keys (id) SELECT NEW.[{uuid_col}] "
+                      f"WHERE NEW.[{uuid_col}] IS NOT NULL "
+                      f"AND NOT EXISTS (SELECT 1 FROM {entity}_keys WHERE id = NEW.[{uuid_col}]);\n"
+                      for _, entity, uuid_col in refs)
+    sets = ", ".join(f"[{key_col}] = (SELECT {entity}_key FROM {entity}_keys WHERE id = NEW.[{uuid_col}])"
+                     for key_col, entity, uuid_col in refs)
+    return (f"CREATE TRIGGER [{table}_surrogate_keys] AFTER INSERT ON [{table}] BEGIN\n"
+            f"{inserts}UPDATE [{table}] SET {sets} WHERE rowid = NEW.rowid;\nEND")
+
+
+def build(conn):
+    """Assign keys, fill the *_key columns and (re)install the keying triggers.
+
+    Returns:
+        dict: entity -> number of keys in its mapping
+    """
+    tables = [t for t in KEY_COLUMNS
+              if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [t]).fetchone()]
+    for entity in ENTITIES:
+        _assign(conn, entity, tables)
+
+    for table in tables:
+        refs = KEY_COLUMNS[table]
+        existing = _columns(conn, table)
+        for key_col, _, _ in refs:
+            if key_col not in existing:
+                conn.execute(f"ALTER TABLE [{table}] ADD COLUMN [{key_col}] INTEGER")
+        for key_col, entity, uuid_col in refs:
+            conn.execute(f"UPDATE [{table}] SET [{key_col}] = k.{entity}_key FROM {entity}_keys k "
+                         f"WHERE k.id = [{table}].[{uuid_col}] AND [{table}].[{key_col}] IS NOT k.{entity}_key")
+
+        if table in ENTITIES.values():
+            own_key = refs[0][0]
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS [idx_{table}_{own_key}] ON [{table}] ([{own_key}])")
+        for cols in KEY_INDEXES.get(table, []):
+            suffix = "_".join(c.split()[0] for c in cols.split(","))
+            conn.execute(f"CREATE INDEX IF NOT EXISTS [idx_{table}_{suffix}] ON [{table}] ({cols})")
+
+        conn.execute(f"DROP TRIGGER IF EXISTS [{table}_surrogate_keys]")
+        conn.execute(_trigger_sql(table, refs))
+    conn.commit()
+    return {entity: conn.execute(f"SELECT COUNT(*) FROM {entity}_keys").fetchone()[0] for entity in ENTITIES}
+
+
+def missing_keys(table, columns):
+    """KEY_COLUMNS entries of table whose key column is absent from columns but derivable from its UUID column."""
+    return [ref for ref in KEY_COLUMNS.get(table, []) if ref[0] not in columns and ref[2] in columns]
+
+
+def derive_keys(table, df, entity_ids):
+    """Add the key columns df lacks (a parquet export from before the keys).
+
+    A UUID gets the key its entity table stores for it or, when that table
+    has no key column either, its 1-based position among the table's sorted
+    ids. UUIDs missing from the entity table get no key, so joins on the key
+    drop them as joins on the UUID would. Derived keys are only consistent
+    within one set of files; build() assigns the stored ones.
+
+    Args:
+        table (str): Table df holds rows of
+        df (pd.DataFrame): Rows with the UUID columns of KEY_COLUMNS[table]
+        entity_ids (callable): Entity table name -> DataFrame of its id column
+            and its own key column if it has one
+
+    Returns:
+        pd.DataFrame: df with the missing key columns added
+    """
+    for key_col, entity, uuid_col in missing_keys(table, df.columns):
+        entity_table = ENTITIES[entity]
+        own_key = KEY_COLUMNS[entity_table][0][0]
+        ids = df if table == entity_table else entity_ids(entity_table)
+        if own_key in ids.columns:
+            keys = pd.Series(ids[own_key].to_numpy(), index=ids["id"].to_numpy())
+        else:
+            uuids = np.sort(ids["id"].dropna().unique())
+            keys = pd.Series(np.arange(1, len(uuids) + 1), index=uuids)
+        df[key_col] = df[uuid_col].map(keys)
+    return df
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for entity, n in build(conn).items():
+            print(f"{entity}_keys: {n:,} keys")
+    finally:
+        conn.close()
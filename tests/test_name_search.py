@@ -0,0 +1,73 @@
+"""Typo tolerance of the name_search trigram index (name_search.py)."""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import name_search
+
+PLAYERS = [
+    ("p1", "Ava", "Smith"), ("p2", "Ben", "Johnson"), ("p3", "Cara", "Williams"),
+    ("p4", "Dan", "McDonald"), ("p5", "Eli", "Simpson"), ("p6", "Fay", "Smithers"),
+]
+TEAMS = [("t1", "Eltham U14 Boys 01"), ("t2", "Ivanhoe U16 Girls 02")]
+ORGANISATIONS = [("o1", "Eltham Wildcats"), ("o2", "Ivanhoe Basketball Club")]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE players (id TEXT, first_name TEXT, last_name TEXT)")
+    conn.execute("CREATE TABLE teams (id TEXT, name TEXT)")
+    conn.execute("CREATE TABLE organisations (id TEXT, name TEXT)")
+    conn.executemany("INSERT INTO players VALUES (?, ?, ?)", PLAYERS)
+    conn.executemany("INSERT INTO teams VALUES (?, ?)", TEAMS)
+    conn.executemany("INSERT INTO organisations VALUES (?, ?)", ORGANISATIONS)
+    name_search.build(conn)
+    yield conn
+    conn.close()
+
+
+def names(conn, text, kinds=("player",)):
+    return [name for _, _, name in name_search.search(conn, text, kinds)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("smiht", "Ava Smith"),
+    ("jonhson", "Ben Johnson"),
+    ("wiliams", "Cara Williams"),
+    ("mcdonlad", "Dan McDonald"),
+    ("ava smiht", "Ava Smith"),
+])
+def test_transposed_and_dropped_letters(conn, text, expected):
+    assert names(conn, text)[0] == expected
+
+
+def test_closest_name_ranks_first(conn):
+    # Smith is one swap away, Smithers needs the swap plus three letters
+    assert names(conn, "smiht")[:2] == ["Ava Smith", "Fay Smithers"]
+
+
+def test_exact_substring_skips_typo_pass(conn):
+    assert names(conn, "smith") == ["Ava Smith", "Fay Smithers"]
+
+
+def test_unrelated_text_matches_nothing(conn):
+    assert names(conn, "zzqxv") == []
+
+
+def test_typo_matches_respect_kinds(conn):
+    assert names(conn, "eltahm", kinds=("organisation",)) == ["Eltham Wildcats"]
+    assert names(conn, "eltahm", kinds=("team",)) == ["Eltham U14 Boys 01"]
+
+
+def test_typo_distance():
+    assert name_search._typo_distance("smiht", "ava smith") == 1
+    assert name_search._typo_distance("jonhson", "ben johnson") == 1
+    assert name_search._typo_distance("smith", "ava smith") == 0
+    assert name_search._typo_distance("smoth", "smith") == 1
+    assert name_search._typo_distance("abc", "xyz") == 3